@@ -1,9 +1,11 @@
 from flask import Flask
 from ossapi import Ossapi
-from config import OSU_CLIENT_ID, OSU_CLIENT_SECRET
+from config import OSU_CLIENT_ID, OSU_CLIENT_SECRET, OSU_API_CACHE_POLICIES
+from .api_cache import CachedApi
 
-# Create an instance of the osu! API client to be used in other parts of the app
-api = Ossapi(OSU_CLIENT_ID, OSU_CLIENT_SECRET)
+# Create an instance of the osu! API client to be used in other parts of the app,
+# with user, beatmap and room lookups cached (see OSU_API_CACHE_POLICIES)
+api = CachedApi(Ossapi(OSU_CLIENT_ID, OSU_CLIENT_SECRET), OSU_API_CACHE_POLICIES)
 
 def create_app():
     """Create and configure an instance of the Flask application."""
@@ -21,4 +23,12 @@ def create_app():
         app.register_blueprint(dev_bp)
         app.register_blueprint(player_bp)
 
+        # Keep competitor stats fresh in the background
+        from .services.competitor_refresher import competitor_refresher
+        competitor_refresher.start()
+
+        if app.config['LIVE_SCORE_WATCHER']:
+            from .services.score_watcher import live_score_watcher
+            live_score_watcher.start()
+
     return app
@@ -0,0 +1,127 @@
+"""
+Caching facade around the shared osu! API client.
+
+Each cached endpoint has its own policy: how long a response is fresh, how much
+longer a stale response may still be served while it is refreshed in the
+background (stale-while-revalidate), and how many responses are kept (LRU).
+Callers that need the current response (match results) pass fresh=True to skip
+the cached one; the response they get is still stored for everyone else.
+Every other attribute is passed through to the wrapped client uncached. Requests
+that reach the client are counted, so background jobs can respect an API budget.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+# calls_last_minute() looks back this far
+CALL_WINDOW_SECONDS = 60
+
+
+class CachedApi:
+    def __init__(self, client, policies):
+        """`policies` maps an endpoint name to (fresh_seconds, stale_seconds, max_entries)"""
+        self._client = client
+        self._policies = policies
+        self._entries = {endpoint: OrderedDict() for endpoint in policies}
+        self._refreshing = set()
+        self._call_times = deque()
+        self._lock = threading.Lock()
+        self._stats = {endpoint: dict.fromkeys(('hits', 'stale_hits', 'misses', 'bypasses', 'refreshes', 'errors',
+                                                 'evictions'), 0)
+                       for endpoint in policies}
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name not in self._policies:
+            attribute = getattr(self._client, name)
+            if not callable(attribute):
+                return attribute
+            return lambda *args, **kwargs: self._request(name, args, kwargs)
+        return lambda *args, fresh=False, **kwargs: self._call(name, args, kwargs, fresh)
+
+    def _request(self, endpoint, args, kwargs):
+        """Calls the wrapped client, counting the request"""
+        with self._lock:
+            self._call_times.append(time.monotonic())
+        return getattr(self._client, endpoint)(*args, **kwargs)
+
+    def calls_last_minute(self):
+        """Requests that reached the osu! API from this worker in the last CALL_WINDOW_SECONDS"""
+        cutoff = time.monotonic() - CALL_WINDOW_SECONDS
+        with self._lock:
+            while self._call_times and self._call_times[0] < cutoff:
+                self._call_times.popleft()
+            return len(self._call_times)
+
+    def _call(self, endpoint, args, kwargs, fresh=False):
+        fresh_seconds, stale_seconds, _ = self._policies[endpoint]
+        key = (args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:  # unhashable arguments: nothing to key the cache on
+            return self._request(endpoint, args, kwargs)
+        now = time.monotonic()
+        with self._lock:
+            entries = self._entries[endpoint]
+            entry = None if fresh else entries.get(key)
+            if entry is not None:
+                value, fetched_at = entry
+                age = now - fetched_at
+                if age < fresh_seconds + stale_seconds:
+                    entries.move_to_end(key)
+                    if age < fresh_seconds:
+                        self._stats[endpoint]['hits'] += 1
+                        return value
+                    self._stats[endpoint]['stale_hits'] += 1
+                    if (endpoint, key) not in self._refreshing:
+                        self._refreshing.add((endpoint, key))
+                        threading.Thread(target=self._refresh, args=(endpoint, key, args, kwargs),
+                                         daemon=True).start()
+                    return value
+            self._stats[endpoint]['bypasses' if fresh else 'misses'] += 1
+
+        # Fetch outside the lock; errors reach the caller and are not cached
+        value = self._request(endpoint, args, kwargs)
+        self._store(endpoint, key, value)
+        return value
+
+    def _refresh(self, endpoint, key, args, kwargs):
+        try:
+            self._store(endpoint, key, self._request(endpoint, args, kwargs))
+            with self._lock:
+                self._stats[endpoint]['refreshes'] += 1
+        except Exception as e:
+            print(f"Error refreshing cached api.{endpoint}{args}: {e}")
+            with self._lock:
+                self._stats[endpoint]['errors'] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard((endpoint, key))
+
+    def _store(self, endpoint, key, value):
+        max_entries = self._policies[endpoint][2]
+        with self._lock:
+            entries = self._entries[endpoint]
+            entries[key] = (value, time.monotonic())
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+                self._stats[endpoint]['evictions'] += 1
+
+    def invalidate(self, endpoint=None):
+        """Drop the cached responses of one endpoint, or of all of them"""
+        with self._lock:
+            for name in ([endpoint] if endpoint else self._entries):
+                self._entries[name].clear()
+
+    def cache_stats(self):
+        """Hit/miss counters and size per cached endpoint"""
+        with self._lock:
+            stats = {}
+            for endpoint, counters in self._stats.items():
+                served = counters['hits'] + counters['stale_hits']
+                total = served + counters['misses']
+                stats[endpoint] = dict(counters, size=len(self._entries[endpoint]),
+                                       hit_rate=round(served / total, 3) if total else 0.0)
+            return stats
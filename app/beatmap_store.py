@@ -0,0 +1,164 @@
+"""
+Persistent beatmap metadata store.
+
+Beatmap metadata practically never changes, so each beatmap is fetched from the
+osu! API once and kept in BEATMAP_STORE_FILE (SQLite, shared by every worker and
+kept across restarts). Mappool uploads and detailed match results read through it.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from config import BEATMAP_STORE_FILE
+from . import api
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS beatmaps (
+    beatmap_id INTEGER PRIMARY KEY,
+    body TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+# Most ids the osu! API accepts in one /beatmaps lookup
+BEATMAPS_BATCH_SIZE = 50
+
+UNKNOWN_BEATMAPSET = {'id': None, 'title': 'Unknown', 'artist': 'Unknown', 'creator': 'Unknown', 'covers': {}}
+
+
+def beatmap_record(beatmap):
+    """Converts an API beatmap to the JSON-serializable dict kept in the store (None if incomplete)"""
+    if not hasattr(beatmap, 'id') or not hasattr(beatmap, 'beatmapset'):
+        return None
+
+    record = {
+        'id': beatmap.id,
+        'beatmapset_id': getattr(beatmap, 'beatmapset_id', None),
+        'mode': str(getattr(beatmap, 'mode', None)),  # Convert GameMode to string
+        'difficulty_rating': getattr(beatmap, 'difficulty_rating', None),
+        'version': getattr(beatmap, 'version', 'Unknown'),
+        'total_length': getattr(beatmap, 'total_length', None),
+        'hit_length': getattr(beatmap, 'hit_length', None),
+        'bpm': getattr(beatmap, 'bpm', None),
+        'cs': getattr(beatmap, 'cs', None),
+        'ar': getattr(beatmap, 'ar', None),
+        'od': getattr(beatmap, 'accuracy', None),
+        'hp': getattr(beatmap, 'drain', None),
+        'count_circles': getattr(beatmap, 'count_circles', None),
+        'count_sliders': getattr(beatmap, 'count_sliders', None),
+        'count_spinners': getattr(beatmap, 'count_spinners', None),
+        'beatmapset': dict(UNKNOWN_BEATMAPSET)
+    }
+
+    # Handle beatmapset safely
+    if beatmap.beatmapset:
+        try:
+            beatmapset_covers = {}
+            if hasattr(beatmap.beatmapset, 'covers'):
+                # Convert covers to dict safely
+                covers_obj = beatmap.beatmapset.covers
+                if hasattr(covers_obj, '_asdict'):
+                    beatmapset_covers = covers_obj._asdict()
+                elif hasattr(covers_obj, '__dict__'):
+                    beatmapset_covers = {k: v for k, v in covers_obj.__dict__.items() if not k.startswith('_')}
+                else:
+                    # Try to convert common cover attributes
+                    for attr in ['cover', 'cover@2x', 'card', 'card@2x', 'list', 'list@2x', 'slimcover', 'slimcover@2x']:
+                        if hasattr(covers_obj, attr.replace('@', '_')):  # Handle @2x -> _2x
+                            beatmapset_covers[attr] = getattr(covers_obj, attr.replace('@', '_'), None)
+
+            record['beatmapset'] = {
+                'id': getattr(beatmap._beatmapset, 'id', None),
+                'title': getattr(beatmap._beatmapset, 'title', 'Unknown'),
+                'artist': getattr(beatmap._beatmapset, 'artist', 'Unknown'),
+                'creator': getattr(beatmap._beatmapset, 'creator', 'Unknown'),
+                'covers': beatmapset_covers
+            }
+        except Exception as beatmapset_e:
+            print(f"Error processing beatmapset: {beatmapset_e}")
+
+    return record
+
+
+class BeatmapStore:
+    """Beatmap records by id in a SQLite file; one connection per thread and process."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, isolation_level=None, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(SCHEMA)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get_many(self, beatmap_ids):
+        """Stored records for the given ids: {beatmap_id: record}, missing ids left out"""
+        ids = list({int(beatmap_id) for beatmap_id in beatmap_ids})
+        records = {}
+        # Stay under SQLite's bound parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self._connect().execute(
+                f"SELECT beatmap_id, body FROM beatmaps WHERE beatmap_id IN ({','.join('?' * len(chunk))})", chunk)
+            records.update((beatmap_id, json.loads(body)) for beatmap_id, body in rows)
+        return records
+
+    def put(self, beatmap_id, record):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO beatmaps (beatmap_id, body, fetched_at) VALUES (?, ?, ?)",
+            (int(beatmap_id), json.dumps(record, separators=(',', ':')), time.time()))
+
+
+_store = None
+
+
+def get_beatmap_store():
+    """Returns the process-wide beatmap store"""
+    global _store
+    if _store is None:
+        _store = BeatmapStore(BEATMAP_STORE_FILE)
+    return _store
+
+
+def get_beatmaps(beatmap_ids):
+    """Beatmap records for many ids: {beatmap_id: record}. Ids not in the store are fetched
+    with the batch beatmaps lookup (BEATMAPS_BATCH_SIZE per request) and stored; ids the API
+    doesn't return or whose request failed are left out."""
+    store = get_beatmap_store()
+    records = store.get_many(beatmap_ids)
+    missing = [beatmap_id for beatmap_id in dict.fromkeys(int(beatmap_id) for beatmap_id in beatmap_ids)
+               if beatmap_id not in records]
+    for start in range(0, len(missing), BEATMAPS_BATCH_SIZE):
+        batch = missing[start:start + BEATMAPS_BATCH_SIZE]
+        try:
+            beatmaps = api.beatmaps(batch)
+        except Exception as e:
+            print(f"Error calling api.beatmaps({batch}): {e}")
+            continue
+        for beatmap in beatmaps:
+            record = beatmap_record(beatmap)
+            if record is not None and record['id'] in batch:
+                store.put(record['id'], record)
+                records[record['id']] = record
+    return records
+
+
+def get_beatmap(beatmap_id):
+    """Beatmap record for `beatmap_id`, from the store or else fetched from the osu! API and
+    stored. Returns None if the API has no usable beatmap; API errors are raised."""
+    store = get_beatmap_store()
+    record = store.get_many([beatmap_id]).get(int(beatmap_id))
+    if record is None:
+        record = beatmap_record(api.beatmap(beatmap_id))
+        if record is not None:
+            store.put(beatmap_id, record)
+    return record
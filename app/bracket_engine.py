@@ -0,0 +1,736 @@
+"""
+The double-elimination bracket engine.
+
+Every function here works on a tournament state dict (the document kept by
+data_manager) and does no I/O: it updates the state in place and returns it.
+app.bracket_logic wraps these with loading and saving the tournament data, so
+simulations, benchmarks and tests can run any number of bracket operations in
+memory on their own copies.
+
+build_bracket lays out every match of the bracket when it is generated. Each match
+has 'winner_to' and 'loser_to' edges ({'match': id, 'slot': 'player1'/'player2'},
+or None) naming the slot its winner and loser move to, slots not known yet hold a
+TBD placeholder, and BYEs are placed up front. A result then only moves its two
+players along their edges. Brackets generated before the match graph have no edges
+and keep advancing through the pending_upper_losers queue further down.
+"""
+import uuid
+from functools import lru_cache
+from .match_index import iter_matches
+
+
+def build_bracket(data):
+    """Builds the whole bracket from the list of competitors, every round of it up front.
+
+    Upper round 0 is snake-seeded by qualifier placement, then pp, and padded with BYEs
+    to a power of two. Round r + 1 match i takes the winners of round r matches i and
+    m - 1 - i, so the top seeds only meet late. Lower round 0 pairs the round 0 losers
+    the same way; after that each upper round's losers drop in, in reverse order so
+    players don't meet again straight away, against the lower winners, and the next
+    lower round halves the field again. The upper and lower winners meet in the grand
+    finals (with 2 players the upper loser goes straight there).
+
+    A BYE is always player2. A match against a BYE is decided as soon as its player is
+    known, and one between two BYEs is decided here with a BYE winner.
+    """
+    for key in ('pending_upper_losers', 'eliminated', 'settled_lower_rounds', 'bracket_plan'):
+        data.pop(key, None)
+
+    competitors = data.get('competitors', [])
+    if len(competitors) < 2:
+        data['brackets'] = {'upper': [], 'lower': []}
+        return data
+
+    seeded_players = sorted(competitors, key=_seed_key)
+    size = 1 << (len(seeded_players) - 1).bit_length()
+    seeded_players += [_bye() for _ in range(size - len(seeded_players))]
+
+    # (match, source, source): a source is a seeded player or a (match, 'winner'/'loser') pair
+    feeds = []
+
+    def add_round(bracket, rounds, sources):
+        matches = [_new_match(bracket, len(rounds)) for _ in sources]
+        feeds.extend((match, *pair) for match, pair in zip(matches, sources))
+        rounds.append(matches)
+        return matches
+
+    def halve(matches, outcome):
+        m = len(matches)
+        return [((matches[i], outcome), (matches[m - 1 - i], outcome)) for i in range(m // 2)]
+
+    upper, lower = [], []
+    add_round('upper', upper, [(seeded_players[i], seeded_players[size - 1 - i]) for i in range(size // 2)])
+    while len(upper[-1]) > 1:
+        add_round('upper', upper, halve(upper[-1], 'winner'))
+
+    grand_finals = _new_match('grand_finals', 0)
+    grand_finals.update(is_grand_finals=True, is_bracket_reset=False)
+    if len(upper) == 1:
+        feeds.append((grand_finals, (upper[0][0], 'winner'), (upper[0][0], 'loser')))
+    else:
+        add_round('lower', lower, halve(upper[0], 'loser'))
+        for upper_round in upper[1:]:
+            m = len(upper_round)
+            add_round('lower', lower, [((lower[-1][i], 'winner'), (upper_round[m - 1 - i], 'loser'))
+                                       for i in range(m)])
+            if m > 1:
+                add_round('lower', lower, halve(lower[-1], 'winner'))
+        feeds.append((grand_finals, (upper[-1][0], 'winner'), (lower[-1][0], 'winner')))
+
+    # Which outcomes are BYEs is known from the seeding alone: a match's winner is a BYE
+    # only if both its players are, its loser if either of them is
+    bye_outcomes = set()
+    for match, *sources in feeds:
+        def is_bye(source):
+            if isinstance(source, tuple):
+                return (source[0]['id'], source[1]) in bye_outcomes
+            return _is_bye(source)
+        for slot, source in zip(('player1', 'player2'), sorted(sources, key=is_bye)):
+            if isinstance(source, tuple):
+                feeder, outcome = source
+                feeder[outcome + '_to'] = {'match': match['id'], 'slot': slot}
+                match[slot] = _bye() if is_bye(source) else _tbd()
+            else:
+                match[slot] = source
+        if _is_bye(match['player1']):
+            bye_outcomes.update({(match['id'], 'winner'), (match['id'], 'loser')})
+            match.update(winner=_bye(), status='completed')
+        elif _is_bye(match['player2']):
+            bye_outcomes.add((match['id'], 'loser'))
+            if match['player1'].get('id'):
+                match.update(winner=match['player1'], score_p1=4, status='completed')  # Auto-win BYE matches
+        elif match['player1'].get('id') and match['player2'].get('id'):
+            match['status'] = 'next_up'
+
+    data['brackets'] = {'upper': upper, 'lower': lower, 'grand_finals': grand_finals}
+    # Hands out round 0's BYE wins
+    return _advance_graph(data, upper[0])
+
+
+def has_match_graph(data):
+    """Whether `data`'s bracket was built with winner/loser edges (see build_bracket)"""
+    upper = (data.get('brackets') or {}).get('upper') or []
+    return bool(upper and upper[0] and 'winner_to' in upper[0][0])
+
+
+def plan_bracket(num_competitors):
+    """The shape of the bracket for this many competitors: {'upper': [matches per round], 'lower': [...]}."""
+    upper, lower = _planned_rounds(num_competitors)
+    return {'upper': list(upper), 'lower': list(lower)}
+
+
+def bracket_shape(data):
+    """The rounds to show for `data`, in the same form as plan_bracket.
+
+    A generated bracket holds all of its rounds, so its shape is read off the stored
+    matches, whoever joined or left since. Only when nothing is generated yet is it
+    planned from the competitors. Brackets from before the match graph only hold the
+    rounds played so far: they use the plan stored with them, or the shape their first
+    round plays out to.
+    """
+    brackets = data.get('brackets') or {}
+    upper = brackets.get('upper') or []
+    if not upper:
+        return plan_bracket(len(data.get('competitors', [])))
+    if has_match_graph(data):
+        return {'upper': [len(r) for r in upper], 'lower': [len(r) for r in brackets.get('lower') or []]}
+    if data.get('bracket_plan'):
+        return data['bracket_plan']
+    seeded = sum(1 for m in upper[0] for slot in ('player1', 'player2') if (m.get(slot) or {}).get('id'))
+    upper_sizes, lower_sizes = _queue_planned_rounds(seeded)
+    return {'upper': list(upper_sizes), 'lower': list(lower_sizes)}
+
+
+@lru_cache(maxsize=64)
+def _planned_rounds(num_competitors):
+    data = build_bracket({'competitors': [{'id': i, 'name': f'Player {i}'} for i in range(1, num_competitors + 1)]})
+    return (tuple(len(r) for r in data['brackets'].get('upper', [])),
+            tuple(len(r) for r in data['brackets'].get('lower', [])))
+
+
+def advance_bracket(data):
+    """Advances the bracket; tracks and eliminates lower-bracket losers."""
+    if has_match_graph(data):
+        return _advance_graph(data, [match for _, match in iter_matches(data)])
+    return _advance(data, range(len(data['brackets'].get('lower', []))), 0)
+
+
+def apply_match_result(data, match):
+    """Advances the bracket after one match result.
+
+    Gives the same bracket as advance_bracket. In a match graph only the result's own
+    edges are followed. Older brackets only look at what the result can change:
+    eliminations from the lower round the match completes, the latest round of each
+    bracket, and lower rounds whose winners haven't all been placed yet
+    (data['settled_lower_rounds'] counts the lower rounds that are done with). Every
+    completed match has to be applied, as the routes in MatchService do.
+    """
+    if has_match_graph(data):
+        return _advance_graph(data, [match])
+    lower_results = []
+    if match.get('bracket') == 'lower':
+        lower_rounds = data['brackets'].get('lower', [])
+        round_idx = match.get('round_index')
+        if isinstance(round_idx, int) and 0 <= round_idx < len(lower_rounds) and \
+                any(m is match for m in lower_rounds[round_idx]):
+            lower_results = [round_idx]
+        else:
+            # not where its round_index says: fall back to checking every round
+            lower_results = range(len(lower_rounds))
+    return _advance(data, lower_results, data.get('settled_lower_rounds', 0))
+
+
+# --- Match graph ---
+
+def _seed_key(competitor):
+    """Qualifier placement (1 is best), then PP"""
+    return (competitor.get('placement') if competitor.get('placement') is not None else float('inf'),
+            -(competitor.get('pp') or 0))
+
+
+def _bye():
+    return {'name': 'BYE', 'id': None}
+
+
+def _tbd():
+    return {'name': 'TBD', 'id': None}
+
+
+def _is_bye(player):
+    return (player or {}).get('name') == 'BYE' and not player.get('id')
+
+
+def _new_match(bracket, round_index):
+    return {
+        'id': str(uuid.uuid4()),
+        'bracket': bracket,
+        'round_index': round_index,
+        'player1': _tbd(),
+        'player2': _tbd(),
+        'winner': None,
+        'score_p1': 0,
+        'score_p2': 0,
+        'mp_room_url': None,
+        'status': 'waiting',  # next_up once both players are known
+        'winner_to': None,
+        'loser_to': None
+    }
+
+
+def _advance_graph(data, matches):
+    """Moves the players of each decided match in `matches` along its edges, then settles the grand finals"""
+    by_id = {match.get('id'): match for _, match in iter_matches(data)}
+    comps = {c['id']: c for c in data.get('competitors', []) if c.get('id')}
+    for match in matches:
+        if match.get('winner'):
+            _move_players(data, by_id, comps, match)
+    _record_eliminated(data, _finish_grand_finals(data, comps))
+    return data
+
+
+def _move_players(data, by_id, comps, match):
+    winner = match['winner']
+    loser = match['player2'] if winner.get('id') == match['player1'].get('id') else match['player1']
+    for edge, player in ((match.get('winner_to'), winner), (match.get('loser_to'), loser)):
+        if edge and edge.get('match') in by_id:
+            _place(data, by_id, comps, by_id[edge['match']], edge['slot'], player)
+    if match.get('bracket') == 'lower' and not match.get('loser_to'):
+        _eliminate(data, comps, match, winner, loser)
+
+
+def _place(data, by_id, comps, target, slot, player):
+    """Puts `player` in `target`'s slot; a corrected result replaces whoever it put there before"""
+    current = target[slot]
+    if current.get('id') == player.get('id') and current.get('name') == player.get('name'):
+        return
+    if target.get('winner') and not _is_bye(target['player2']):
+        return  # already played: a late correction doesn't rewrite it
+    if not player.get('id'):
+        target[slot] = _bye()
+    else:
+        target[slot] = comps.get(player['id'], player).copy()
+
+    p1, p2 = target['player1'], target['player2']
+    if p1.get('id') and _is_bye(p2):
+        # walkover
+        target.update(winner=p1, score_p1=4, score_p2=0, status='completed')
+        _move_players(data, by_id, comps, target)
+    elif p1.get('id') and p2.get('id') and target.get('status') == 'waiting':
+        target['status'] = 'next_up'
+
+
+def _eliminate(data, comps, match, winner, loser):
+    eliminated = data.get('eliminated', [])
+    # a corrected result takes back the elimination it made before
+    if any(e.get('id') == winner.get('id') and e.get('bracket') == 'lower'
+           and e.get('eliminated_in_round') == match.get('round_index') for e in eliminated):
+        data['eliminated'] = eliminated = [
+            e for e in eliminated
+            if not (e.get('id') == winner.get('id') and e.get('bracket') == 'lower'
+                    and e.get('eliminated_in_round') == match.get('round_index'))]
+    loser_id = loser.get('id')
+    if loser_id and loser_id in comps and all(e.get('id') != loser_id for e in eliminated):
+        e = comps[loser_id].copy()
+        e.update({'status': 'eliminated', 'eliminated_in_round': match.get('round_index'), 'bracket': 'lower'})
+        data.setdefault('eliminated', []).append(e)
+
+
+def _finish_grand_finals(data, comps):
+    """Plays out a decided grand finals: the bracket reset when the lower bracket winner takes
+    the first match, otherwise the runner-up's elimination. Returns the newly eliminated."""
+    eliminated = []
+    gf = data['brackets'].get('grand_finals')
+    if not gf or not gf.get('winner'):
+        return eliminated
+    if gf.get('is_bracket_reset'):
+        # Second grand finals match is complete - eliminate the loser
+        winner_id = gf['winner']['id']
+        loser = gf['player1'] if winner_id == gf['player2']['id'] else gf['player2']
+        if loser.get('id') and loser['id'] in comps:
+            e = comps[loser['id']].copy()
+            e.update({
+                'status': 'eliminated',
+                'eliminated_in_round': 'grand_finals',
+                'bracket': 'grand_finals',
+                'placement': 2  # Runner-up
+            })
+            eliminated.append(e)
+    # If lower bracket winner won the first grand finals match
+    elif gf['winner']['id'] == gf['player2']['id']:
+        # Bracket reset! Create second grand finals match
+        data['brackets']['grand_finals'] = {
+            'id': str(uuid.uuid4()),
+            'bracket': 'grand_finals',
+            'round_index': 1,
+            'player1': gf['player1'],  # Upper bracket winner gets another chance
+            'player2': gf['player2'],  # Lower bracket winner
+            'winner': None,
+            'is_grand_finals': True,
+            'is_bracket_reset': True,
+            'previous_gf': gf,  # Store the first match for reference
+            'score_p1': 0,
+            'score_p2': 0,
+            'mp_room_url': None,
+            'status': 'next_up'
+        }
+    # If upper bracket winner won, tournament is over - eliminate the lower bracket finalist
+    else:
+        lower_bracket_finalist = gf['player2']
+        if lower_bracket_finalist.get('id') and lower_bracket_finalist['id'] in comps:
+            e = comps[lower_bracket_finalist['id']].copy()
+            e.update({
+                'status': 'eliminated',
+                'eliminated_in_round': 'grand_finals',
+                'bracket': 'grand_finals',
+                'placement': 2  # Runner-up
+            })
+            eliminated.append(e)
+    return eliminated
+
+
+def _record_eliminated(data, eliminated):
+    if eliminated:
+        data.setdefault('eliminated', [])
+        # Avoid duplicates
+        existing_ids = {e['id'] for e in data['eliminated']}
+        new_eliminated = [e for e in eliminated if e['id'] not in existing_ids]
+        data['eliminated'].extend(new_eliminated)
+
+
+# --- Brackets generated before the match graph ---
+
+@lru_cache(maxsize=64)
+def _queue_planned_rounds(num_competitors):
+    """Round sizes of an edge-less bracket for this many competitors, found by playing a
+    copy to the end in memory with each round finishing before the next starts"""
+    data = _seed_bracket({'competitors': [{'id': i, 'name': f'Player {i}'} for i in range(1, num_competitors + 1)]})
+    while True:
+        rounds = data['brackets'].get('upper', []) + data['brackets'].get('lower', [])
+        matches = [m for r in rounds for m in r]
+        if data['brackets'].get('grand_finals'):
+            matches.append(data['brackets']['grand_finals'])
+        pending = [m for m in matches if not m.get('winner') and m['player1'].get('id') and m['player2'].get('id')]
+        if not pending:
+            break
+        for match in pending:
+            match['winner'] = match['player1']
+        advance_bracket(data)
+    return (tuple(len(r) for r in data['brackets'].get('upper', [])),
+            tuple(len(r) for r in data['brackets'].get('lower', [])))
+
+
+def _seed_bracket(data):
+    """Seeds the first upper round of an edge-less bracket, resetting any in-flight state."""
+    # full‐reset of any in-flight state
+    data.pop('pending_upper_losers', None)
+    data.pop('eliminated', None)
+
+    competitors = data.get('competitors', [])
+    num_competitors = len(competitors)
+    
+    if num_competitors < 2:
+        data['brackets'] = {'upper': [], 'lower': []}
+        return data
+
+    seeded_players = sorted(competitors, key=_seed_key)
+
+    # pad to power of two
+    next_pow2 = 1 << (num_competitors - 1).bit_length()
+    for _ in range(next_pow2 - num_competitors):
+        seeded_players.append({'name': 'BYE', 'id': None})
+
+    # snake‐seed
+    half = len(seeded_players)//2
+    top, bottom = seeded_players[:half], list(reversed(seeded_players[half:]))
+
+    # round 0, upper bracket
+    matches = []
+    for i, (p1, p2) in enumerate(zip(top, bottom)):
+        match = {
+            'id': str(uuid.uuid4()),
+            'bracket': 'upper',
+            'round_index': 0,
+            'player1': p1,
+            'player2': p2,
+            'winner': p1 if p2.get('name')=='BYE' else None,
+            'score_p1': 4 if p2.get('name')=='BYE' else 0,  # Auto-win BYE matches
+            'score_p2': 0,
+            'mp_room_url': None,
+            'status': 'completed' if p2.get('name')=='BYE' else 'next_up'  # BYEs are auto-completed
+        }
+        matches.append(match)
+
+    data['brackets'] = {'upper': [matches], 'lower': []}
+    # Clean up old state
+    for key in ['grand_finals', 'pending_upper_losers', 'eliminated', 'settled_lower_rounds']:
+        data.pop(key, None)
+    return data
+
+
+def _latest_lower_rounds(lower_rounds, first_round=0):
+    """Maps each player id in lower rounds from `first_round` on to the last round it was placed in"""
+    latest = {}
+    for round_idx in range(first_round, len(lower_rounds)):
+        for match in lower_rounds[round_idx]:
+            for slot in ('player1', 'player2'):
+                player_id = (match.get(slot) or {}).get('id')
+                if player_id:
+                    latest[player_id] = round_idx
+    return latest
+
+
+def _advance(data, lower_results, first_open_round):
+    """Shared by both entry points: eliminates the losers of the completed lower rounds in
+    `lower_results` and only looks for unplaced lower winners from `first_open_round` on."""
+    # build a lookup for competitors
+    comps = {c['id']: c for c in data.get('competitors', []) if c.get('id')}
+
+    # persistent queue of upper-bracket losers awaiting a lower-bracket match
+    data.setdefault('pending_upper_losers', [])
+
+    # membership indexes, built once and kept current as players move
+    pending_ids = {p.get('id') for p in data['pending_upper_losers']}
+    # (settled rounds' players are all eliminated, pending or placed in a later round)
+    latest_lower_round = _latest_lower_rounds(data['brackets'].get('lower', []), first_open_round)
+
+    eliminated = []
+    eliminated_ids = set()
+    upper_advanced = False
+
+    # --- Upper Bracket ---
+    if data['brackets'].get('upper'):
+        ui = len(data['brackets']['upper']) - 1
+        ur = data['brackets']['upper'][ui]
+        if all(m.get('winner') for m in ur):
+            upper_advanced = True
+            win_ids = [m['winner']['id'] for m in ur if m['winner'].get('id')]
+
+            # collect this round's upper losers (skip BYEs)
+            previously_eliminated_ids = {e.get('id') for e in data.get('eliminated', [])}
+            current_losers = []
+            for m in ur:
+                if not m.get('winner'):
+                    continue
+                p1_id = m['player1'].get('id') if m.get('player1') else None
+                p2_id = m['player2'].get('id') if m.get('player2') else None
+                winner_id = m['winner']['id']
+                
+                loser_id = p2_id if winner_id == p1_id else p1_id
+                if loser_id and loser_id in comps:
+                    l = comps[loser_id].copy()
+                    l.update({'dropped_from_round': ui, 'bracket': 'upper'})
+                    
+                    # Skip losers already processed (pending, in the lower bracket or eliminated)
+                    already_processed = (loser_id in pending_ids or loser_id in latest_lower_round
+                                         or loser_id in previously_eliminated_ids)
+                    
+                    if not already_processed:
+                        current_losers.append(l)
+
+            # enqueue them
+            data['pending_upper_losers'].extend(current_losers)
+            pending_ids.update(l['id'] for l in current_losers)
+
+            if len(win_ids) > 1:
+                # build next upper
+                wins = [comps[w].copy() for w in win_ids if w in comps]
+                wins.sort(key=lambda p: -(p.get('pp') or 0))
+                # pad & snake
+                np2 = 1 << (len(wins)-1).bit_length() if wins else 2
+                for _ in range(max(0, np2 - len(wins))):
+                    wins.append({'name':'BYE','id':None})
+                h = len(wins)//2
+                top, bot = wins[:h], list(reversed(wins[h:]))
+                nxt = []
+                for p1,p2 in zip(top,bot):
+                    match = {
+                        'id': str(uuid.uuid4()),
+                        'bracket': 'upper',
+                        'round_index': ui+1,
+                        'player1': p1,
+                        'player2': p2,
+                        'winner': p1 if p2.get('name')=='BYE' else None,
+                        'score_p1': 4 if p2.get('name')=='BYE' else 0,
+                        'score_p2': 0,
+                        'mp_room_url': None,
+                        'status': 'completed' if p2.get('name')=='BYE' else 'next_up'
+                    }
+                    nxt.append(match)
+                data['brackets']['upper'].append(nxt)
+
+    # --- Lower Bracket ---
+    lower_advanced = False
+    if data['brackets'].get('lower'):
+        # Check the given completed lower bracket rounds for eliminations, not just the latest
+        for li in lower_results:
+            lr = data['brackets']['lower'][li]
+            if all(m.get('winner') for m in lr):
+                # This round is complete - check for eliminations
+                for m in lr:
+                    if not m.get('winner'):
+                        continue
+                    winner_id = m['winner']['id']
+                    p1_id = m['player1'].get('id') if m.get('player1') else None
+                    p2_id = m['player2'].get('id') if m.get('player2') else None
+                    
+                    loser_id = p2_id if winner_id == p1_id else p1_id
+                    if loser_id and loser_id in comps:
+                        # Check if this player is already eliminated
+                        if loser_id not in eliminated_ids:
+                            e = comps[loser_id].copy()
+                            e.update({
+                                'status': 'eliminated',
+                                'eliminated_in_round': li,
+                                'bracket': 'lower'
+                            })
+                            eliminated.append(e)
+                            eliminated_ids.add(loser_id)
+        
+        # Check if the latest round is complete and needs advancement
+        li = len(data['brackets']['lower']) - 1
+        lr = data['brackets']['lower'][li]
+        if all(m.get('winner') for m in lr):
+            lower_advanced = True
+
+    # --- Build next lower only if either bracket advanced ---
+    if upper_advanced or lower_advanced:
+        wins_lower = []
+        if lower_advanced and data['brackets'].get('lower'):
+            # Get winners from ALL completed lower bracket rounds that haven't been processed
+            lower_rounds = data['brackets']['lower']
+            for round_idx in range(first_open_round, len(lower_rounds)):
+                round_matches = lower_rounds[round_idx]
+                if all(m.get('winner') for m in round_matches):
+                    for m in round_matches:
+                        if m.get('winner') and m['winner'].get('id'):
+                            winner = m['winner'].copy()
+                            winner_id = winner['id']
+                            
+                            # Skip winners already placed in a later round or waiting in pending
+                            already_processed = (latest_lower_round.get(winner_id, -1) > round_idx
+                                                 or winner_id in pending_ids)
+                            
+                            if not already_processed:
+                                # Ensure we have the full competitor data
+                                if winner['id'] in comps:
+                                    comp_data = comps[winner['id']].copy()
+                                    comp_data.update(winner)
+                                    wins_lower.append(comp_data)
+                                else:
+                                    wins_lower.append(winner)
+
+            # the winners of every completed round are placed below (or left pending) now
+            settled = first_open_round
+            while settled < len(lower_rounds) and all(m.get('winner') for m in lower_rounds[settled]):
+                settled += 1
+            data['settled_lower_rounds'] = settled
+
+        # now combine all waiting upper losers + new lower winners
+        pool = wins_lower + data['pending_upper_losers']
+
+        # Remove eliminated players and dedupe
+        pool = [p for p in pool if p.get('id') and p['id'] not in eliminated_ids]
+
+        # dedupe by competitor id
+        unique = {}
+        for p in pool:
+            pid = p.get('id')
+            if pid and pid not in unique:
+                unique[pid] = p
+        pool = list(unique.values())
+
+        if len(pool) >= 2:
+            current_lower_rounds = data['brackets'].get('lower', [])
+            completed_round_index = len(current_lower_rounds) - 1  # Most recent round that just completed
+            next_round_index = completed_round_index + 1  # Where the next round should be
+            
+            # Check if the next lower round already exists (happens when upper bracket was completed first)
+            if next_round_index < len(current_lower_rounds):
+                # Next round already exists - we need to update it with the correct players
+                existing_round = current_lower_rounds[next_round_index]
+                
+                # Sort pool for fair matchups
+                pool.sort(key=lambda p: (p.get('dropped_from_round', 999), -(p.get('pp') or 0)))
+                
+                # Pad & snake
+                np2 = 1 << (len(pool)-1).bit_length()
+                for _ in range(np2 - len(pool)):
+                    pool.append({'name':'BYE','id':None})
+                half = len(pool)//2
+                top, bot = pool[:half], list(reversed(pool[half:]))
+                
+                # Update existing matches with correct players
+                for i, (p1, p2) in enumerate(zip(top, bot)):
+                    if i < len(existing_round):
+                        match = existing_round[i]
+                        match['player1'] = p1
+                        match['player2'] = p2
+                        match['winner'] = p1 if p2.get('name')=='BYE' else None
+                        match['score_p1'] = 4 if p2.get('name')=='BYE' else 0
+                        match['score_p2'] = 0
+                        match['status'] = 'completed' if p2.get('name')=='BYE' else 'next_up'
+                    else:
+                        # Add new match if needed
+                        match = {
+                            'id': str(uuid.uuid4()),
+                            'bracket': 'lower',
+                            'round_index': next_round_index,
+                            'player1': p1,
+                            'player2': p2,
+                            'winner': p1 if p2.get('name')=='BYE' else None,
+                            'score_p1': 4 if p2.get('name')=='BYE' else 0,
+                            'score_p2': 0,
+                            'mp_room_url': None,
+                            'status': 'completed' if p2.get('name')=='BYE' else 'next_up'
+                        }
+                        existing_round.append(match)
+            else:
+                # Create new round as normal
+                # Sort for fair matchups
+                pool.sort(key=lambda p: (p.get('dropped_from_round', 999), -(p.get('pp') or 0)))
+                
+                # pad & snake
+                np2 = 1 << (len(pool)-1).bit_length()
+                for _ in range(np2 - len(pool)):
+                    pool.append({'name':'BYE','id':None})
+                half = len(pool)//2
+                top, bot = pool[:half], list(reversed(pool[half:]))
+                nxt = []
+                for p1, p2 in zip(top, bot):
+                    match = {
+                        'id': str(uuid.uuid4()),
+                        'bracket': 'lower',
+                        'round_index': len(data['brackets'].get('lower', [])),
+                        'player1': p1,
+                        'player2': p2,
+                        'winner': p1 if p2.get('name')=='BYE' else None,
+                        'score_p1': 4 if p2.get('name')=='BYE' else 0,
+                        'score_p2': 0,
+                        'mp_room_url': None,
+                        'status': 'completed' if p2.get('name')=='BYE' else 'next_up'
+                    }
+                    nxt.append(match)
+
+                data['brackets'].setdefault('lower', []).append(nxt)
+
+            # remove those just matched from the pending queue
+            if 'nxt' in locals():
+                matched_ids = {
+                    m['player1']['id'] for m in nxt if m['player1'].get('id')
+                } | {
+                    m['player2']['id'] for m in nxt if m['player2'].get('id')
+                }
+                data['pending_upper_losers'] = [
+                    p for p in data['pending_upper_losers']
+                    if p.get('id') not in matched_ids
+                ]
+                pending_ids -= matched_ids
+            elif next_round_index < len(current_lower_rounds):
+                # If we updated an existing round, clean up pending queue
+                existing_round = current_lower_rounds[next_round_index]
+                matched_ids = {
+                    m['player1']['id'] for m in existing_round if m['player1'].get('id')
+                } | {
+                    m['player2']['id'] for m in existing_round if m['player2'].get('id')
+                }
+                data['pending_upper_losers'] = [
+                    p for p in data['pending_upper_losers']
+                    if p.get('id') not in matched_ids
+                ]
+                pending_ids -= matched_ids
+        elif len(pool) == 1:
+            # Special case: only one player left in lower bracket pool
+            # This happens when one lower round completes but we need to wait for another round
+            # Store the single player in pending_upper_losers temporarily (they'll be picked up later)
+            single_player = pool[0]
+            if single_player.get('id'):
+                # Check if this player is already in pending (by ID to avoid duplicates)
+                if single_player['id'] not in pending_ids:
+                    data['pending_upper_losers'].append(single_player)
+                    pending_ids.add(single_player['id'])
+
+    # --- Grand Finals ---
+    upper_w, lower_w = None, None
+    
+    # Get upper bracket winner
+    if data['brackets'].get('upper'):
+        fu = data['brackets']['upper'][-1]
+        if len(fu)==1 and fu[0].get('winner'):
+            upper_w = fu[0]['winner']
+    
+    # Get lower bracket winner - check for single final lower bracket match OR single remaining player
+    if data['brackets'].get('lower'):
+        fl = data['brackets']['lower'][-1]
+        if len(fl)==1 and fl[0].get('winner'):
+            lower_w = fl[0]['winner']
+    elif len(data.get('pending_upper_losers', [])) == 1 and upper_w and not data['brackets'].get('lower'):
+        # Special case: only one player left in pending and no lower bracket exists
+        # This happens in 2-player tournaments after the first upper bracket match
+        lower_w = data['pending_upper_losers'][0]
+        data['pending_upper_losers'] = []  # Clear since they're now in grand finals
+    
+    # Create initial grand finals if both winners are ready
+    if upper_w and lower_w and 'grand_finals' not in data['brackets']:
+        data['brackets']['grand_finals'] = {
+            'id': str(uuid.uuid4()),
+            'bracket': 'grand_finals',
+            'round_index': 0,
+            'player1': upper_w,
+            'player2': lower_w,
+            'winner': None,
+            'is_grand_finals': True,
+            'is_bracket_reset': False,
+            'score_p1': 0,
+            'score_p2': 0,
+            'mp_room_url': None,
+            'status': 'next_up'
+        }
+    
+    # Handle bracket reset scenario
+    elif 'grand_finals' in data['brackets']:
+        eliminated.extend(_finish_grand_finals(data, comps))
+
+    # --- Persist eliminated list ---
+    _record_eliminated(data, eliminated)
+
+    return data
\ No newline at end of file
@@ -0,0 +1,472 @@
+"""
+Monte Carlo predictions for the current bracket.
+
+The rest of the bracket is played out many times at once: each simulation is a row
+of NumPy arrays, so a match costs a few array operations over all simulations
+rather than a Python loop per simulation. In a bracket built as a match graph
+(app.bracket_engine.build_bracket) every match is fed by fixed winner/loser edges, so
+each one is played once in round order. Brackets from before the match graph follow
+the engine's queue instead (upper rounds reseeded by pp, lower rounds paired from the
+pool sorted by the round players dropped from, then pp), assuming every round
+finishes before the next one is paired. Match win chances come from a rating built
+from pp, qualifier placement and seeding score.
+"""
+import hashlib
+import json
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, namedtuple
+from config import PREDICTION_SIMULATIONS, PREDICTION_RATING_SCALE
+from .bracket_engine import has_match_graph
+
+try:
+    import numpy as np
+except ImportError:  # predictions are optional; without numpy the endpoint says they're unavailable
+    np = None
+
+PREDICTION_CACHE_SIZE = 8
+
+# Engine default for players without a drop round (bracket_engine sorts them last)
+NO_DROP_ROUND = 999
+
+# One round in every simulation: (S, matches) arrays of both players (-1 for a BYE or an
+# empty slot), the rounds they dropped from the upper bracket, and winners (-1 while open)
+_Round = namedtuple('_Round', ['p1', 'p2', 'd1', 'd2', 'winners'])
+
+_cache = OrderedDict()  # (bracket version, simulations) -> predictions
+_cache_lock = threading.Lock()
+
+
+def predictions_available():
+    return np is not None
+
+
+def player_ratings(players):
+    """Rating in [0, 1] per player: the mean of their percentiles by pp, qualifier placement
+    and seeding score, over whichever of those they have (0.5 with none of them)"""
+    totals = [0.0] * len(players)
+    counts = [0] * len(players)
+    for key, sign in (('pp', 1), ('placement', -1), ('seeding_score', 1)):
+        have = [(i, sign * player[key]) for i, player in enumerate(players)
+                if isinstance(player.get(key), (int, float)) and not isinstance(player.get(key), bool)]
+        if len(have) < 2:
+            continue
+        values = sorted(value for _, value in have)
+        for i, value in have:
+            below = bisect_left(values, value)
+            ties = bisect_right(values, value) - below
+            totals[i] += (below + (ties - 1) / 2) / (len(values) - 1)
+            counts[i] += 1
+    return [total / count if count else 0.5 for total, count in zip(totals, counts)]
+
+
+def bracket_version(data):
+    """Changes when anything the predictions depend on changes (pairings, results, ratings),
+    but not on scores of matches still being played"""
+    def pid(player):
+        return (player or {}).get('id')
+
+    def match_key(match):
+        return [pid(match.get('player1')), pid(match.get('player2')), pid(match.get('winner'))]
+
+    brackets = data.get('brackets') or {}
+    gf = brackets.get('grand_finals')
+    state = {
+        'competitors': [[c.get('id'), c.get('pp'), c.get('placement'), c.get('seeding_score')]
+                        for c in data.get('competitors', [])],
+        'upper': [[match_key(m) for m in r] for r in brackets.get('upper') or []],
+        'lower': [[match_key(m) for m in r] for r in brackets.get('lower') or []],
+        'pending': [pid(p) for p in data.get('pending_upper_losers', [])],
+        'grand_finals': match_key(gf) + [bool(gf.get('is_bracket_reset'))] if gf else None,
+    }
+    return hashlib.blake2b(json.dumps(state, default=str).encode(), digest_size=12).hexdigest()
+
+
+def get_predictions(data, simulations=PREDICTION_SIMULATIONS):
+    """Predictions for `data`, simulated once per bracket version and number of simulations"""
+    key = (bracket_version(data), simulations)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    predictions = dict(simulate_bracket(data, simulations), version=key[0])
+    with _cache_lock:
+        _cache[key] = predictions
+        while len(_cache) > PREDICTION_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return predictions
+
+
+def simulate_bracket(data, simulations=PREDICTION_SIMULATIONS, seed=None):
+    """Plays the rest of the bracket `simulations` times. Returns {'simulations', 'players'},
+    players sorted by chance to win, each with 'win', 'grand_finals' and the chance of
+    reaching each 'upper' and 'lower' round (rounds already played count as 1 or 0)."""
+    if np is None:
+        raise RuntimeError('Predictions need numpy installed')
+    simulation = _GraphSimulation if has_match_graph(data) else _Simulation
+    return simulation(data, simulations, np.random.default_rng(seed)).run()
+
+
+class _Players:
+    """Shared by both simulations: players are indexes into self.players, -1 for a BYE or an empty slot."""
+
+    def __init__(self, data, simulations, rng):
+        self.rng = rng
+        self.S = simulations
+        self.players = []
+        self.index = {}
+        for competitor in data.get('competitors', []):
+            self._player(competitor)
+
+    def _player(self, player):
+        player_id = (player or {}).get('id')
+        if not player_id:
+            return -1
+        if player_id not in self.index:
+            self.index[player_id] = len(self.players)
+            self.players.append(player)
+        return self.index[player_id]
+
+    def _rate(self):
+        """Win chances once every player has an index"""
+        self.n = len(self.players)
+        ratings = np.array(player_ratings(self.players))
+        with np.errstate(over='ignore'):  # a steep scale saturates the chance at 0 or 1
+            chance = 1 / (1 + np.exp(-PREDICTION_RATING_SCALE * (ratings[:, None] - ratings[None, :])))
+        self.win_chance = chance.astype(np.float32).ravel()  # [a * n + b]: chance a beats b
+
+    def _count(self, *player_arrays):
+        counts = np.zeros(self.n + 1)
+        for players in player_arrays:
+            counts += np.bincount(players.ravel() + 1, minlength=self.n + 1)
+        return counts[1:]
+
+    def _results(self, upper_reach, lower_reach, gf_reach, champion):
+        results = []
+        for i, player in enumerate(self.players):
+            results.append({
+                'id': player.get('id'),
+                'name': player.get('name'),
+                'win': round(float(champion[i]) / self.S, 4),
+                'grand_finals': round(float(gf_reach[i]) / self.S, 4),
+                'upper': [round(float(reach[i]) / self.S, 4) for reach in upper_reach],
+                'lower': [round(float(reach[i]) / self.S, 4) for reach in lower_reach],
+            })
+        results.sort(key=lambda r: (-r['win'], -r['grand_finals'], r['name'] or ''))
+        return {'simulations': self.S, 'players': results}
+
+
+class _GraphSimulation(_Players):
+    """A match graph bracket: each match's players come from its stored slots or, while
+    those are TBD, from the winner or loser arrays of the match whose edge feeds them."""
+
+    def __init__(self, data, simulations, rng):
+        super().__init__(data, simulations, rng)
+        brackets = data.get('brackets') or {}
+        self.rounds = {bracket: brackets.get(bracket) or [] for bracket in ('upper', 'lower')}
+        gf = brackets.get('grand_finals')
+        # The first grand finals match, and the bracket reset once there is one
+        self.reset = gf if gf and gf.get('is_bracket_reset') else None
+        self.gf = gf.get('previous_gf') if self.reset else gf
+
+        self.feeds = {}  # (match id, slot) -> (id of the match feeding it, 'winner'/'loser')
+        for match in [m for r in self.rounds['upper'] + self.rounds['lower'] for m in r]:
+            for outcome in ('winner', 'loser'):
+                edge = match.get(outcome + '_to')
+                if edge:
+                    self.feeds[(edge['match'], edge['slot'])] = (match.get('id'), outcome)
+            self._player(match.get('player1'))
+            self._player(match.get('player2'))
+        for match in (self.gf, self.reset):
+            if match:
+                self._player(match.get('player1'))
+                self._player(match.get('player2'))
+        self._rate()
+        self.outcomes = {}  # (match id, 'winner'/'loser') -> (S,) players
+
+    def _slot(self, match, slot):
+        player = match.get(slot) or {}
+        if player.get('id') or player.get('name') == 'BYE':
+            return np.full(self.S, self._player(player), dtype=np.int32)
+        feed = self.feeds.get((match.get('id'), slot))
+        if feed in self.outcomes:
+            return self.outcomes[feed]
+        return np.full(self.S, -1, dtype=np.int32)
+
+    def _decide(self, match, p1, p2):
+        """Winners of `match` in every simulation: the stored one, a walkover, or a draw"""
+        if match.get('winner'):
+            return np.full(self.S, self._player(match['winner']), dtype=np.int32)
+        chance = self.win_chance[np.maximum(p1, 0) * self.n + np.maximum(p2, 0)]
+        p1_wins = (p2 < 0) | ((p1 >= 0) & (self.rng.random(self.S, dtype=np.float32) < chance))
+        return np.where(p1_wins, p1, p2).astype(np.int32)
+
+    def _play(self, match):
+        p1, p2 = self._slot(match, 'player1'), self._slot(match, 'player2')
+        winners = self._decide(match, p1, p2)
+        self.outcomes[(match.get('id'), 'winner')] = winners
+        self.outcomes[(match.get('id'), 'loser')] = np.where(winners == p1, p2, p1)
+        return p1, p2, winners
+
+    def run(self):
+        reach = {'upper': [], 'lower': []}
+        for bracket in ('upper', 'lower'):
+            for round_matches in self.rounds[bracket]:
+                counts = np.zeros(self.n)
+                for match in round_matches:
+                    p1, p2, _ = self._play(match)
+                    counts += self._count(p1, p2)
+                reach[bracket].append(counts)
+
+        gf_reach = np.zeros(self.n)
+        champion = np.zeros(self.n)
+        if self.gf and self.n >= 2:
+            p1, p2, first = self._play(self.gf)
+            gf_reach = self._count(p1, p2)
+            # The lower bracket winner taking the first match forces the reset
+            reset = (first == p2) & (p2 >= 0)
+            second = self._decide(self.reset or {}, p1, p2)
+            winners = np.where(reset, second, first)
+            champion = np.bincount(winners[winners >= 0], minlength=self.n).astype(float)
+        return self._results(reach['upper'], reach['lower'], gf_reach, champion)
+
+
+class _Simulation(_Players):
+    """A bracket from before the match graph, paired round by round like the engine's queue."""
+
+    def __init__(self, data, simulations, rng):
+        super().__init__(data, simulations, rng)
+        brackets = data.get('brackets') or {}
+        upper_rounds = brackets.get('upper') or []
+        lower_rounds = brackets.get('lower') or []
+        pending = [p for p in data.get('pending_upper_losers', []) if p.get('id')]
+        gf = brackets.get('grand_finals')
+
+        # Every id in the bracket gets an index before the rating arrays are built
+        for player in pending:
+            self._player(player)
+        for match in [m for r in upper_rounds + lower_rounds for m in r] + ([gf] if gf else []):
+            self._player(match.get('player1'))
+            self._player(match.get('player2'))
+
+        self._rate()
+        n = self.n
+        # Pools are sorted as packed keys (drop round << bits | pp rank), which decode back
+        # to the player. bracket_engine sorts by -(pp or 0), earlier player first on ties.
+        self.bits = max(n, 1).bit_length()
+        self.by_pp = np.array(sorted(range(n), key=lambda i: -(self.players[i].get('pp') or 0)), dtype=np.int32)
+        self.pp_rank = np.empty(n, dtype=np.int32)
+        self.pp_rank[self.by_pp] = np.arange(n, dtype=np.int32)
+
+        self.upper_reach = [self._fixed_reach(r) for r in upper_rounds]
+        self.lower_reach = [self._fixed_reach(r) for r in lower_rounds]
+        self.gf_reach = np.zeros(n)
+        self.champion = np.zeros(n)
+
+        # Upper: the latest round is (re)processed first, like the engine does
+        self.upper = self._round(upper_rounds[-1]) if upper_rounds else None
+        self.upper_round = len(upper_rounds) - 1
+        self.upper_done = not upper_rounds
+        self.upper_winner = None
+        placed = self._placed_ids(lower_rounds, pending, data.get('eliminated', []))
+        self.queue_loser = [not (match.get('winner') and self._loser_id(match) in placed)
+                            for match in (upper_rounds[-1] if upper_rounds else [])]
+
+        # Upper losers waiting for a lower match
+        self.pending = self._tile([self.index[p['id']] for p in pending])
+        self.pending_drop = self._tile([p.get('dropped_from_round', NO_DROP_ROUND) for p in pending])
+
+        # Lower: every open match in any round is played first; the winners the engine
+        # hasn't placed yet are collected in round order on the first step
+        self.lower = self._round(lower_rounds[-1]) if lower_rounds else None
+        self.lower_rounds = len(lower_rounds)
+        self.lower_fresh = False
+        self.older_lower = [self._round(r) for r in lower_rounds[:-1]]
+        self.first_collect = self._unplaced_lower_winners(lower_rounds, pending)
+
+        # Grand finals: stage 0 none, 1 first match, 2 bracket reset, 3 decided
+        self.gf = None
+        self.gf_stage = np.zeros(self.S, dtype=np.int8)
+        if gf:
+            self.gf = self._round([gf])
+            self.gf_stage[:] = 2 if gf.get('is_bracket_reset') else 1
+            self.gf_reach += self._fixed_reach([gf])
+
+    # --- Setup helpers ---
+
+    def _loser_id(self, match):
+        winner_id = match['winner'].get('id')
+        p1_id = (match.get('player1') or {}).get('id')
+        p2_id = (match.get('player2') or {}).get('id')
+        return p2_id if winner_id == p1_id else p1_id
+
+    def _placed_ids(self, lower_rounds, pending, eliminated):
+        placed = {p.get('id') for p in pending} | {e.get('id') for e in eliminated}
+        for round_matches in lower_rounds:
+            for match in round_matches:
+                placed.add((match.get('player1') or {}).get('id'))
+                placed.add((match.get('player2') or {}).get('id'))
+        return placed
+
+    def _tile(self, values):
+        """(S, len(values)) array with `values` in every row"""
+        return np.tile(np.array(values, dtype=np.int32), (self.S, 1))
+
+    def _round(self, matches):
+        """A stored round, the same in every simulation"""
+        def drop(match, slot):
+            return (match.get(slot) or {}).get('dropped_from_round', NO_DROP_ROUND)
+        return _Round(self._tile([self._player(m.get('player1')) for m in matches]),
+                      self._tile([self._player(m.get('player2')) for m in matches]),
+                      self._tile([drop(m, 'player1') for m in matches]),
+                      self._tile([drop(m, 'player2') for m in matches]),
+                      self._tile([self._player(m.get('winner')) if m.get('winner') else -1 for m in matches]))
+
+    def _fixed_reach(self, matches):
+        reach = np.zeros(self.n)
+        for match in matches:
+            for slot in ('player1', 'player2'):
+                if (match.get(slot) or {}).get('id'):
+                    reach[self.index[match[slot]['id']]] = self.S
+        return reach
+
+    def _unplaced_lower_winners(self, lower_rounds, pending):
+        """(round, match) of the lower matches whose winners the engine would still collect:
+        open ones, and decided ones whose winner isn't in a later round or pending"""
+        pending_ids = {p.get('id') for p in pending}
+        later_ids = set()
+        collect = []
+        for round_idx in range(len(lower_rounds) - 1, -1, -1):
+            round_ids = set()
+            for slot, match in reversed(list(enumerate(lower_rounds[round_idx]))):
+                winner_id = (match.get('winner') or {}).get('id')
+                if not match.get('winner') or (winner_id not in later_ids and winner_id not in pending_ids):
+                    collect.append((round_idx, slot))
+                round_ids.update((match.get(s) or {}).get('id') for s in ('player1', 'player2'))
+            later_ids |= round_ids
+        return collect[::-1]
+
+    # --- Simulation ---
+
+    def _play(self, game):
+        """Decides every open match of a round in every simulation"""
+        p1, p2, winners = game.p1, game.p2, game.winners
+        open_matches = (winners < 0) & (p1 >= 0) & (p2 >= 0)
+        if open_matches.any():
+            # Decided matches may index with a BYE's -1; their draw is thrown away
+            chance = self.win_chance[p1 * self.n + p2]
+            p1_wins = self.rng.random(p1.shape, dtype=np.float32) < chance
+            np.copyto(winners, np.where(p1_wins, p1, p2), where=open_matches)
+
+    def _winner_drops(self, game):
+        return np.where(game.winners == game.p1, game.d1, game.d2)
+
+    def _pair(self, keys):
+        """Snake-pairs a pool of packed keys (sorted here), padded with BYEs to a power of two"""
+        keys = np.sort(keys, axis=1)
+        k = keys.shape[1]
+        size = 1 << (k - 1).bit_length()
+        half = size // 2
+        players = self.by_pp[keys & ((1 << self.bits) - 1)]
+        drops = keys >> self.bits
+        # Top half against the bottom half reversed, so the best seeds get the BYEs
+        p2 = np.full((self.S, half), -1, dtype=np.int32)
+        d2 = np.full((self.S, half), NO_DROP_ROUND, dtype=np.int32)
+        p2[:, size - k:] = players[:, :half - 1:-1]
+        d2[:, size - k:] = drops[:, :half - 1:-1]
+        p1 = players[:, :half]
+        winners = np.where(p2 < 0, p1, -1).astype(np.int32)
+        return _Round(p1, p2, drops[:, :half], d2, winners)
+
+    def _advance_upper(self):
+        game = self.upper
+        losers = np.where(game.winners == game.p1, game.p2, game.p1)
+        queued = [slot for slot, queue in enumerate(self.queue_loser) if queue and losers[0, slot] >= 0]
+        if queued:
+            self.pending = np.concatenate([self.pending, losers[:, queued]], axis=1)
+            self.pending_drop = np.concatenate(
+                [self.pending_drop, np.full((self.S, len(queued)), self.upper_round, dtype=np.int32)], axis=1)
+        if game.winners.shape[1] > 1:
+            self.upper = self._pair((NO_DROP_ROUND << self.bits) | self.pp_rank[game.winners])
+            self.upper_round += 1
+            self.queue_loser = [True] * self.upper.p1.shape[1]
+            self.upper_reach.append(self._count(self.upper.p1, self.upper.p2))
+        else:
+            self.upper_done = True
+            self.upper_winner = game.winners[:, 0]
+
+    def _advance_lower(self, collected, collected_drops):
+        pool = np.concatenate(collected + [self.pending], axis=1)
+        pool_drops = np.concatenate(collected_drops + [self.pending_drop], axis=1)
+        if pool.shape[1] >= 2:
+            self.lower = self._pair((pool_drops << self.bits) | self.pp_rank[pool])
+            self.lower_rounds += 1
+            self.lower_fresh = True
+            self.lower_reach.append(self._count(self.lower.p1, self.lower.p2))
+            self.pending, self.pending_drop = pool[:, :0], pool_drops[:, :0]
+        elif pool.shape[1] == 1:
+            self.pending, self.pending_drop = pool, pool_drops
+
+    def _advance_grand_finals(self):
+        if self.gf is None:
+            lower_winner = None
+            if self.lower_rounds:
+                if self.lower.p1.shape[1] == 1 and (self.lower.winners[:, 0] >= 0).all():
+                    lower_winner = self.lower.winners[:, :1]
+            elif self.pending.shape[1] == 1 and self.upper_winner is not None:
+                lower_winner = self.pending
+                self.pending, self.pending_drop = self.pending[:, :0], self.pending_drop[:, :0]
+            if self.upper_winner is not None and lower_winner is not None:
+                no_drop = np.full((self.S, 1), NO_DROP_ROUND, dtype=np.int32)
+                self.gf = _Round(self.upper_winner[:, None], lower_winner, no_drop, no_drop,
+                                 np.full((self.S, 1), -1, dtype=np.int32))
+                self.gf_stage[:] = 1
+                self.gf_reach += self._count(self.gf.p1, self.gf.p2)
+            return
+
+        winner = self.gf.winners[:, 0]
+        played = winner >= 0
+        reset = (self.gf_stage == 1) & played & (winner == self.gf.p2[:, 0])
+        decided = played & ((self.gf_stage == 2) | ((self.gf_stage == 1) & (winner == self.gf.p1[:, 0])))
+        self.champion += np.bincount(winner[decided], minlength=self.n)
+        self.gf_stage[decided] = 3
+        self.gf_stage[reset] = 2
+        self.gf.winners[reset, 0] = -1
+
+    def _step(self, first):
+        if not self.upper_done:
+            self._play(self.upper)
+        if self.lower is not None and (first or self.lower_fresh):
+            self._play(self.lower)
+        if first:
+            for game in self.older_lower:
+                self._play(game)
+        if self.gf is not None:
+            self._play(self.gf)
+
+        # Same order as the engine: upper losers queue, lower winners join them, grand finals
+        if not self.upper_done:
+            self._advance_upper()
+        collected, collected_drops = [], []
+        if first:
+            games = self.older_lower + ([self.lower] if self.lower is not None else [])
+            for round_idx, slot in self.first_collect:
+                game = games[round_idx]
+                collected.append(game.winners[:, slot:slot + 1])
+                collected_drops.append(self._winner_drops(game)[:, slot:slot + 1])
+        elif self.lower_fresh:
+            collected, collected_drops = [self.lower.winners], [self._winner_drops(self.lower)]
+        self.lower_fresh = False
+        if self.upper is not None or self.lower is not None:
+            self._advance_lower(collected, collected_drops)
+        self._advance_grand_finals()
+
+    def run(self):
+        if self.n >= 2 and self.upper is not None:
+            # Each step finishes at least one round; a stuck bracket stops counting champions
+            for step in range(4 * self.n.bit_length() + 8):
+                self._step(step == 0)
+                if self.gf is not None and (self.gf_stage == 3).all():
+                    break
+
+        return self._results(self.upper_reach, self.lower_reach, self.gf_reach, self.champion)
@@ -1,19 +1,180 @@
 import json
+import marshal
+import threading
+from contextlib import contextmanager
 from config import TOURNAMENT_FILE
+from .storage import get_backend
+from .live_updates import notify_change
+from .match_index import MatchLocation, build_match_index, match_at, find_current_match
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: fall back to the in-process lock only
+    fcntl = None
+
+LOCK_FILE = TOURNAMENT_FILE + '.lock'
+
+# Process-wide cache of the tournament document. The parsed document is kept as a
+# marshal blob keyed on the backend's version (file identity for JSON, a version
+# counter for SQLite), so every caller still gets its own mutable copy but nothing
+# is re-read until another writer actually changes the stored state. The match index
+# (id -> location) and the current match pointer are derived once per cached version,
+# so they follow every status change without any bracket walk on the read path.
+_cache_lock = threading.Lock()
+_cache = {'key': None, 'blob': None, 'index': None, 'current': None}
+_cache_stats = {'hits': 0, 'misses': 0}
+
+# Writer lock: an RLock serializes threads in this worker, the fcntl lock on
+# LOCK_FILE serializes workers. Readers never take it.
+_writer_rlock = threading.RLock()
+_writer_local = threading.local()
+
+
+@contextmanager
+def tournament_lock():
+    """Holds the exclusive writer lock for a read-modify-write of the tournament data.
+
+    Re-entrant within a thread, so code holding it can still call save_tournament_data().
+    """
+    with _writer_rlock:
+        depth = getattr(_writer_local, 'depth', 0)
+        lock_fd = None
+        if depth == 0 and fcntl is not None:
+            lock_fd = open(LOCK_FILE, 'a')
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        _writer_local.depth = depth + 1
+        try:
+            yield
+        finally:
+            _writer_local.depth = depth
+            if lock_fd is not None:
+                fcntl.flock(lock_fd, fcntl.LOCK_UN)
+                lock_fd.close()
+
+
+@contextmanager
+def tournament_mutation(action, **context):
+    """tournament_lock() that also labels the saves made inside it.
+
+    Backends that keep history (the journal) record `action` and `context` with each
+    save; the innermost label wins when these are nested.
+    """
+    with tournament_lock():
+        outer = getattr(_writer_local, 'mutation', None)
+        _writer_local.mutation = dict(context, action=action)
+        try:
+            yield
+        finally:
+            _writer_local.mutation = outer
+
+
+def _load_cached():
+    """Returns (cache entry, freshly loaded document or None if served from the cache)."""
+    backend = get_backend()
+    key = backend.cache_key()
+    with _cache_lock:
+        if _cache['key'] == key:
+            _cache_stats['hits'] += 1
+            return dict(_cache), None
+    data = backend.load()
+    location, match = find_current_match(data)
+    entry = {
+        'key': key,
+        'blob': marshal.dumps(data),
+        'index': build_match_index(data),
+        'current': marshal.dumps({
+            'match': match,
+            'location': tuple(location) if location else None,
+            'last_updated': data.get('last_updated')
+        })
+    }
+    with _cache_lock:
+        _cache_stats['misses'] += 1
+        _cache.update(entry)
+    return entry, data
+
 
 def get_tournament_data():
-    """Reads tournament data from the JSON file."""
+    """Reads tournament data from the configured storage backend."""
     try:
-        with open(TOURNAMENT_FILE, 'r') as f:
-            return json.load(f)
+        entry, data = _load_cached()
+        return data if data is not None else marshal.loads(entry['blob'])
     except (FileNotFoundError, json.JSONDecodeError):
         # Create a default structure if file doesn't exist or is empty
         return {'competitors': [], 'brackets': {'upper': [], 'lower': []}}
 
+
+def get_data_version():
+    """Identifies the stored tournament version without reading it, or None if nothing is stored."""
+    try:
+        return get_backend().cache_key()
+    except FileNotFoundError:
+        return None
+
+
+def get_current_match():
+    """The match the overlay shows: the first in_progress match by round, else the first next_up one.
+
+    Returns {'match', 'location', 'last_updated'} with match/location None when there is
+    no such match. Only this match is copied out of the cache, not the whole document.
+    """
+    try:
+        entry, _ = _load_cached()
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'match': None, 'location': None, 'last_updated': None}
+    current = marshal.loads(entry['current'])
+    if current['location'] is not None:
+        current['location'] = MatchLocation(*current['location'])
+    return current
+
+
 def save_tournament_data(data):
-    """Saves tournament data to the JSON file, sorting competitors by PP."""
+    """Saves tournament data to the configured storage backend, sorting competitors by PP."""
     # Sort competitors by pp before saving
     if 'competitors' in data:
         data['competitors'].sort(key=lambda x: x.get('pp', 0), reverse=True)
-    with open(TOURNAMENT_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    with tournament_lock():
+        get_backend().save(data, mutation=getattr(_writer_local, 'mutation', None))
+        invalidate_cache()
+    notify_change()
+
+
+def invalidate_cache():
+    """Drops the cached document so the next read goes back to disk."""
+    with _cache_lock:
+        _cache['key'] = None
+        _cache['blob'] = None
+        _cache['index'] = None
+        _cache['current'] = None
+
+
+def find_match(data, match_id):
+    """Finds a match by ID in `data`, returning (match, location) or (None, None).
+
+    Uses the index of the cached document, so this is a dict lookup for any document
+    loaded through get_tournament_data(). If `data` no longer has the match where the
+    index says (edited since it was loaded, or built elsewhere) it is indexed directly.
+    """
+    with _cache_lock:
+        index = _cache['index']
+    location = index.get(match_id) if index else None
+    if location is not None:
+        match = match_at(data, location)
+        if match is not None and match.get('id') == match_id:
+            return match, location
+    location = build_match_index(data).get(match_id)
+    if location is None:
+        return None, None
+    return match_at(data, location), location
+
+
+def get_cache_stats():
+    """Returns hit/miss counters for the tournament document cache."""
+    with _cache_lock:
+        hits, misses = _cache_stats['hits'], _cache_stats['misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 3) if total else 0.0
+    }
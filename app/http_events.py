@@ -3,89 +3,35 @@ Replacement for websocket_events.py - using overlay state instead of SocketIO
 These functions are kept for compatibility but now use HTTP polling system
 """
 
-from .data_manager import get_tournament_data
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from .data_manager import get_current_match
+from .overlay_state import (get_overlay_state, get_events_after, get_interface_state, remember_interface_state,
+                            RECENT_EVENT_COUNT, INTERFACE_HISTORY_SIZE)
 
-def get_current_match_data():
+BRACKET_LABELS = {'upper': 'Upper', 'lower': 'Lower', 'grand_finals': 'Grand Finals'}
+
+# Recent match interface states by version, so a client that sends the version it has
+# gets only the keys that changed. The history is shared by all workers through
+# overlay_state; this is the worker's copy of what it has seen, so the file is only
+# read for a version this worker doesn't know yet.
+_interface_history = OrderedDict()
+_interface_history_lock = threading.Lock()
+
+def get_current_match_data(current=None):
     """Get current match data for overlay (used by HTTP polling API)"""
     try:
-        data = get_tournament_data()
-        
-        # Find current live match or next upcoming match with round priority
-        current_match = None
+        # Current live match or next upcoming match with round priority, kept by data_manager
+        current = current or get_current_match()
+        current_match = current['match']
         bracket_type = None
         round_index = 0
-        
-        # Determine max rounds to search through
-        max_rounds = 10
-        if 'upper' in data.get('brackets', {}):
-            max_rounds = len(data['brackets']['upper'])
-        if 'lower' in data.get('brackets', {}) and len(data['brackets']['lower']) > max_rounds:
-            max_rounds = len(data['brackets']['lower'])
-        
-        # First look for in_progress matches with round priority
-        for round_num in range(1, max_rounds + 1):
-            if current_match:
-                break
-                
-            # Check upper bracket round first
-            if 'upper' in data.get('brackets', {}) and len(data['brackets']['upper']) >= round_num:
-                round_matches = data['brackets']['upper'][round_num - 1]
-                for match in round_matches:
-                    if match and match.get('status') == 'in_progress':
-                        current_match = match
-                        bracket_type = 'Upper'
-                        round_index = round_num - 1
-                        break
-            
-            # Then check lower bracket round
-            if not current_match and 'lower' in data.get('brackets', {}) and len(data['brackets']['lower']) >= round_num:
-                round_matches = data['brackets']['lower'][round_num - 1]
-                for match in round_matches:
-                    if match and match.get('status') == 'in_progress':
-                        current_match = match
-                        bracket_type = 'Lower'
-                        round_index = round_num - 1
-                        break
-        
-        # Check grand finals for in_progress
-        if not current_match and 'grand_finals' in data.get('brackets', {}):
-            match = data['brackets']['grand_finals']
-            if match and match.get('status') == 'in_progress':
-                current_match = match
-                bracket_type = 'Grand Finals'
-        
-        # If no in_progress match found, look for next_up matches with same round priority
-        if not current_match:
-            for round_num in range(1, max_rounds + 1):
-                if current_match:
-                    break
-                    
-                # Check upper bracket round first
-                if 'upper' in data.get('brackets', {}) and len(data['brackets']['upper']) >= round_num:
-                    round_matches = data['brackets']['upper'][round_num - 1]
-                    for match in round_matches:
-                        if match and match.get('status') == 'next_up':
-                            current_match = match
-                            bracket_type = 'Upper'
-                            round_index = round_num - 1
-                            break
-                
-                # Then check lower bracket round
-                if not current_match and 'lower' in data.get('brackets', {}) and len(data['brackets']['lower']) >= round_num:
-                    round_matches = data['brackets']['lower'][round_num - 1]
-                    for match in round_matches:
-                        if match and match.get('status') == 'next_up':
-                            current_match = match
-                            bracket_type = 'Lower'
-                            round_index = round_num - 1
-                            break
-            
-            # Check grand finals for next_up
-            if not current_match and 'grand_finals' in data.get('brackets', {}):
-                match = data['brackets']['grand_finals']
-                if match and match.get('status') == 'next_up':
-                    current_match = match
-                    bracket_type = 'Grand Finals'
+        if current_match:
+            location = current['location']
+            bracket_type = BRACKET_LABELS[location.bracket]
+            round_index = location.round_index or 0
         
         if current_match:
             # Find current/last picked map for display
@@ -137,6 +83,139 @@ def get_current_match_data():
             'message': f'Error loading match data: {str(e)}'
         }
 
+def build_match_data(current=None):
+    """Payload of /api/match-data"""
+    current = current or get_current_match()
+    match_data = get_current_match_data(current)
+    # Add timestamp for cache busting
+    match_data['last_updated'] = current['last_updated'] or ''
+    return match_data
+
+def build_match_interface_state(current=None):
+    """Match interface state (picks, bans, abilities, mappool) of the current match for the overlay"""
+    current = current or get_current_match()
+    current_match = current['match']
+    
+    if not current_match:
+        return {
+            'match_found': False,
+            'message': 'No active match found'
+        }
+    
+    # Extract match interface data
+    match_state = current_match.get('match_state', {})
+    
+    # Get mappool details from both players
+    player1_mappool = current_match.get('player1', {}).get('mappool_details', [])
+    player2_mappool = current_match.get('player2', {}).get('mappool_details', [])
+    combined_mappool = player1_mappool + player2_mappool
+    
+    # Calculate interface lock status
+    picked_maps = match_state.get('picked_maps', [])
+    current_score = current_match.get('score_p1', 0) + current_match.get('score_p2', 0)
+    is_interface_locked = len(picked_maps) > 0 and current_score < len(picked_maps)
+    
+    return {
+        'match_found': True,
+        'player1': current_match.get('player1', {}),
+        'player2': current_match.get('player2', {}),
+        'score_p1': current_match.get('score_p1', 0),
+        'score_p2': current_match.get('score_p2', 0),
+        'phase': match_state.get('phase', 'waiting'),
+        'current_turn': match_state.get('current_turn', ''),
+        'first_player': match_state.get('first_player', ''),
+        'banned_maps': match_state.get('banned_maps', []),
+        'picked_maps': picked_maps,
+        'abilities_used': match_state.get('abilities_used', {}),
+        'mappool': combined_mappool,
+        'action_log': match_state.get('action_log', []),
+        'interface_locked': is_interface_locked,
+        'tiebreaker_map_url': current_match.get('tiebreaker_map_url'),
+        'is_tiebreaker': current_match.get('score_p1', 0) == 3 and current_match.get('score_p2', 0) == 3,
+        'timestamp': current['last_updated'] or ''
+    }
+
+def build_overlay_events(after=None, state=None):
+    """Overlay events (victory screens, AFK status, etc.): the ones after sequence number
+    `after`, or the most recent few when the client hasn't seen any yet"""
+    state = state or get_overlay_state()
+    if after is None:
+        events, missed = state.get('events', [])[-RECENT_EVENT_COUNT:], False
+    else:
+        events, missed = get_events_after(state, after)
+    return {
+        'events': events,
+        'last_seq': state.get('last_seq', 0),
+        'missed_events': missed,
+        'afk_mode': state.get('afk_mode', False),
+        'victory_screen_hidden': state.get('victory_screen_hidden', False),
+        'timestamp': state.get('last_updated', '')
+    }
+
+def section_version(payload):
+    """Short content hash of a payload section, so clients can tell which parts changed"""
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+def diff_interface_state(since, state, version=None):
+    """Changes to the match interface state since the state with version `since`.
+
+    Returns {'version', 'full': False, 'changed': {key: value}, 'removed': [key]} when that
+    state is still in the history, otherwise a full resync {'version', 'full': True, 'state'}.
+    """
+    version = version or section_version(state)
+    with _interface_history_lock:
+        is_new = version not in _interface_history
+        previous = _interface_history.get(since) if since else None
+    if is_new:
+        remember_interface_state(version, state)
+    if since and previous is None:
+        previous = get_interface_state(since)
+    
+    with _interface_history_lock:
+        for known_version, known_state in ((since, previous), (version, state)):
+            if known_state is not None:
+                _interface_history[known_version] = known_state
+                _interface_history.move_to_end(known_version)
+        while len(_interface_history) > INTERFACE_HISTORY_SIZE:
+            _interface_history.popitem(last=False)
+    
+    if previous is None:
+        return {'version': version, 'full': True, 'state': state}
+    return {
+        'version': version,
+        'full': False,
+        'changed': {key: value for key, value in state.items() if key not in previous or previous[key] != value},
+        'removed': [key for key in previous if key not in state]
+    }
+
+def build_overlay_snapshot(known_versions=None, events_after=None):
+    """All three overlay sections from one read of the tournament and overlay state.
+
+    Each section comes with a version; sections whose version is in `known_versions`
+    (section name -> version the client already has) are sent as None. A changed interface
+    section is sent as 'interface_delta' (see diff_interface_state) when possible.
+    """
+    current = get_current_match()
+    state = get_overlay_state()
+    sections = {
+        'match': build_match_data(current),
+        'interface': build_match_interface_state(current),
+        'overlay_events': build_overlay_events(events_after, state)
+    }
+    known_versions = known_versions or {}
+    snapshot = {'versions': {}}
+    for name, payload in sections.items():
+        version = section_version(payload)
+        snapshot['versions'][name] = version
+        snapshot[name] = None if known_versions.get(name) == version else payload
+    
+    snapshot['interface_delta'] = None
+    delta = diff_interface_state(known_versions.get('interface'), sections['interface'],
+                                 snapshot['versions']['interface'])
+    if snapshot['interface'] is not None and not delta['full']:
+        snapshot['interface'], snapshot['interface_delta'] = None, delta
+    return snapshot
+
 # Legacy compatibility functions (no longer use SocketIO)
 def broadcast_match_update():
     """Legacy function - now handled by overlay state system"""
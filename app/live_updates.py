@@ -0,0 +1,69 @@
+"""
+Change notification for the overlay push channels (SSE and long-poll).
+
+Saves in this worker wake waiting requests immediately through a condition
+variable; changes made by other workers are picked up by re-checking the stored
+versions every `check_interval` seconds, which only costs a stat() or a version read.
+"""
+import hashlib
+import threading
+import time
+
+SECTIONS = ('tournament', 'overlay')
+
+_changed = threading.Condition()
+
+
+def notify_change():
+    """Wakes every request waiting in wait_for_change() in this worker"""
+    with _changed:
+        _changed.notify_all()
+
+
+def current_versions():
+    """Versions of the tournament data and the overlay state (None when not stored yet)"""
+    from .data_manager import get_data_version
+    from .overlay_state import get_overlay_state_version
+    return {
+        'tournament': get_data_version(),
+        'overlay': get_overlay_state_version()
+    }
+
+
+def version_cursor(versions):
+    """Opaque cursor for a set of versions: one short hash per section, '<tournament>.<overlay>'"""
+    return '.'.join(hashlib.blake2b(repr(versions[section]).encode(), digest_size=8).hexdigest()
+                    for section in SECTIONS)
+
+
+def changed_sections(cursor, versions):
+    """Sections whose version moved past `cursor` (all of them for a missing or malformed cursor)"""
+    theirs = (cursor or '').split('.')
+    ours = version_cursor(versions).split('.')
+    if len(theirs) != len(ours):
+        return set(SECTIONS)
+    return {section for section, a, b in zip(SECTIONS, theirs, ours) if a != b}
+
+
+def _wait_until(has_changed, timeout, check_interval):
+    deadline = time.monotonic() + timeout
+    while True:
+        current = current_versions()
+        remaining = deadline - time.monotonic()
+        if has_changed(current) or remaining <= 0:
+            return current
+        with _changed:
+            _changed.wait(min(check_interval, remaining))
+
+
+def wait_for_change(versions, timeout, check_interval):
+    """Blocks until current_versions() differs from `versions` or `timeout` seconds pass.
+
+    Returns the current versions either way, so callers compare them with what they had.
+    """
+    return _wait_until(lambda current: current != versions, timeout, check_interval)
+
+
+def wait_for_cursor(cursor, timeout, check_interval):
+    """Like wait_for_change(), for a client that only has a version_cursor()"""
+    return _wait_until(lambda current: bool(changed_sections(cursor, current)), timeout, check_interval)
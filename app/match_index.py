@@ -0,0 +1,73 @@
+from collections import namedtuple
+
+BRACKET_TYPES = ('upper', 'lower', 'grand_finals')
+
+# Where a match lives in the tournament document. Grand finals have no rounds: round_index
+# is None and slot counts back through the previous_gf chain (0 is the current GF).
+MatchLocation = namedtuple('MatchLocation', ['bracket', 'round_index', 'slot'])
+
+
+def iter_matches(data):
+    """Yields (location, match) for every match in the brackets, upper, lower then grand finals."""
+    brackets = data.get('brackets', {})
+    for bracket_type in BRACKET_TYPES:
+        content = brackets.get(bracket_type)
+        if not content:
+            continue
+        if bracket_type == 'grand_finals':
+            match, depth = content, 0
+            while isinstance(match, dict):
+                yield MatchLocation(bracket_type, None, depth), match
+                match = match.get('previous_gf')
+                depth += 1
+        else:
+            for round_index, round_matches in enumerate(content):
+                for slot, match in enumerate(round_matches):
+                    if match:
+                        yield MatchLocation(bracket_type, round_index, slot), match
+
+
+def build_match_index(data):
+    """Maps match id -> MatchLocation. The first match with an id wins, like the old scans."""
+    index = {}
+    for location, match in iter_matches(data):
+        match_id = match.get('id')
+        if match_id is not None and match_id not in index:
+            index[match_id] = location
+    return index
+
+
+def match_at(data, location):
+    """The match at `location` in `data`, or None if the document has no match there."""
+    try:
+        if location.round_index is None:
+            match = data['brackets'][location.bracket]
+            for _ in range(location.slot):
+                match = match['previous_gf']
+        else:
+            match = data['brackets'][location.bracket][location.round_index][location.slot]
+    except (KeyError, IndexError, TypeError):
+        return None
+    return match if isinstance(match, dict) else None
+
+
+def find_current_match(data):
+    """(location, match) for the match the overlay should show, or (None, None).
+
+    The first in_progress match wins, then the first next_up one. Rounds are checked in
+    order, upper before lower within a round, and grand finals only after every round.
+    """
+    brackets = data.get('brackets', {})
+    upper = brackets.get('upper') or []
+    lower = brackets.get('lower') or []
+    grand_finals = brackets.get('grand_finals')
+    for status in ('in_progress', 'next_up'):
+        for round_index in range(max(len(upper), len(lower))):
+            for bracket_type, rounds in (('upper', upper), ('lower', lower)):
+                if round_index < len(rounds):
+                    for slot, match in enumerate(rounds[round_index]):
+                        if match and match.get('status') == status:
+                            return MatchLocation(bracket_type, round_index, slot), match
+        if isinstance(grand_finals, dict) and grand_finals.get('status') == status:
+            return MatchLocation('grand_finals', None, 0), grand_finals
+    return None, None
@@ -4,10 +4,37 @@ Simple file-based state management for overlay events
 """
 import json
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+from .storage import JsonFileBackend
+from .live_updates import notify_change
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: fall back to the in-process lock only
+    fcntl = None
 
 OVERLAY_STATE_FILE = 'overlay_state.json'
+OVERLAY_LOCK_FILE = OVERLAY_STATE_FILE + '.lock'
+
+# Events carry a sequence number that only ever grows ('last_seq' in the state). The
+# last EVENT_BUFFER_SIZE events are kept so clients can catch up with "events after N"
+# even after a burst; clients that don't send a sequence number get the most recent few.
+EVENT_BUFFER_SIZE = 100
+RECENT_EVENT_COUNT = 10
+
+# Recent match interface states by version (see http_events.diff_interface_state), kept
+# on disk so a client's next poll can be answered by any worker
+INTERFACE_HISTORY_FILE = 'interface_history.json'
+INTERFACE_HISTORY_SIZE = 16
+
+# Written atomically so pollers never read a half-written file
+_overlay_file = JsonFileBackend(OVERLAY_STATE_FILE)
+_interface_history_file = JsonFileBackend(INTERFACE_HISTORY_FILE)
+_state_lock = threading.Lock()
+_interface_history_lock = threading.Lock()
 
 def get_overlay_state() -> Dict[str, Any]:
     """Get current overlay state"""
@@ -17,68 +44,116 @@ def get_overlay_state() -> Dict[str, Any]:
                 return json.load(f)
     except Exception as e:
         print(f"Error reading overlay state: {e}")
-    
+
     # Return default state
     return {
         'afk_mode': False,
         'victory_screen_hidden': False,
         'last_updated': datetime.utcnow().isoformat(),
-        'events': []
+        'events': [],
+        'last_seq': 0
     }
 
+def get_overlay_state_version():
+    """Identifies the current overlay state file without reading it, or None if there is none"""
+    try:
+        return _overlay_file.cache_key()
+    except FileNotFoundError:
+        return None
+
+def get_events_after(state: Dict[str, Any], after: int) -> Tuple[List[Dict[str, Any]], bool]:
+    """Events with a sequence number above `after`, oldest first, and whether any
+    of the events the client hasn't seen were already dropped from the buffer"""
+    events = [event for event in state.get('events', []) if event.get('seq', 0) > after]
+    oldest = events[0].get('seq', 0) if events else state.get('last_seq', 0) + 1
+    return events, oldest > after + 1
+
+@contextmanager
+def _exclusive(thread_lock, lock_path):
+    """Serializes a read-modify-write across threads and workers"""
+    with thread_lock, open(lock_path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)  # released when the file is closed
+        yield
+
+@contextmanager
+def _locked_state():
+    """Yield the current state for a read-modify-write, serialized across threads and workers"""
+    with _exclusive(_state_lock, OVERLAY_LOCK_FILE):
+        yield get_overlay_state()
+
+def _save_state(state: Dict[str, Any]):
+    state['last_updated'] = datetime.utcnow().isoformat()
+    _overlay_file.save(state)
+    notify_change()
+
 def update_overlay_state(updates: Dict[str, Any]):
     """Update overlay state"""
     try:
-        state = get_overlay_state()
-        state.update(updates)
-        state['last_updated'] = datetime.utcnow().isoformat()
-        
-        with open(OVERLAY_STATE_FILE, 'w') as f:
-            json.dump(state, f, indent=2)
-        
+        with _locked_state() as state:
+            state.update(updates)
+            _save_state(state)
+
         return True
     except Exception as e:
         print(f"Error updating overlay state: {e}")
         return False
 
-def add_overlay_event(event_type: str, data: Dict[str, Any] = None):
-    """Add an event to the overlay state"""
+def add_overlay_event(event_type: str, data: Dict[str, Any] = None) -> Optional[int]:
+    """Add an event to the overlay state, returning its sequence number"""
     try:
-        state = get_overlay_state()
-        
-        # Keep only the last 10 events
-        if 'events' not in state:
-            state['events'] = []
-        
-        event = {
-            'type': event_type,
-            'data': data or {},
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        state['events'].append(event)
-        state['events'] = state['events'][-10:]  # Keep last 10 events
-        state['last_updated'] = datetime.utcnow().isoformat()
-        
-        with open(OVERLAY_STATE_FILE, 'w') as f:
-            json.dump(state, f, indent=2)
-        
-        return True
+        with _locked_state() as state:
+            if 'events' not in state:
+                state['events'] = []
+
+            seq = state.get('last_seq', 0) + 1
+            event = {
+                'seq': seq,
+                'type': event_type,
+                'data': data or {},
+                'timestamp': datetime.utcnow().isoformat()
+            }
+
+            state['events'].append(event)
+            state['events'] = state['events'][-EVENT_BUFFER_SIZE:]
+            state['last_seq'] = seq
+            _save_state(state)
+
+        return seq
     except Exception as e:
         print(f"Error adding overlay event: {e}")
-        return False
+        return None
 
 def clear_overlay_events():
-    """Clear all overlay events"""
+    """Clear all overlay events (sequence numbers keep counting up)"""
     try:
-        state = get_overlay_state()
-        state['events'] = []
-        state['last_updated'] = datetime.utcnow().isoformat()
-        
-        with open(OVERLAY_STATE_FILE, 'w') as f:
-            json.dump(state, f, indent=2)
-        
+        with _locked_state() as state:
+            state['events'] = []
+            _save_state(state)
+
         return True
     except Exception as e:
         print(f"Error clearing overlay events: {e}")
         return False
+
+def _interface_history() -> Dict[str, Any]:
+    try:
+        return _interface_history_file.load()
+    except (OSError, ValueError):
+        return {}
+
+def get_interface_state(version: str) -> Optional[Dict[str, Any]]:
+    """A recently served match interface state by its version, or None"""
+    return _interface_history().get(version)
+
+def remember_interface_state(version: str, state: Dict[str, Any]):
+    """Keep `state` as one of the last INTERFACE_HISTORY_SIZE interface states"""
+    try:
+        with _exclusive(_interface_history_lock, INTERFACE_HISTORY_FILE + '.lock'):
+            history = _interface_history()
+            if version in history:
+                return
+            history[version] = state
+            _interface_history_file.save(dict(list(history.items())[-INTERFACE_HISTORY_SIZE:]))
+    except Exception as e:
+        print(f"Error saving interface history: {e}")
@@ -1,13 +1,16 @@
-from flask import Blueprint, render_template, redirect, request, url_for, session, flash
+from flask import Blueprint, render_template, redirect, request, url_for, session, flash, jsonify
 import requests
 from datetime import datetime
 from functools import wraps
 from config import OSU_CLIENT_ID, OSU_CLIENT_SECRET, ADMIN_REDIRECT_URI, AUTHORIZATION_URL, TOKEN_URL, OSU_API_BASE_URL, ADMIN_OSU_ID
-from ..data_manager import get_tournament_data, save_tournament_data
+from ..data_manager import get_tournament_data, save_tournament_data, tournament_mutation, find_match, get_cache_stats
 from ..bracket_logic import generate_bracket
+from ..storage import get_backend
 from ..services.match_service import MatchService
 from ..services.seeding_service import SeedingService
 from ..services.streaming_service import StreamingService
+from ..services.score_watcher import live_score_watcher
+from ..utils.match_utils import get_room_cache_stats
 from .. import api
 
 # Import broadcast functions that use overlay state instead of SocketIO
@@ -162,43 +165,50 @@ def admin_callback():
     return "Access Denied. You do not have administrator permissions for this tournament.", 403
 
 
+def load_panel_data():
+    """Tournament data for the admin panels, with invalid competitors and signups dropped"""
+    with tournament_mutation('panel_data_cleaned'):
+        data = get_tournament_data()
+        data_changed = False
+
+        # Clean up competitors data - ensure all competitors have valid IDs
+        if 'competitors' in data:
+            valid_competitors = []
+            for competitor in data['competitors']:
+                if isinstance(competitor, dict) and competitor.get('id') is not None:
+                    valid_competitors.append(competitor)
+                else:
+                    print(f"Warning: Found invalid competitor data: {competitor}")
+                    data_changed = True
+            if len(valid_competitors) != len(data['competitors']):
+                data['competitors'] = valid_competitors
+                data_changed = True
+
+        # Clean up pending signups data - ensure all signups have valid IDs
+        if 'pending_signups' in data:
+            valid_signups = []
+            for signup in data['pending_signups']:
+                if isinstance(signup, dict) and signup.get('id') is not None:
+                    valid_signups.append(signup)
+                else:
+                    print(f"Warning: Found invalid pending signup data: {signup}")
+                    data_changed = True
+            if len(valid_signups) != len(data['pending_signups']):
+                data['pending_signups'] = valid_signups
+                data_changed = True
+
+        # Save cleaned data if any changes were made
+        if data_changed:
+            save_tournament_data(data)
+            print("Cleaned and saved tournament data")
+    return data
+
+
 # Main Admin Panel (Full Admin Level)
 @admin_bp.route('/')
 @full_admin_required
 def admin_panel():
-    data = get_tournament_data()
-    data_changed = False
-    
-    # Clean up competitors data - ensure all competitors have valid IDs
-    if 'competitors' in data:
-        valid_competitors = []
-        for competitor in data['competitors']:
-            if isinstance(competitor, dict) and competitor.get('id') is not None:
-                valid_competitors.append(competitor)
-            else:
-                print(f"Warning: Found invalid competitor data: {competitor}")
-                data_changed = True
-        if len(valid_competitors) != len(data['competitors']):
-            data['competitors'] = valid_competitors
-            data_changed = True
-    
-    # Clean up pending signups data - ensure all signups have valid IDs
-    if 'pending_signups' in data:
-        valid_signups = []
-        for signup in data['pending_signups']:
-            if isinstance(signup, dict) and signup.get('id') is not None:
-                valid_signups.append(signup)
-            else:
-                print(f"Warning: Found invalid pending signup data: {signup}")
-                data_changed = True
-        if len(valid_signups) != len(data['pending_signups']):
-            data['pending_signups'] = valid_signups
-            data_changed = True
-    
-    # Save cleaned data if any changes were made
-    if data_changed:
-        save_tournament_data(data)
-        print("Cleaned and saved tournament data")
+    data = load_panel_data()
     
     permission_level = get_user_permission_level()
     return render_template('admin.html', data=data, permission_level=permission_level, panel_type='admin')
@@ -208,39 +218,7 @@ def admin_panel():
 @host_bp.route('/')
 @host_required
 def host_panel():
-    data = get_tournament_data()
-    data_changed = False
-    
-    # Clean up competitors data - ensure all competitors have valid IDs
-    if 'competitors' in data:
-        valid_competitors = []
-        for competitor in data['competitors']:
-            if isinstance(competitor, dict) and competitor.get('id') is not None:
-                valid_competitors.append(competitor)
-            else:
-                print(f"Warning: Found invalid competitor data: {competitor}")
-                data_changed = True
-        if len(valid_competitors) != len(data['competitors']):
-            data['competitors'] = valid_competitors
-            data_changed = True
-    
-    # Clean up pending signups data - ensure all signups have valid IDs
-    if 'pending_signups' in data:
-        valid_signups = []
-        for signup in data['pending_signups']:
-            if isinstance(signup, dict) and signup.get('id') is not None:
-                valid_signups.append(signup)
-            else:
-                print(f"Warning: Found invalid pending signup data: {signup}")
-                data_changed = True
-        if len(valid_signups) != len(data['pending_signups']):
-            data['pending_signups'] = valid_signups
-            data_changed = True
-    
-    # Save cleaned data if any changes were made
-    if data_changed:
-        save_tournament_data(data)
-        print("Cleaned and saved tournament data")
+    data = load_panel_data()
     
     permission_level = get_user_permission_level()
     return render_template('admin.html', data=data, permission_level=permission_level, panel_type='host')
@@ -250,39 +228,7 @@ def host_panel():
 @dev_bp.route('/')
 @main_admin_required
 def dev_panel():
-    data = get_tournament_data()
-    data_changed = False
-    
-    # Clean up competitors data - ensure all competitors have valid IDs
-    if 'competitors' in data:
-        valid_competitors = []
-        for competitor in data['competitors']:
-            if isinstance(competitor, dict) and competitor.get('id') is not None:
-                valid_competitors.append(competitor)
-            else:
-                print(f"Warning: Found invalid competitor data: {competitor}")
-                data_changed = True
-        if len(valid_competitors) != len(data['competitors']):
-            data['competitors'] = valid_competitors
-            data_changed = True
-    
-    # Clean up pending signups data - ensure all signups have valid IDs
-    if 'pending_signups' in data:
-        valid_signups = []
-        for signup in data['pending_signups']:
-            if isinstance(signup, dict) and signup.get('id') is not None:
-                valid_signups.append(signup)
-            else:
-                print(f"Warning: Found invalid pending signup data: {signup}")
-                data_changed = True
-        if len(valid_signups) != len(data['pending_signups']):
-            data['pending_signups'] = valid_signups
-            data_changed = True
-    
-    # Save cleaned data if any changes were made
-    if data_changed:
-        save_tournament_data(data)
-        print("Cleaned and saved tournament data")
+    data = load_panel_data()
     
     permission_level = get_user_permission_level()
     return render_template('admin.html', data=data, permission_level=permission_level, panel_type='dev')
@@ -306,20 +252,21 @@ def add_competitor():
     try:
         user = api.user(username)
         
-        data = get_tournament_data()
-        if any(c.get('id') == user.id for c in data.get('competitors', [])):
-            flash(f'User "{user.username}" is already registered.', 'info')
-            return redirect_to_appropriate_panel()
+        with tournament_mutation('competitor_added', user_id=user.id):
+            data = get_tournament_data()
+            if any(c.get('id') == user.id for c in data.get('competitors', [])):
+                flash(f'User "{user.username}" is already registered.', 'info')
+                return redirect_to_appropriate_panel()
 
-        new_competitor = {
-            'id': user.id,
-            'name': user.username,
-            'pp': user.statistics.pp if user.statistics else 0,
-            'avatar_url': user.avatar_url
-        }
-        data['competitors'].append(new_competitor)
-        save_tournament_data(data)
-        generate_bracket()
+            new_competitor = {
+                'id': user.id,
+                'name': user.username,
+                'pp': user.statistics.pp if user.statistics else 0,
+                'avatar_url': user.avatar_url
+            }
+            data['competitors'].append(new_competitor)
+            save_tournament_data(data)
+            generate_bracket()
         flash(f'Successfully added "{user.username}" to the tournament.', 'success')
 
     except Exception as e:
@@ -424,24 +371,7 @@ def set_score():
         try:
             data = get_tournament_data()
             # Find the match to check if it's completed
-            current_match = None
-            for bracket_type in ['upper', 'lower', 'grand_finals']:
-                if bracket_type in data.get('brackets', {}):
-                    if bracket_type == 'grand_finals':
-                        match = data['brackets'][bracket_type]
-                        if match and match.get('id') == match_id:
-                            current_match = match
-                            break
-                    else:
-                        for round_matches in data['brackets'][bracket_type]:
-                            for match in round_matches:
-                                if match and match.get('id') == match_id:
-                                    current_match = match
-                                    break
-                            if current_match:
-                                break
-                if current_match:
-                    break
+            current_match, _ = find_match(data, match_id)
             
             # Check if match is complete (Best of 7 = first to 4)
             if current_match:
@@ -478,24 +408,7 @@ def set_winner():
         try:
             data = get_tournament_data()
             # Find the match to get winner info
-            current_match = None
-            for bracket_type in ['upper', 'lower', 'grand_finals']:
-                if bracket_type in data.get('brackets', {}):
-                    if bracket_type == 'grand_finals':
-                        match = data['brackets'][bracket_type]
-                        if match and match.get('id') == match_id:
-                            current_match = match
-                            break
-                    else:
-                        for round_matches in data['brackets'][bracket_type]:
-                            for match in round_matches:
-                                if match and match.get('id') == match_id:
-                                    current_match = match
-                                    break
-                            if current_match:
-                                break
-                if current_match:
-                    break
+            current_match, _ = find_match(data, match_id)
             
             if current_match:
                 winner = current_match.get('winner', {})
@@ -528,6 +441,7 @@ def redirect_to_appropriate_panel():
 @admin_bp.route('/remove/<int:user_id>', methods=['POST'])
 @dev_bp.route('/remove/<int:user_id>', methods=['POST'])
 @full_admin_required
+@tournament_mutation('competitor_removed')
 def remove_competitor(user_id):
     data = get_tournament_data()
     data['competitors'] = [c for c in data.get('competitors', []) if c.get('id') != user_id]
@@ -539,6 +453,7 @@ def remove_competitor(user_id):
 @admin_bp.route('/reset_competitors', methods=['POST'])
 @dev_bp.route('/reset_competitors', methods=['POST'])
 @full_admin_required
+@tournament_mutation('competitors_reset')
 def reset_competitors():
     data = get_tournament_data()
     data['competitors'] = []
@@ -551,6 +466,7 @@ def reset_competitors():
 @admin_bp.route('/reset_bracket', methods=['POST'])
 @dev_bp.route('/reset_bracket', methods=['POST'])
 @full_admin_required
+@tournament_mutation('bracket_reset')
 def reset_bracket():
     data = get_tournament_data()
     
@@ -581,6 +497,7 @@ def reset_bracket():
 @admin_bp.route('/approve_signup/<int:user_id>', methods=['POST'])
 @dev_bp.route('/approve_signup/<int:user_id>', methods=['POST'])
 @full_admin_required
+@tournament_mutation('signup_approved')
 def approve_signup(user_id):
     """Approve a pending signup"""
     data = get_tournament_data()
@@ -626,6 +543,7 @@ def approve_signup(user_id):
 @admin_bp.route('/reject_signup/<int:user_id>', methods=['POST'])
 @dev_bp.route('/reject_signup/<int:user_id>', methods=['POST'])
 @full_admin_required
+@tournament_mutation('signup_rejected')
 def reject_signup(user_id):
     """Reject a pending signup"""
     data = get_tournament_data()
@@ -650,6 +568,7 @@ def reject_signup(user_id):
 @admin_bp.route('/toggle_signups', methods=['POST'])
 @dev_bp.route('/toggle_signups', methods=['POST'])
 @full_admin_required
+@tournament_mutation('signups_toggled')
 def toggle_signups():
     """Toggle tournament signup lock status"""
     data = get_tournament_data()
@@ -701,6 +620,7 @@ def cache_all_match_details():
 @admin_bp.route('/set_seed/<int:user_id>', methods=['POST'])
 @dev_bp.route('/set_seed/<int:user_id>', methods=['POST'])
 @host_required
+@tournament_mutation('seed_set')
 def set_seed(user_id):
     placement = request.form.get('placement')
     data = get_tournament_data()
@@ -721,6 +641,7 @@ def set_seed(user_id):
 @admin_bp.route('/reset_seeding', methods=['POST'])
 @dev_bp.route('/reset_seeding', methods=['POST'])
 @host_required
+@tournament_mutation('seeding_reset')
 def reset_seeding():
     data = get_tournament_data()
     for c in data.get('competitors', []):
@@ -788,6 +709,7 @@ def set_stream():
 @admin_bp.route('/set_seeding_playlist', methods=['POST'])
 @dev_bp.route('/set_seeding_playlist', methods=['POST'])
 @host_required
+@tournament_mutation('seeding_playlist_set')
 def set_seeding_playlist():
     """Set the seeding mappool playlist URL"""
     playlist_url = request.form.get('playlist_url', '').strip()
@@ -1094,36 +1016,20 @@ def set_tiebreaker_map():
         return redirect_to_appropriate_panel()
     
     try:
-        data = get_tournament_data()
-        match_found = False
-        
-        # Find the match in all brackets
-        for bracket_type in ['upper', 'lower', 'grand_finals']:
-            if bracket_type in data.get('brackets', {}):
-                if bracket_type == 'grand_finals':
-                    match = data['brackets'][bracket_type]
-                    if isinstance(match, dict) and match.get('id') == match_id:
-                        # Verify it's actually 3-3
-                        if match.get('score_p1', 0) == 3 and match.get('score_p2', 0) == 3:
-                            match['tiebreaker_map_url'] = tiebreaker_map_url
-                            match_found = True
-                            break
-                else:
-                    for round_matches in data['brackets'][bracket_type]:
-                        for match in round_matches:
-                            if match and match.get('id') == match_id:
-                                # Verify it's actually 3-3
-                                if match.get('score_p1', 0) == 3 and match.get('score_p2', 0) == 3:
-                                    match['tiebreaker_map_url'] = tiebreaker_map_url
-                                    match_found = True
-                                    break
-                        if match_found:
-                            break
-                if match_found:
-                    break
+        with tournament_mutation('tiebreaker_set', match_id=match_id):
+            data = get_tournament_data()
+            match_found = False
+            
+            match, _ = find_match(data, match_id)
+            # Verify it's actually 3-3
+            if match and match.get('score_p1', 0) == 3 and match.get('score_p2', 0) == 3:
+                match['tiebreaker_map_url'] = tiebreaker_map_url
+                match_found = True
+            
+            if match_found:
+                save_tournament_data(data)
         
         if match_found:
-            save_tournament_data(data)
             broadcast_match_update()
             flash(f'Tiebreaker map set for match {match_id}', 'success')
         else:
@@ -1148,34 +1054,20 @@ def clear_tiebreaker_map():
         return redirect_to_appropriate_panel()
     
     try:
-        data = get_tournament_data()
-        match_found = False
-        
-        # Find the match in all brackets
-        for bracket_type in ['upper', 'lower', 'grand_finals']:
-            if bracket_type in data.get('brackets', {}):
-                if bracket_type == 'grand_finals':
-                    match = data['brackets'][bracket_type]
-                    if isinstance(match, dict) and match.get('id') == match_id:
-                        if 'tiebreaker_map_url' in match:
-                            del match['tiebreaker_map_url']
-                        match_found = True
-                        break
-                else:
-                    for round_matches in data['brackets'][bracket_type]:
-                        for match in round_matches:
-                            if match and match.get('id') == match_id:
-                                if 'tiebreaker_map_url' in match:
-                                    del match['tiebreaker_map_url']
-                                match_found = True
-                                break
-                        if match_found:
-                            break
-                if match_found:
-                    break
+        with tournament_mutation('tiebreaker_cleared', match_id=match_id):
+            data = get_tournament_data()
+            match_found = False
+            
+            match, _ = find_match(data, match_id)
+            if match:
+                if 'tiebreaker_map_url' in match:
+                    del match['tiebreaker_map_url']
+                match_found = True
+            
+            if match_found:
+                save_tournament_data(data)
         
         if match_found:
-            save_tournament_data(data)
             broadcast_match_update()
             flash(f'Tiebreaker map cleared for match {match_id}', 'success')
         else:
@@ -1286,24 +1178,25 @@ def grant_host_perms():
         user_id = int(user_id)
         user = api.user(user_id)
         
-        data = get_tournament_data()
-        if 'host_admins' not in data:
-            data['host_admins'] = []
-        
-        # Check if already a host admin
-        if user_id in data['host_admins']:
-            flash(f'{user.username} already has host permissions.', 'info')
-            return redirect_to_appropriate_panel()
-        
-        # Check if already a full admin
-        if 'full_admins' not in data:
-            data['full_admins'] = []
-        if user_id in data['full_admins']:
-            flash(f'{user.username} already has full admin permissions (higher than host).', 'info')
-            return redirect_to_appropriate_panel()
-        
-        data['host_admins'].append(user_id)
-        save_tournament_data(data)
+        with tournament_mutation('host_perms_granted', user_id=user_id):
+            data = get_tournament_data()
+            if 'host_admins' not in data:
+                data['host_admins'] = []
+            
+            # Check if already a host admin
+            if user_id in data['host_admins']:
+                flash(f'{user.username} already has host permissions.', 'info')
+                return redirect_to_appropriate_panel()
+            
+            # Check if already a full admin
+            if 'full_admins' not in data:
+                data['full_admins'] = []
+            if user_id in data['full_admins']:
+                flash(f'{user.username} already has full admin permissions (higher than host).', 'info')
+                return redirect_to_appropriate_panel()
+            
+            data['host_admins'].append(user_id)
+            save_tournament_data(data)
         
         flash(f'Granted host permissions to {user.username}.', 'success')
         
@@ -1324,12 +1217,14 @@ def revoke_host_perms():
     
     try:
         user_id = int(user_id)
-        data = get_tournament_data()
+        with tournament_mutation('host_perms_revoked', user_id=user_id):
+            data = get_tournament_data()
+            revoked = user_id in data.get('host_admins', [])
+            if revoked:
+                data['host_admins'].remove(user_id)
+                save_tournament_data(data)
         
-        if user_id in data.get('host_admins', []):
-            data['host_admins'].remove(user_id)
-            save_tournament_data(data)
-            
+        if revoked:
             user = api.user(user_id)
             flash(f'Revoked host permissions from {user.username}.', 'success')
         else:
@@ -1354,23 +1249,24 @@ def grant_admin_perms():
         user_id = int(user_id)
         user = api.user(user_id)
         
-        data = get_tournament_data()
-        if 'full_admins' not in data:
-            data['full_admins'] = []
-        
-        # Check if already a full admin
-        if user_id in data['full_admins']:
-            flash(f'{user.username} already has full admin permissions.', 'info')
-            return redirect_to_appropriate_panel()
-        
-        # Remove from host admins if present (upgrade)
-        if 'host_admins' not in data:
-            data['host_admins'] = []
-        if user_id in data['host_admins']:
-            data['host_admins'].remove(user_id)
-        
-        data['full_admins'].append(user_id)
-        save_tournament_data(data)
+        with tournament_mutation('admin_perms_granted', user_id=user_id):
+            data = get_tournament_data()
+            if 'full_admins' not in data:
+                data['full_admins'] = []
+            
+            # Check if already a full admin
+            if user_id in data['full_admins']:
+                flash(f'{user.username} already has full admin permissions.', 'info')
+                return redirect_to_appropriate_panel()
+            
+            # Remove from host admins if present (upgrade)
+            if 'host_admins' not in data:
+                data['host_admins'] = []
+            if user_id in data['host_admins']:
+                data['host_admins'].remove(user_id)
+            
+            data['full_admins'].append(user_id)
+            save_tournament_data(data)
         
         flash(f'Granted full admin permissions to {user.username}.', 'success')
         
@@ -1397,12 +1293,14 @@ def revoke_admin_perms():
             flash('Cannot revoke permissions from the main administrator.', 'error')
             return redirect_to_appropriate_panel()
         
-        data = get_tournament_data()
+        with tournament_mutation('admin_perms_revoked', user_id=user_id):
+            data = get_tournament_data()
+            revoked = user_id in data.get('full_admins', [])
+            if revoked:
+                data['full_admins'].remove(user_id)
+                save_tournament_data(data)
         
-        if user_id in data.get('full_admins', []):
-            data['full_admins'].remove(user_id)
-            save_tournament_data(data)
-            
+        if revoked:
             user = api.user(user_id)
             flash(f'Revoked full admin permissions from {user.username}.', 'success')
         else:
@@ -1411,4 +1309,32 @@ def revoke_admin_perms():
     except Exception as e:
         flash(f'Error revoking admin permissions: {str(e)}', 'error')
     
-    return redirect_to_appropriate_panel()
\ No newline at end of file
+    return redirect_to_appropriate_panel()
+
+
+# Diagnostics (Main Admin only)
+@dev_bp.route('/cache_stats')
+@main_admin_required
+def cache_stats():
+    """Hit/miss counters for this worker's in-process caches"""
+    return jsonify({
+        'tournament_data': get_cache_stats(),
+        'osu_api': api.cache_stats(),
+        'room_scores': get_room_cache_stats()
+    })
+
+@dev_bp.route('/score_watcher')
+@main_admin_required
+def score_watcher_status():
+    """Live score watcher counters for this worker (only the watching worker polls)"""
+    return jsonify(live_score_watcher.status())
+
+@dev_bp.route('/journal')
+@main_admin_required
+def journal_history():
+    """Most recent tournament mutations, when the journal storage backend is in use"""
+    backend = get_backend()
+    if not hasattr(backend, 'history'):
+        return jsonify({'error': 'Storage backend keeps no history'}), 404
+    limit = request.args.get('limit', 100, type=int)
+    return jsonify({'entries': backend.history(limit)})
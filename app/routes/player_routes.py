@@ -4,7 +4,8 @@ import re
 import random
 from datetime import datetime, timedelta
 from config import OSU_CLIENT_ID, OSU_CLIENT_SECRET, OSU_CALLBACK_URL, AUTHORIZATION_URL, TOKEN_URL, OSU_API_BASE_URL
-from ..data_manager import get_tournament_data, save_tournament_data
+from ..data_manager import get_tournament_data, save_tournament_data, tournament_lock, tournament_mutation, find_match
+from ..beatmap_store import get_beatmaps
 from .. import api
 
 
@@ -109,83 +110,66 @@ def upload_mappool():
             flash('Room must contain exactly 10 beatmaps, found {}.'.format(len(beatmap_ids)), 'error')
             return redirect(url_for('player.profile'))
 
-    # Fetch detailed beatmap information from osu! API
+    # Fetch detailed beatmap information: known maps from the local beatmap store,
+    # the rest with one batch lookup
     try:
-        beatmap_details = []
-        for beatmap_id in beatmap_ids:
-            try:
-                beatmap = api.beatmap(beatmap_id)
-                if beatmap:
-                    detail = {
-                        'id': beatmap_id,
-                        'title': getattr(beatmap._beatmapset, 'title', 'Unknown Title') if hasattr(beatmap, '_beatmapset') else 'Unknown Title',
-                        'artist': getattr(beatmap._beatmapset, 'artist', 'Unknown Artist') if hasattr(beatmap, '_beatmapset') else 'Unknown Artist',
-                        'difficulty_name': getattr(beatmap, 'version', 'Unknown Difficulty'),
-                        'mapper': getattr(beatmap._beatmapset, 'creator', 'Unknown Mapper') if hasattr(beatmap, '_beatmapset') else 'Unknown Mapper',
-                        'length': getattr(beatmap, 'total_length', 0),
-                        'bpm': getattr(beatmap, 'bpm', 0),
-                        'cs': getattr(beatmap, 'cs', 0),
-                        'od': getattr(beatmap, 'accuracy', 0),
-                        'ar': getattr(beatmap, 'ar', 0),
-                        'hp': getattr(beatmap, 'drain', 0),
-                        'star_rating': getattr(beatmap, 'difficulty_rating', 0),
-                        'url': 'https://osu.ppy.sh/beatmapsets/{}#osu/{}'.format(
-                            getattr(beatmap._beatmapset, 'id', beatmap_id) if hasattr(beatmap, '_beatmapset') else beatmap_id,
-                            beatmap_id
-                        )
-                    }
-                    beatmap_details.append(detail)
-                else:
-                    # Fallback if beatmap data is not available
-                    beatmap_details.append({
-                        'id': beatmap_id,
-                        'title': 'Unknown Title',
-                        'artist': 'Unknown Artist', 
-                        'difficulty_name': 'Unknown Difficulty',
-                        'mapper': 'Unknown Mapper',
-                        'length': 0,
-                        'bpm': 0,
-                        'cs': 0,
-                        'od': 0,
-                        'ar': 0,
-                        'hp': 0,
-                        'star_rating': 0,
-                        'url': 'https://osu.ppy.sh/b/{}'.format(beatmap_id)
-                    })
-            except Exception as beatmap_error:
-                flash('Warning: Could not fetch details for beatmap ID {}: {}'.format(beatmap_id, str(beatmap_error)), 'warning')
-                # Add minimal data as fallback
-                beatmap_details.append({
-                    'id': beatmap_id,
-                    'title': 'Unknown Title',
-                    'artist': 'Unknown Artist',
-                    'difficulty_name': 'Unknown Difficulty', 
-                    'mapper': 'Unknown Mapper',
-                    'length': 0,
-                    'bpm': 0,
-                    'cs': 0,
-                    'od': 0,
-                    'ar': 0,
-                    'hp': 0,
-                    'star_rating': 0,
-                    'url': 'https://osu.ppy.sh/b/{}'.format(beatmap_id)
-                })
-                
+        beatmaps = get_beatmaps(beatmap_ids)
     except Exception as e:
         flash('Error fetching beatmap details: {}'.format(str(e)), 'error')
         return redirect(url_for('player.profile'))
 
-    # Save into tournament data
-    data = get_tournament_data()
-    for comp in data.get('competitors', []):
-        if comp.get('id') == user_id:
-            comp['mappool_ids'] = beatmap_ids
-            comp['mappool_details'] = beatmap_details
-            comp['mappool_url'] = playlist_url if not map_links else ''
-            comp['mappool_uploaded'] = datetime.now().isoformat()
-            break
+    beatmap_details = []
+    for beatmap_id in beatmap_ids:
+        beatmap = beatmaps.get(int(beatmap_id))
+        if not beatmap:
+            flash('Warning: Could not fetch details for beatmap ID {}'.format(beatmap_id), 'warning')
+            # Add minimal data as fallback
+            beatmap_details.append({
+                'id': beatmap_id,
+                'title': 'Unknown Title',
+                'artist': 'Unknown Artist',
+                'difficulty_name': 'Unknown Difficulty',
+                'mapper': 'Unknown Mapper',
+                'length': 0,
+                'bpm': 0,
+                'cs': 0,
+                'od': 0,
+                'ar': 0,
+                'hp': 0,
+                'star_rating': 0,
+                'url': 'https://osu.ppy.sh/b/{}'.format(beatmap_id)
+            })
+            continue
 
-    save_tournament_data(data)
+        beatmapset = beatmap['beatmapset']
+        beatmap_details.append({
+            'id': beatmap_id,
+            'title': beatmapset['title'],
+            'artist': beatmapset['artist'],
+            'difficulty_name': beatmap['version'],
+            'mapper': beatmapset['creator'],
+            'length': beatmap['total_length'] or 0,
+            'bpm': beatmap['bpm'] or 0,
+            'cs': beatmap['cs'] or 0,
+            'od': beatmap['od'] or 0,
+            'ar': beatmap['ar'] or 0,
+            'hp': beatmap['hp'] or 0,
+            'star_rating': beatmap['difficulty_rating'] or 0,
+            'url': 'https://osu.ppy.sh/beatmapsets/{}#osu/{}'.format(beatmapset['id'] or beatmap_id, beatmap_id)
+        })
+
+    # Save into tournament data, re-read under the lock now the beatmaps are fetched
+    with tournament_mutation('mappool_uploaded', user_id=user_id):
+        data = get_tournament_data()
+        for comp in data.get('competitors', []):
+            if comp.get('id') == user_id:
+                comp['mappool_ids'] = beatmap_ids
+                comp['mappool_details'] = beatmap_details
+                comp['mappool_url'] = playlist_url if not map_links else ''
+                comp['mappool_uploaded'] = datetime.now().isoformat()
+                break
+
+        save_tournament_data(data)
     flash('Mappool saved (individual map IDs)!', 'success')
     return redirect(url_for('player.profile'))
 
@@ -198,24 +182,7 @@ def match_interface(match_id):
     data = get_tournament_data()
     
     # Find the match
-    target_match = None
-    for bracket_type in ['upper', 'lower', 'grand_finals']:
-        if bracket_type in data['brackets'] and data['brackets'][bracket_type]:
-            if bracket_type == 'grand_finals':
-                match = data['brackets'][bracket_type]
-                if isinstance(match, dict) and match.get('id') == match_id:
-                    target_match = match
-                    break
-            else:
-                for round_matches in data['brackets'][bracket_type]:
-                    for match in round_matches:
-                        if match and match.get('id') == match_id:
-                            target_match = match
-                            break
-                    if target_match:
-                        break
-        if target_match:
-            break
+    target_match, _ = find_match(data, match_id)
     
     if not target_match:
         flash('Match not found.', 'error')
@@ -270,6 +237,7 @@ def match_interface(match_id):
 
 @player_bp.route('/match/<string:match_id>/action', methods=['POST'])
 @player_required
+@tournament_lock()
 def match_action(match_id):
     """Handle pick/ban/ability actions in a match"""
     user_id = session.get('user_id')
@@ -283,24 +251,7 @@ def match_action(match_id):
     data = get_tournament_data()
     
     # Find the match
-    target_match = None
-    for bracket_type in ['upper', 'lower', 'grand_finals']:
-        if bracket_type in data['brackets'] and data['brackets'][bracket_type]:
-            if bracket_type == 'grand_finals':
-                match = data['brackets'][bracket_type]
-                if isinstance(match, dict) and match.get('id') == match_id:
-                    target_match = match
-                    break
-            else:
-                for round_matches in data['brackets'][bracket_type]:
-                    for match in round_matches:
-                        if match and match.get('id') == match_id:
-                            target_match = match
-                            break
-                    if target_match:
-                        break
-        if target_match:
-            break
+    target_match, _ = find_match(data, match_id)
     
     if not target_match:
         return jsonify({'error': 'Match not found'}), 404
@@ -584,7 +535,8 @@ def match_action(match_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     
-    save_tournament_data(data)
+    with tournament_mutation(action_type, match_id=match_id, player=player_key):
+        save_tournament_data(data)
     return jsonify({
         'success': True,
         'match_state': match_state
@@ -599,24 +551,7 @@ def match_state(match_id):
     data = get_tournament_data()
     
     # Find the match
-    target_match = None
-    for bracket_type in ['upper', 'lower', 'grand_finals']:
-        if bracket_type in data['brackets'] and data['brackets'][bracket_type]:
-            if bracket_type == 'grand_finals':
-                match = data['brackets'][bracket_type]
-                if isinstance(match, dict) and match.get('id') == match_id:
-                    target_match = match
-                    break
-            else:
-                for round_matches in data['brackets'][bracket_type]:
-                    for match in round_matches:
-                        if match and match.get('id') == match_id:
-                            target_match = match
-                            break
-                    if target_match:
-                        break
-        if target_match:
-            break
+    target_match, _ = find_match(data, match_id)
     
     if not target_match:
         return jsonify({'error': 'Match not found'}), 404
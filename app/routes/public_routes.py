@@ -1,9 +1,17 @@
-from flask import Blueprint, render_template, redirect, request, url_for, flash, jsonify, session
+from flask import Blueprint, render_template, redirect, request, url_for, flash, jsonify, session, make_response, Response
 import requests
-from datetime import datetime, timedelta
+import hashlib
+import json
+import time
+from datetime import datetime
 from config import OSU_CLIENT_ID, OSU_CLIENT_SECRET, OSU_CALLBACK_URL, AUTHORIZATION_URL, TOKEN_URL, OSU_API_BASE_URL, ADMIN_OSU_ID
-from ..data_manager import get_tournament_data, save_tournament_data
+from config import LIVE_UPDATE_PUSH, LIVE_UPDATE_CHECK_SECONDS, SSE_HEARTBEAT_SECONDS, SSE_MAX_SECONDS, SSE_RETRY_MS, LONG_POLL_MAX_SECONDS
+from config import PREDICTION_SIMULATIONS, PREDICTION_SIMULATION_CHOICES
+from ..data_manager import get_tournament_data, save_tournament_data, tournament_mutation, find_match, get_data_version
 from ..bracket_logic import generate_bracket
+from ..bracket_engine import bracket_shape
+from ..bracket_predictor import get_predictions, predictions_available, bracket_version
+from ..services.competitor_refresher import competitor_refresher
 from .. import api
 
 
@@ -57,37 +65,13 @@ def minecraft():
 
 @public_bp.route('/tournament')
 def tournament():
+    # Competitor stats are refreshed in the background; just make sure this worker's
+    # refresher is running and render what is stored
+    competitor_refresher.start()
     data = get_tournament_data()
-    
-    now = datetime.utcnow()
-    should_refresh = True
-    
-    # Check if we should refresh based on the last update time
-    last_updated_str = data.get('last_updated')
-    if last_updated_str:
-        try:
-            last_updated = datetime.fromisoformat(last_updated_str)
-            if last_updated > (now - timedelta(minutes=5)):
-                should_refresh = False
-        except ValueError:
-            print("Invalid timestamp format in tournament data. Forcing refresh.")
-
-    if should_refresh and 'competitors' in data and data['competitors']:
-        print("Cache expired or invalid. Refreshing competitor data from osu! API.")
-        for competitor in data['competitors']:
-            try:
-                user_details = api.user(competitor['id'])
-                competitor['name'] = user_details.username
-                competitor['pp'] = user_details.statistics.pp if user_details.statistics else 0
-                competitor['rank'] = user_details.statistics.global_rank if user_details.statistics else 0
-                competitor['avatar_url'] = user_details.avatar_url
-            except Exception as e:
-                print(f"Could not update user {competitor.get('id')}: {e}")
-        
-        data['last_updated'] = now.isoformat()
-        save_tournament_data(data)
-    
-    return render_template('tournament.html', data=data)
+    # Rounds come from the stored bracket; the competitors only shape one not generated yet
+    bracket_plan = bracket_shape(data)
+    return render_template('tournament.html', data=data, bracket_plan=bracket_plan)
 
 
 @public_bp.route('/tournament/details')
@@ -155,10 +139,13 @@ def osu_callback():
             'avatar_url': user_json.get('avatar_url'),
             'signup_time': datetime.utcnow().isoformat()
         }
-        if 'pending_signups' not in data:
-            data['pending_signups'] = []
-        data['pending_signups'].append(new_signup)
-        save_tournament_data(data)
+        # Re-read under the writer lock so a concurrent save isn't overwritten
+        with tournament_mutation('signup_submitted', user_id=user_id):
+            data = get_tournament_data()
+            if 'pending_signups' not in data:
+                data['pending_signups'] = []
+            data['pending_signups'].append(new_signup)
+            save_tournament_data(data)
         flash('Your signup has been submitted and is pending approval by tournament administrators.', 'success')
         return redirect(url_for('public.tournament'))
     
@@ -214,27 +201,7 @@ def match_details(match_id):
     data = get_tournament_data()
     
     # Find the match across all brackets
-    target_match = None
-    for bracket_type in ['upper', 'lower', 'grand_finals']:
-        if bracket_type in data['brackets'] and data['brackets'][bracket_type]:
-            if bracket_type == 'grand_finals':
-                match = data['brackets'][bracket_type]
-                if isinstance(match, dict) and match.get('id') == match_id:
-                    target_match = match
-                    break
-                if match.get('previous_gf') and match['previous_gf'].get('id') == match_id:
-                    target_match = match['previous_gf']
-                    break
-            else:
-                for round_matches in data['brackets'][bracket_type]:
-                    for match in round_matches:
-                        if match.get('id') == match_id:
-                            target_match = match
-                            break
-                    if target_match:
-                        break
-            if target_match:
-                break
+    target_match, _ = find_match(data, match_id)
     
     if not target_match:
         flash('Match not found.', 'error')
@@ -251,21 +218,30 @@ def match_details(match_id):
 @public_bp.route('/overlay')
 def tournament_overlay():
     """Serve the tournament overlay for streaming"""
-    return render_template('streaming/tourney_overlay.html')
+    return render_template('streaming/tourney_overlay.html', live_update_push=LIVE_UPDATE_PUSH)
 
 # API Routes for HTTP polling (Namecheap compatible)
+def make_etag(*versions):
+    """Strong ETag for a response that only depends on the given data versions"""
+    return hashlib.blake2b(repr(versions).encode(), digest_size=12).hexdigest()
+
+def conditional_json(etag, build_payload):
+    """304 with an empty body if the client already has `etag`, else the JSON from build_payload()"""
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = jsonify(build_payload())
+    response.set_etag(etag)
+    # Clients may keep the response but must revalidate before using it
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @public_bp.route('/api/match-data')
 def get_match_data():
     """Get current match data for overlay polling"""
     try:
-        from ..http_events import get_current_match_data
-        match_data = get_current_match_data()
-        
-        # Add timestamp for cache busting
-        data = get_tournament_data()
-        match_data['last_updated'] = data.get('last_updated', '')
-        
-        return jsonify(match_data)
+        from ..http_events import build_match_data
+        return conditional_json(make_etag('match-data', get_data_version()), build_match_data)
             
     except Exception as e:
         return jsonify({
@@ -277,15 +253,13 @@ def get_match_data():
 def get_overlay_events():
     """Get overlay events (victory screens, AFK status, etc.)"""
     try:
-        from ..overlay_state import get_overlay_state
-        state = get_overlay_state()
+        from ..overlay_state import get_overlay_state_version
+        from ..http_events import build_overlay_events
         
-        return jsonify({
-            'events': state.get('events', []),
-            'afk_mode': state.get('afk_mode', False),
-            'victory_screen_hidden': state.get('victory_screen_hidden', False),
-            'timestamp': state.get('last_updated', '')
-        })
+        # ?after=<seq> returns only events the client hasn't seen
+        after = request.args.get('after', type=int)
+        return conditional_json(make_etag('overlay-events', get_overlay_state_version(), after),
+                                lambda: build_overlay_events(after))
     except Exception as e:
         return jsonify({
             'error': str(e),
@@ -294,140 +268,154 @@ def get_overlay_events():
 
 @public_bp.route('/api/match-interface-state')
 def get_match_interface_state():
-    """Get current match interface state for streaming overlay"""
+    """Get current match interface state for streaming overlay. With ?since=<version> (from
+    a previous response, empty for the first one) only the keys changed since then are sent."""
     try:
-        from ..http_events import get_current_match_data
-        match_data = get_current_match_data()
-        
-        if not match_data.get('match_found'):
-            return jsonify({
-                'match_found': False,
-                'message': 'No active match found'
-            })
+        from ..http_events import build_match_interface_state, diff_interface_state
         
-        # Get the full tournament data to access match_state
-        data = get_tournament_data()
-        current_match = None
+        since = request.args.get('since')
+        if since is None:
+            return conditional_json(make_etag('match-interface-state', get_data_version()),
+                                    build_match_interface_state)
+        return conditional_json(make_etag('match-interface-state', get_data_version(), since),
+                                lambda: diff_interface_state(since, build_match_interface_state()))
         
-        # Find the current match in the bracket structure using round-based priority
-        # Determine max rounds to search through
-        max_rounds = 10
-        if 'upper' in data.get('brackets', {}):
-            max_rounds = len(data['brackets']['upper'])
-        if 'lower' in data.get('brackets', {}) and len(data['brackets']['lower']) > max_rounds:
-            max_rounds = len(data['brackets']['lower'])
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'match_found': False
+        }), 500
+
+
+@public_bp.route('/api/overlay-snapshot')
+def get_overlay_snapshot():
+    """Match data, match interface state and overlay events in one response, from a single
+    read of the state. Pass each section's last version (?match=&interface=&overlay_events=)
+    to have unchanged sections sent as null, and ?after=<seq> for new overlay events only."""
+    try:
+        from ..overlay_state import get_overlay_state_version
+        from ..http_events import build_overlay_snapshot
         
-        # First look for in_progress matches with round priority
-        for round_num in range(1, max_rounds + 1):
-            if current_match:
-                break
-                
-            # Check upper bracket round first
-            if 'upper' in data.get('brackets', {}) and len(data['brackets']['upper']) >= round_num:
-                round_matches = data['brackets']['upper'][round_num - 1]
-                for match in round_matches:
-                    if match and match.get('status') == 'in_progress':
-                        current_match = match
-                        break
+        known_versions = {name: request.args.get(name) for name in ('match', 'interface', 'overlay_events')}
+        after = request.args.get('after', type=int)
+        etag = make_etag('overlay-snapshot', get_data_version(), get_overlay_state_version(),
+                         sorted(known_versions.items()), after)
+        return conditional_json(etag, lambda: build_overlay_snapshot(known_versions, after))
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+
+@public_bp.route('/api/predictions')
+def get_bracket_predictions():
+    """Each competitor's chance to win and to reach every round, from simulating the rest of
+    the bracket (?simulations=<n>, one of PREDICTION_SIMULATION_CHOICES). Results are cached per
+    bracket version, so scores of matches in progress don't trigger a new simulation."""
+    if not predictions_available():
+        return jsonify({'error': 'Predictions are not available on this server'}), 503
+    try:
+        simulations = request.args.get('simulations', PREDICTION_SIMULATIONS, type=int)
+        if simulations not in PREDICTION_SIMULATION_CHOICES:
+            # Any other count would be a cache miss, simulated on this request thread
+            simulations = PREDICTION_SIMULATIONS
+        data = get_tournament_data()
+        return conditional_json(make_etag('predictions', bracket_version(data), simulations),
+                                lambda: get_predictions(data, simulations))
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+@public_bp.route('/api/overlay-stream')
+def overlay_stream():
+    """Server-Sent Events push channel for the overlay: 'match', 'interface' and
+    'overlay-events' messages carry the same payloads as the polling endpoints and are
+    sent as soon as the underlying state changes. Only served with LIVE_UPDATE_PUSH, as each
+    open stream holds a worker for up to SSE_MAX_SECONDS"""
+    if not LIVE_UPDATE_PUSH:
+        return jsonify({'error': 'Live push updates are not enabled on this server'}), 404
+    from ..http_events import build_match_data, build_match_interface_state, build_overlay_events
+    from ..live_updates import current_versions, wait_for_change
+    
+    def generate():
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        deadline = time.monotonic() + SSE_MAX_SECONDS
+        versions = None
+        sent = {}
+        events_after = None  # sequence number of the last overlay event sent on this stream
+        while time.monotonic() < deadline:
+            if versions is None:
+                new_versions = current_versions()
+            else:
+                timeout = min(SSE_HEARTBEAT_SECONDS, deadline - time.monotonic())
+                new_versions = wait_for_change(versions, timeout, LIVE_UPDATE_CHECK_SECONDS)
+                if new_versions == versions:
+                    yield ": keep-alive\n\n"
+                    continue
             
-            # Then check lower bracket round
-            if not current_match and 'lower' in data.get('brackets', {}) and len(data['brackets']['lower']) >= round_num:
-                round_matches = data['brackets']['lower'][round_num - 1]
-                for match in round_matches:
-                    if match and match.get('status') == 'in_progress':
-                        current_match = match
-                        break
-        
-        # Check grand finals for in_progress
-        if not current_match and 'grand_finals' in data.get('brackets', {}):
-            match = data['brackets']['grand_finals']
-            if match and match.get('status') == 'in_progress':
-                current_match = match
-        
-        # If no in_progress match found, look for next_up matches with same round priority
-        if not current_match:
-            for round_num in range(1, max_rounds + 1):
-                if current_match:
-                    break
-                    
-                # Check upper bracket round first
-                if 'upper' in data.get('brackets', {}) and len(data['brackets']['upper']) >= round_num:
-                    round_matches = data['brackets']['upper'][round_num - 1]
-                    for match in round_matches:
-                        if match and match.get('status') == 'next_up':
-                            current_match = match
-                            break
-                
-                # Then check lower bracket round
-                if not current_match and 'lower' in data.get('brackets', {}) and len(data['brackets']['lower']) >= round_num:
-                    round_matches = data['brackets']['lower'][round_num - 1]
-                    for match in round_matches:
-                        if match and match.get('status') == 'next_up':
-                            current_match = match
-                            break
+            sections = []
+            if versions is None or new_versions['tournament'] != versions['tournament']:
+                sections += [('match', build_match_data), ('interface', build_match_interface_state)]
+            if versions is None or new_versions['overlay'] != versions['overlay']:
+                sections.append(('overlay-events', lambda: build_overlay_events(events_after)))
+            versions = new_versions
             
-            # Check grand finals for next_up
-            if not current_match and 'grand_finals' in data.get('brackets', {}):
-                match = data['brackets']['grand_finals']
-                if match and match.get('status') == 'next_up':
-                    current_match = match
-        
-        if not current_match:
-            return jsonify({
-                'match_found': False,
-                'message': 'Current match not found in brackets'
-            })
-        
-        # Extract match interface data
-        match_state = current_match.get('match_state', {})
-        
-        # Get mappool details from both players
-        player1_mappool = current_match.get('player1', {}).get('mappool_details', [])
-        player2_mappool = current_match.get('player2', {}).get('mappool_details', [])
-        combined_mappool = player1_mappool + player2_mappool
+            for name, build_payload in sections:
+                data = build_payload()
+                if name == 'overlay-events':
+                    events_after = data['last_seq']
+                payload = json.dumps(data)
+                # A save doesn't always change what the overlay shows
+                if sent.get(name) != payload:
+                    sent[name] = payload
+                    yield f"event: {name}\ndata: {payload}\n\n"
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # don't let nginx/Passenger buffer the stream
+    return response
+
+
+@public_bp.route('/api/overlay-changes')
+def overlay_changes():
+    """Long-poll for hosts without streaming support: the request is held until the
+    match/overlay state moves past `cursor` or `timeout` seconds pass, then returns the
+    changed sections and the cursor to send next time. No cursor returns everything.
+    `events_after` is the last overlay event sequence number the client has handled.
+    Gated by LIVE_UPDATE_PUSH like the event stream, as it holds a worker the same way."""
+    if not LIVE_UPDATE_PUSH:
+        return jsonify({'error': 'Live push updates are not enabled on this server', 'changes': {}}), 404
+    try:
+        from ..http_events import build_match_data, build_match_interface_state, build_overlay_events
+        from ..live_updates import wait_for_cursor, changed_sections, version_cursor
         
-        # Calculate interface lock status
-        picked_maps = match_state.get('picked_maps', [])
-        current_score = current_match.get('score_p1', 0) + current_match.get('score_p2', 0)
-        is_interface_locked = len(picked_maps) > 0 and current_score < len(picked_maps)
+        cursor = request.args.get('cursor', '')
+        events_after = request.args.get('events_after', type=int)
+        timeout = request.args.get('timeout', LONG_POLL_MAX_SECONDS, type=float)
+        timeout = max(0, min(timeout, LONG_POLL_MAX_SECONDS))
         
-        # Debug logging
-        print(f"Match interface API debug:")
-        print(f"  Current match ID: {current_match.get('id', 'no-id')}")
-        print(f"  Player1 mappool count: {len(player1_mappool)}")
-        print(f"  Player2 mappool count: {len(player2_mappool)}")
-        print(f"  Combined mappool count: {len(combined_mappool)}")
-        print(f"  Picked maps count: {len(picked_maps)}")
-        print(f"  Current score total: {current_score}")
-        print(f"  Interface locked: {is_interface_locked}")
+        versions = wait_for_cursor(cursor, timeout, LIVE_UPDATE_CHECK_SECONDS)
+        changed = changed_sections(cursor, versions)
+        changes = {}
+        if 'tournament' in changed:
+            changes['match'] = build_match_data()
+            changes['interface'] = build_match_interface_state()
+        if 'overlay' in changed:
+            changes['overlay_events'] = build_overlay_events(events_after)
         
-        return jsonify({
-            'match_found': True,
-            'player1': current_match.get('player1', {}),
-            'player2': current_match.get('player2', {}),
-            'score_p1': current_match.get('score_p1', 0),
-            'score_p2': current_match.get('score_p2', 0),
-            'phase': match_state.get('phase', 'waiting'),
-            'current_turn': match_state.get('current_turn', ''),
-            'first_player': match_state.get('first_player', ''),
-            'banned_maps': match_state.get('banned_maps', []),
-            'picked_maps': picked_maps,
-            'abilities_used': match_state.get('abilities_used', {}),
-            'mappool': combined_mappool,
-            'action_log': match_state.get('action_log', []),
-            'interface_locked': is_interface_locked,
-            'tiebreaker_map_url': current_match.get('tiebreaker_map_url'),
-            'is_tiebreaker': current_match.get('score_p1', 0) == 3 and current_match.get('score_p2', 0) == 3,
-            'timestamp': data.get('last_updated', '')
+        response = jsonify({
+            'cursor': version_cursor(versions),
+            'changes': changes
         })
-        
+        response.headers['Cache-Control'] = 'no-store'
+        return response
     except Exception as e:
         return jsonify({
             'error': str(e),
-            'match_found': False
+            'changes': {}
         }), 500
 
-
 @public_bp.route('/api/user/<int:user_id>')
 def api_get_user(user_id):
     """Simple API endpoint to get user information"""
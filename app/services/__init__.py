@@ -5,5 +5,8 @@ Service modules for the tournament application
 from .match_service import MatchService
 from .seeding_service import SeedingService
 from .streaming_service import StreamingService
+from .competitor_refresher import CompetitorRefresher, competitor_refresher
+from .score_watcher import LiveScoreWatcher, live_score_watcher
 
-__all__ = ['MatchService', 'SeedingService', 'StreamingService']
+__all__ = ['MatchService', 'SeedingService', 'StreamingService', 'CompetitorRefresher', 'competitor_refresher',
+           'LiveScoreWatcher', 'live_score_watcher']
@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from config import COMPETITOR_REFRESH_SECONDS
+from ..data_manager import get_tournament_data, save_tournament_data, tournament_mutation
+from ..utils.user_utils import fetch_users, user_statistics
+from .. import api
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single-flight within this worker only
+    fcntl = None
+
+REFRESH_LOCK_FILE = 'competitor_refresh.lock'
+
+
+class CompetitorRefresher:
+    """Keeps competitor pp/rank/avatar up to date off the request path.
+
+    Each worker runs a scheduler thread that refreshes the stats once they are older
+    than `interval` seconds. Refreshes are single-flight across threads and workers:
+    whoever holds the lock file refreshes, everyone else skips that round.
+    """
+
+    def __init__(self, interval, lock_file=REFRESH_LOCK_FILE):
+        self.interval = interval
+        self.lock_file = lock_file
+        self.api = api
+        self._run_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        """Starts this worker's scheduler thread if it isn't running (threads don't survive a fork)"""
+        if self.interval <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run_forever, name='competitor-refresher', daemon=True)
+        self._thread.start()
+
+    def _run_forever(self):
+        while True:
+            try:
+                self.refresh_if_due()
+            except Exception as e:
+                print(f"Error refreshing competitor stats: {e}")
+            time.sleep(min(self.interval, 60))
+
+    def is_due(self, data):
+        """True if there are competitors and their stats are older than the interval"""
+        if not data.get('competitors'):
+            return False
+        try:
+            last_updated = datetime.fromisoformat(data.get('last_updated') or '')
+        except ValueError:
+            return True
+        return last_updated <= datetime.utcnow() - timedelta(seconds=self.interval)
+
+    def refresh_if_due(self):
+        """Refreshes the stats if they are due and no other refresh is running; True if this call did"""
+        if not self.is_due(get_tournament_data()):
+            return False
+        if not self._run_lock.acquire(blocking=False):
+            return False
+        try:
+            with open(self.lock_file, 'a') as lock_file:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)  # released when the file is closed
+                    except OSError:
+                        return False  # another worker is refreshing
+                # Another worker may have finished a refresh since we checked
+                if not self.is_due(get_tournament_data()):
+                    return False
+                self.refresh()
+                return True
+        finally:
+            self._run_lock.release()
+
+    def refresh(self):
+        """Fetches every competitor's stats and records when the refresh ran and how long it took"""
+        started = time.monotonic()
+        started_at = datetime.utcnow()
+        users = fetch_users(self.api, [competitor['id'] for competitor in get_tournament_data().get('competitors', [])])
+        
+        # Apply to the current data in case it changed during the lookup
+        with tournament_mutation('competitors_refreshed'):
+            data = get_tournament_data()
+            updated = 0
+            failed = 0
+            for competitor in data.get('competitors', []):
+                user_details = users.get(int(competitor['id']))
+                if not user_details:
+                    print(f"Could not update user {competitor.get('id')}")
+                    failed += 1
+                    continue
+                statistics = user_statistics(user_details)
+                competitor['name'] = user_details.username
+                competitor['pp'] = statistics.pp if statistics else 0
+                competitor['rank'] = statistics.global_rank if statistics else 0
+                competitor['avatar_url'] = user_details.avatar_url
+                updated += 1
+            
+            data['last_updated'] = started_at.isoformat()
+            data['competitor_refresh'] = {
+                'last_run': started_at.isoformat(),
+                'duration_seconds': round(time.monotonic() - started, 2),
+                'updated': updated,
+                'failed': failed
+            }
+            save_tournament_data(data)
+
+
+competitor_refresher = CompetitorRefresher(COMPETITOR_REFRESH_SECONDS)
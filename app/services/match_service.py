@@ -1,8 +1,9 @@
 import re
 from datetime import datetime
-from ..data_manager import get_tournament_data, save_tournament_data
-from ..bracket_logic import advance_round_if_ready
-from ..utils.match_utils import get_detailed_match_results
+from ..data_manager import get_tournament_data, save_tournament_data, tournament_mutation, find_match
+from ..match_index import iter_matches
+from ..bracket_logic import report_match_result
+from ..utils.match_utils import get_detailed_match_results, fetch_room_scores
 from .. import api
 
 
@@ -13,44 +14,34 @@ class MatchService:
     def find_match(self, match_id):
         """Find a match by ID across all brackets"""
         data = get_tournament_data()
-        
-        for bracket_type in ['upper', 'lower', 'grand_finals']:
-            if bracket_type in data['brackets'] and data['brackets'][bracket_type]:
-                if bracket_type == 'grand_finals':
-                    matches_to_check = [data['brackets'][bracket_type]]
-                    if data['brackets'][bracket_type].get('previous_gf'):
-                        matches_to_check.append(data['brackets'][bracket_type]['previous_gf'])
-                else:
-                    matches_to_check = []
-                    for round_matches in data['brackets'][bracket_type]:
-                        matches_to_check.extend(round_matches)
-                
-                for match in matches_to_check:
-                    if match and match.get('id') == match_id:
-                        return match, data
+        match, _ = find_match(data, match_id)
+        if match:
+            return match, data
         return None, None
     
     def start_match(self, match_id):
         """Start a match by setting its status to in_progress"""
-        match, data = self.find_match(match_id)
-        if match:
-            match['status'] = 'in_progress'
-            save_tournament_data(data)
-            return True
-        return False
+        with tournament_mutation('match_started', match_id=match_id):
+            match, data = self.find_match(match_id)
+            if match:
+                match['status'] = 'in_progress'
+                save_tournament_data(data)
+                return True
+            return False
     
     def reset_match(self, match_id):
         """Reset a match to next_up status"""
-        match, data = self.find_match(match_id)
-        if match:
-            match['status'] = 'next_up'
-            match['winner'] = None
-            match['score_p1'] = 0
-            match['score_p2'] = 0
-            match['mp_room_url'] = None
-            save_tournament_data(data)
-            return True
-        return False
+        with tournament_mutation('match_reset', match_id=match_id):
+            match, data = self.find_match(match_id)
+            if match:
+                match['status'] = 'next_up'
+                match['winner'] = None
+                match['score_p1'] = 0
+                match['score_p2'] = 0
+                match['mp_room_url'] = None
+                save_tournament_data(data)
+                return True
+            return False
     
     def set_match_score(self, match_id, score_p1, score_p2, mp_room_url):
         """Set match score and update status"""
@@ -66,82 +57,86 @@ class MatchService:
         if score_p1 == 4 and score_p2 == 4:
             return {'message': 'Both players cannot have 4 points.', 'type': 'error'}
         
-        match, data = self.find_match(match_id)
-        if not match:
-            return {'message': 'Match not found.', 'type': 'error'}
+        with tournament_mutation('score_set', match_id=match_id, score_p1=score_p1, score_p2=score_p2):
+            match, data = self.find_match(match_id)
+            if not match:
+                return {'message': 'Match not found.', 'type': 'error'}
+            if not (match['player1'].get('id') and match['player2'].get('id')):
+                return {'message': 'Both players of this match are not known yet.', 'type': 'error'}
         
-        # Store previous scores to detect changes
-        prev_score_p1 = match.get('score_p1', 0)
-        prev_score_p2 = match.get('score_p2', 0)
+            # Store previous scores to detect changes
+            prev_score_p1 = match.get('score_p1', 0)
+            prev_score_p2 = match.get('score_p2', 0)
         
-        match['score_p1'] = score_p1
-        match['score_p2'] = score_p2
+            match['score_p1'] = score_p1
+            match['score_p2'] = score_p2
         
-        if mp_room_url:
-            if 'osu.ppy.sh/multiplayer/rooms/' in mp_room_url:
-                match['mp_room_url'] = mp_room_url
+            if mp_room_url:
+                if 'osu.ppy.sh/multiplayer/rooms/' in mp_room_url:
+                    match['mp_room_url'] = mp_room_url
+                else:
+                    return {'message': 'Invalid multiplayer room URL format.', 'type': 'error'}
             else:
-                return {'message': 'Invalid multiplayer room URL format.', 'type': 'error'}
-        else:
-            match['mp_room_url'] = None
+                match['mp_room_url'] = None
         
-        # Handle turn order changes when score is updated
-        if 'match_state' in match and (score_p1 != prev_score_p1 or score_p2 != prev_score_p2):
-            match_state = match['match_state']
+            # Handle turn order changes when score is updated
+            if 'match_state' in match and (score_p1 != prev_score_p1 or score_p2 != prev_score_p2):
+                match_state = match['match_state']
             
-            # If a point was scored and we have picked maps
-            picks_made = len(match_state.get('picked_maps', []))
-            if picks_made >= 1:
-                # Determine who lost the last round and should pick first next
-                if score_p1 > prev_score_p1:
-                    # Player 1 won, so Player 2 should pick first next round
-                    match_state['current_turn'] = 'player2'
-                elif score_p2 > prev_score_p2:
-                    # Player 2 won, so Player 1 should pick first next round  
-                    match_state['current_turn'] = 'player1'
+                # If a point was scored and we have picked maps
+                picks_made = len(match_state.get('picked_maps', []))
+                if picks_made >= 1:
+                    # Determine who lost the last round and should pick first next
+                    if score_p1 > prev_score_p1:
+                        # Player 1 won, so Player 2 should pick first next round
+                        match_state['current_turn'] = 'player2'
+                    elif score_p2 > prev_score_p2:
+                        # Player 2 won, so Player 1 should pick first next round  
+                        match_state['current_turn'] = 'player1'
                 
-                # Ensure we're in pick phase if the match isn't completed
-                if score_p1 < 4 and score_p2 < 4:
-                    match_state['phase'] = 'pick'
+                    # Ensure we're in pick phase if the match isn't completed
+                    if score_p1 < 4 and score_p2 < 4:
+                        match_state['phase'] = 'pick'
         
-        # Determine winner and status
-        if score_p1 == 4:
-            match['winner'] = match['player1']
-            match['status'] = 'completed'
-        elif score_p2 == 4:
-            match['winner'] = match['player2']
-            match['status'] = 'completed'
-        else:
-            match['winner'] = None
-            if score_p1 > 0 or score_p2 > 0:
-                match['status'] = 'in_progress'
+            # Determine winner and status
+            if score_p1 == 4:
+                match['winner'] = match['player1']
+                match['status'] = 'completed'
+            elif score_p2 == 4:
+                match['winner'] = match['player2']
+                match['status'] = 'completed'
             else:
-                match['status'] = match.get('status', 'next_up')
+                match['winner'] = None
+                if score_p1 > 0 or score_p2 > 0:
+                    match['status'] = 'in_progress'
+                else:
+                    match['status'] = match.get('status', 'next_up')
         
-        save_tournament_data(data)
-        advance_round_if_ready(data)
-        return {'message': 'Match score updated successfully.', 'type': 'success'}
+            save_tournament_data(data)
+            report_match_result(data, match)
+            return {'message': 'Match score updated successfully.', 'type': 'success'}
     
     def set_winner(self, match_id, winner_id):
         """Set match winner directly"""
-        match, data = self.find_match(match_id)
-        if not match:
-            return {'message': 'Match not found.', 'type': 'error'}
+        with tournament_mutation('winner_set', match_id=match_id, winner_id=winner_id):
+            match, data = self.find_match(match_id)
+            if not match:
+                return {'message': 'Match not found.', 'type': 'error'}
         
-        if match.get('player1', {}).get('id') and str(match['player1']['id']) == winner_id:
-            match['winner'] = match['player1']
-            match['score_p1'] = 4
-            match['score_p2'] = 0
-        elif match.get('player2', {}).get('id') and str(match['player2']['id']) == winner_id:
-            match['winner'] = match['player2']
-            match['score_p1'] = 0
-            match['score_p2'] = 4
-        else:
-            return {'message': 'Invalid winner ID.', 'type': 'error'}
+            if match.get('player1', {}).get('id') and str(match['player1']['id']) == winner_id:
+                match['winner'] = match['player1']
+                match['score_p1'] = 4
+                match['score_p2'] = 0
+            elif match.get('player2', {}).get('id') and str(match['player2']['id']) == winner_id:
+                match['winner'] = match['player2']
+                match['score_p1'] = 0
+                match['score_p2'] = 4
+            else:
+                return {'message': 'Invalid winner ID.', 'type': 'error'}
         
-        match['status'] = 'completed'
-        advance_round_if_ready(data)
-        return {'message': 'Winner set successfully.', 'type': 'success'}
+            match['status'] = 'completed'
+            report_match_result(data, match)
+            return {'message': 'Winner set successfully.', 'type': 'success'}
     
     def extract_room_id(self, url):
         """Extract room ID from multiplayer URL"""
@@ -162,10 +157,14 @@ class MatchService:
         
         return None
     
-    def get_match_results(self, room_id, player1_id, player2_id):
-        """Fetch match results from API"""
+    def fetch_room_scores(self, room_id):
+        """The room and its playlist scores, fetched once for get_match_results and the detailed results"""
+        return fetch_room_scores(self.api, room_id)
+    
+    def get_match_results(self, room_id, player1_id, player2_id, room_scores=None):
+        """Fetch match results from API, or work them out from `room_scores` already fetched"""
         try:
-            room = self.api.room(room_id)
+            room, playlist_scores = room_scores or self.fetch_room_scores(room_id)
             
             if not room.playlist:
                 return None, 0, 0, 'no_playlist'
@@ -173,9 +172,10 @@ class MatchService:
             player1_wins = 0
             player2_wins = 0
             
-            for playlist_item in room.playlist:
+            for playlist_item, scores_data, error in playlist_scores:
                 try:
-                    scores_data = self.api.multiplayer_scores(room_id, playlist_item.id)
+                    if error:
+                        raise error
                     
                     p1_score = None
                     p2_score = None
@@ -213,8 +213,13 @@ class MatchService:
             print(f"Error fetching match results for room {room_id}: {e}")
             return None, 0, 0, 'error'
     
-    def refresh_match_scores(self, match_id):
-        """Automatically refresh match scores from multiplayer room"""
+    def refresh_match_scores(self, match_id, results=None, room_scores=None):
+        """Automatically refresh match scores from multiplayer room.
+
+        A caller that already fetched the room passes its `room_scores` (see fetch_room_scores)
+        and the `results` (winner_id, score_p1, score_p2, status) it got from them, so the
+        room isn't fetched again.
+        """
         match, data = self.find_match(match_id)
         if not match:
             return {'message': 'Match not found.', 'type': 'error'}
@@ -229,81 +234,97 @@ class MatchService:
         if not player1_id or not player2_id:
             return {'message': 'Player IDs not found in match data.', 'type': 'error'}
         
-        # Fetch basic results
-        winner_id, score_p1, score_p2, status = self.get_match_results(room_id, player1_id, player2_id)
+        # One fetch of the room serves both the basic and the detailed results
+        if room_scores is None:
+            try:
+                room_scores = self.fetch_room_scores(room_id)
+            except Exception as e:
+                print(f"Error fetching match results for room {room_id}: {e}")
+                return {'message': 'Error fetching scores from the multiplayer room.', 'type': 'error'}
         
-        # Fetch and cache detailed results
-        detailed_results = get_detailed_match_results(room_id, player1_id, player2_id)
-        if detailed_results:
-            match['detailed_results'] = detailed_results
+        # Basic results
+        winner_id, score_p1, score_p2, status = results or self.get_match_results(room_id, player1_id, player2_id,
+                                                                                  room_scores)
         
-        # Update match
-        match['score_p1'] = score_p1
-        match['score_p2'] = score_p2
+        # Detailed results, cached on the match
+        detailed_results = get_detailed_match_results(room_id, player1_id, player2_id, room_scores)
         
-        if status == 'completed' and winner_id:
-            if winner_id == player1_id:
-                match['winner'] = match['player1']
+        # The API calls above can take seconds, so only hold the writer lock for the
+        # update and re-read the match in case it changed while we were fetching
+        with tournament_mutation('scores_refreshed', match_id=match_id):
+            match, data = self.find_match(match_id)
+            if not match:
+                return {'message': 'Match not found.', 'type': 'error'}
+            
+            if detailed_results:
+                match['detailed_results'] = detailed_results
+        
+            # Update match
+            match['score_p1'] = score_p1
+            match['score_p2'] = score_p2
+        
+            if status == 'completed' and winner_id:
+                if winner_id == player1_id:
+                    match['winner'] = match['player1']
+                else:
+                    match['winner'] = match['player2']
+                match['status'] = 'completed'
+                report_match_result(data, match)
+                return {'message': f'Match completed! Final score: {score_p1}-{score_p2}. Detailed results cached.', 'type': 'success'}
+            elif status == 'in_progress':
+                match['winner'] = None
+                match['status'] = 'in_progress'
+                save_tournament_data(data)
+                return {'message': f'Match in progress. Current score: {score_p1}-{score_p2}. Detailed results cached.', 'type': 'info'}
+            elif status == 'no_scores':
+                return {'message': 'No scores found yet in the multiplayer room.', 'type': 'info'}
             else:
-                match['winner'] = match['player2']
-            match['status'] = 'completed'
-            advance_round_if_ready(data)
-            return {'message': f'Match completed! Final score: {score_p1}-{score_p2}. Detailed results cached.', 'type': 'success'}
-        elif status == 'in_progress':
-            match['winner'] = None
-            match['status'] = 'in_progress'
-            save_tournament_data(data)
-            return {'message': f'Match in progress. Current score: {score_p1}-{score_p2}. Detailed results cached.', 'type': 'info'}
-        elif status == 'no_scores':
-            return {'message': 'No scores found yet in the multiplayer room.', 'type': 'info'}
-        else:
-            return {'message': 'Error fetching scores from the multiplayer room.', 'type': 'error'}
+                return {'message': 'Error fetching scores from the multiplayer room.', 'type': 'error'}
     
     def cache_all_match_details(self):
         """Cache detailed results for all matches with multiplayer room URLs"""
         data = get_tournament_data()
+        fetched = {}
         cached_count = 0
         error_count = 0
         messages = []
         
         # Process all brackets
-        for bracket_type in ['upper', 'lower', 'grand_finals']:
-            if bracket_type in data['brackets'] and data['brackets'][bracket_type]:
-                if bracket_type == 'grand_finals':
-                    matches_to_check = [data['brackets'][bracket_type]]
-                    if data['brackets'][bracket_type].get('previous_gf'):
-                        matches_to_check.append(data['brackets'][bracket_type]['previous_gf'])
-                else:
-                    matches_to_check = []
-                    for round_matches in data['brackets'][bracket_type]:
-                        matches_to_check.extend(round_matches)
+        for _, match in iter_matches(data):
+            if not match.get('mp_room_url'):
+                continue
                 
-                for match in matches_to_check:
-                    if not match or not match.get('mp_room_url'):
-                        continue
-                        
-                    room_id = self.extract_room_id(match.get('mp_room_url'))
-                    if not room_id:
-                        continue
-                    
-                    player1_id = match.get('player1', {}).get('id')
-                    player2_id = match.get('player2', {}).get('id')
-                    
-                    if not player1_id or not player2_id:
-                        continue
-                    
-                    try:
-                        detailed_results = get_detailed_match_results(room_id, player1_id, player2_id)
-                        if detailed_results:
-                            match['detailed_results'] = detailed_results
-                            cached_count += 1
-                        else:
-                            error_count += 1
-                    except Exception as e:
-                        print(f"Error caching match details: {e}")
-                        error_count += 1
+            room_id = self.extract_room_id(match.get('mp_room_url'))
+            if not room_id:
+                continue
+            
+            player1_id = match.get('player1', {}).get('id')
+            player2_id = match.get('player2', {}).get('id')
+            
+            if not player1_id or not player2_id:
+                continue
+            
+            try:
+                detailed_results = get_detailed_match_results(room_id, player1_id, player2_id)
+                if detailed_results:
+                    fetched[match['id']] = detailed_results
+                else:
+                    error_count += 1
+            except Exception as e:
+                print(f"Error caching match details: {e}")
+                error_count += 1
         
-        save_tournament_data(data)
+        # Apply the fetched results to a fresh read under the writer lock, so edits
+        # made while we were talking to the API are not overwritten
+        with tournament_mutation('results_cached', matches=len(fetched)):
+            data = get_tournament_data()
+            for match_id, detailed_results in fetched.items():
+                match, _ = find_match(data, match_id)
+                if match:
+                    match['detailed_results'] = detailed_results
+                    cached_count += 1
+            
+            save_tournament_data(data)
         
         if cached_count > 0:
             messages.append((f'Successfully cached detailed results for {cached_count} matches!', 'success'))
@@ -316,17 +337,18 @@ class MatchService:
     
     def set_match_room(self, match_id, mp_room_url):
         """Set the multiplayer room URL for a match"""
-        match, data = self.find_match(match_id)
-        if not match:
-            return {'message': 'Match not found.', 'type': 'error'}
+        with tournament_mutation('room_set', match_id=match_id, mp_room_url=mp_room_url):
+            match, data = self.find_match(match_id)
+            if not match:
+                return {'message': 'Match not found.', 'type': 'error'}
         
-        if mp_room_url and 'osu.ppy.sh/multiplayer/rooms/' not in mp_room_url:
-            return {'message': 'Invalid multiplayer room URL format. Must be an osu! multiplayer room link.', 'type': 'error'}
+            if mp_room_url and 'osu.ppy.sh/multiplayer/rooms/' not in mp_room_url:
+                return {'message': 'Invalid multiplayer room URL format. Must be an osu! multiplayer room link.', 'type': 'error'}
         
-        match['mp_room_url'] = mp_room_url
-        save_tournament_data(data)
+            match['mp_room_url'] = mp_room_url
+            save_tournament_data(data)
         
-        if mp_room_url:
-            return {'message': 'Match room URL set successfully.', 'type': 'success'}
-        else:
-            return {'message': 'Match room URL cleared.', 'type': 'success'}
+            if mp_room_url:
+                return {'message': 'Match room URL set successfully.', 'type': 'success'}
+            else:
+                return {'message': 'Match room URL cleared.', 'type': 'success'}
@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from config import LIVE_SCORE_WATCHER, LIVE_SCORE_POLL_SECONDS, LIVE_SCORE_API_BUDGET
+from ..data_manager import get_tournament_data, find_match
+from ..match_index import iter_matches
+from ..http_events import broadcast_match_update, broadcast_map_victory, broadcast_match_victory
+from .match_service import MatchService
+from .. import api
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: every worker would watch, so run a single one
+    fcntl = None
+
+WATCHER_LOCK_FILE = 'score_watcher.lock'
+TICK_SECONDS = 1
+MAX_BACKOFF = 16  # a failing room is polled at most this many intervals apart
+
+
+class LiveScoreWatcher:
+    """Pulls results from the multiplayer rooms of in-progress matches without a referee
+    clicking refresh.
+
+    Only the worker holding the lock file watches. Each room is polled every
+    `interval` seconds (backing off while its polls fail) with the incremental room
+    ingestion, so an idle poll costs a request or two. A poll that finds new results
+    applies them through MatchService.refresh_match_scores and emits overlay events.
+    No poll starts while this worker made `budget` or more osu! API calls in the last minute.
+    """
+
+    def __init__(self, interval, budget, lock_file=WATCHER_LOCK_FILE):
+        self.interval = interval
+        self.budget = budget
+        self.lock_file = lock_file
+        self.api = api
+        self.match_service = MatchService()
+        self._rooms = {}  # match_id -> {'next_poll': monotonic time, 'failures': n}
+        self._lock_file_handle = None
+        self._thread = None
+        self._pid = None
+        self.stats = {'polls': 0, 'updates': 0, 'failed_polls': 0, 'skipped_for_budget': 0}
+
+    def start(self):
+        """Starts this worker's watcher thread if it isn't running (threads don't survive a fork)"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._lock_file_handle = None
+        self._thread = threading.Thread(target=self._run_forever, name='live-score-watcher', daemon=True)
+        self._thread.start()
+
+    def _run_forever(self):
+        while True:
+            try:
+                if self._is_leader():
+                    self.poll_due_rooms()
+            except Exception as e:
+                print(f"Error in live score watcher: {e}")
+            time.sleep(TICK_SECONDS)
+
+    def _is_leader(self):
+        """True once this worker holds the watcher lock (kept until the process exits)"""
+        if self._lock_file_handle is not None:
+            return True
+        lock_file = open(self.lock_file, 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+        self._lock_file_handle = lock_file
+        return True
+
+    def watched_matches(self, data):
+        """In-progress matches that have a multiplayer room: {match_id: match}"""
+        return {match['id']: match for _, match in iter_matches(data)
+                if match.get('status') == 'in_progress' and match.get('mp_room_url') and match.get('id')}
+
+    def poll_due_rooms(self):
+        """Polls every watched room whose interval has passed, within the API budget; returns how many"""
+        now = time.monotonic()
+        watched = self.watched_matches(get_tournament_data())
+        for match_id in list(self._rooms):
+            if match_id not in watched:
+                del self._rooms[match_id]
+
+        polled = 0
+        for match_id, match in watched.items():
+            room = self._rooms.setdefault(match_id, {'next_poll': 0, 'failures': 0})
+            if room['next_poll'] > now:
+                continue
+            if self.api.calls_last_minute() >= self.budget:
+                self.stats['skipped_for_budget'] += 1
+                break
+            self.poll_match(match, room)
+            polled += 1
+        return polled
+
+    def poll_match(self, match, room):
+        """Checks one match's room and applies its results if they moved; True if they did"""
+        self.stats['polls'] += 1
+        room_id = self.match_service.extract_room_id(match.get('mp_room_url'))
+        player1_id = match.get('player1', {}).get('id')
+        player2_id = match.get('player2', {}).get('id')
+        results, room_scores = (None, 0, 0, 'error'), None
+        if room_id and player1_id and player2_id:
+            try:
+                room_scores = self.match_service.fetch_room_scores(room_id)
+            except Exception as e:
+                print(f"Live score watcher could not fetch room {room_id}: {e}")
+            else:
+                results = self.match_service.get_match_results(room_id, player1_id, player2_id, room_scores)
+        _, score_p1, score_p2, status = results
+
+        if status == 'error':
+            self.stats['failed_polls'] += 1
+            room['failures'] += 1
+            room['next_poll'] = time.monotonic() + self.interval * min(2 ** room['failures'], MAX_BACKOFF)
+            return False
+        room['failures'] = 0
+        room['next_poll'] = time.monotonic() + self.interval
+
+        stored = (int(match.get('score_p1') or 0), int(match.get('score_p2') or 0))
+        if status == 'no_scores' or ((score_p1, score_p2) == stored and status != 'completed'):
+            return False
+
+        # Applied from the room just fetched, so a change costs no further API calls
+        result = self.match_service.refresh_match_scores(match['id'], results, room_scores)
+        if result.get('type') == 'error':
+            print(f"Live score watcher could not apply results for match {match['id']}: {result['message']}")
+            return False
+        self.stats['updates'] += 1
+        self._announce(match, stored)
+        return True
+
+    def _announce(self, before, stored_scores):
+        """Overlay events for what changed since `before`: map wins and the match result"""
+        updated, _ = find_match(get_tournament_data(), before['id'])
+        broadcast_match_update()
+        if not updated:
+            return
+
+        score_p1 = int(updated.get('score_p1') or 0)
+        score_p2 = int(updated.get('score_p2') or 0)
+        if updated.get('status') == 'completed' and updated.get('winner'):
+            broadcast_match_victory(updated['winner'].get('name', 'Winner'), f"{score_p1}-{score_p2}",
+                                    "Advances to next round")
+        elif score_p1 > stored_scores[0] or score_p2 > stored_scores[1]:
+            winner = updated.get('player1', {}) if score_p1 > stored_scores[0] else updated.get('player2', {})
+            broadcast_map_victory(winner.get('name', 'Winner'), {'title': self._last_map_title(updated)})
+
+    def _last_map_title(self, match):
+        map_results = (match.get('detailed_results') or {}).get('map_results', [])
+        for map_result in reversed(map_results):
+            if map_result.get('completed') and map_result.get('beatmap'):
+                return map_result['beatmap'].get('beatmapset', {}).get('title', 'Map Complete')
+        return 'Map Complete'
+
+    def status(self):
+        """Counters and watched rooms, for diagnostics"""
+        return dict(self.stats, enabled=LIVE_SCORE_WATCHER, watching=self._lock_file_handle is not None,
+                    rooms=len(self._rooms), api_calls_last_minute=self.api.calls_last_minute())
+
+
+live_score_watcher = LiveScoreWatcher(LIVE_SCORE_POLL_SECONDS, LIVE_SCORE_API_BUDGET)
@@ -1,7 +1,8 @@
 import re
-from ..data_manager import get_tournament_data, save_tournament_data
+from ..data_manager import get_tournament_data, save_tournament_data, tournament_mutation
 from ..bracket_logic import generate_bracket
 from .. import api
+from ..utils.match_utils import fetch_playlist_scores
 
 
 class SeedingService:
@@ -35,7 +36,7 @@ class SeedingService:
         try:
             print(f"Fetching seeding scores for room {room_id}")
             
-            room = self.api.room(room_id)
+            room = self.api.room(room_id, fresh=True)
             
             if not room.playlist:
                 print("No playlist found in seeding room")
@@ -49,12 +50,13 @@ class SeedingService:
             
             print(f"Checking {len(room.playlist)} maps for seeding scores")
             
-            # Check each playlist item (map) for scores
-            for i, playlist_item in enumerate(room.playlist):
+            # Check each playlist item (map) for scores, fetched in parallel
+            playlist_scores = fetch_playlist_scores(self.api, room_id, room.playlist)
+            for i, (playlist_item, scores_data, error) in enumerate(playlist_scores):
                 try:
                     print(f"Processing seeding map {i+1}/{len(room.playlist)}: {playlist_item.id}")
-                    
-                    scores_data = self.api.multiplayer_scores(room_id, playlist_item.id)
+                    if error:
+                        raise error
                     
                     for score in scores_data.scores:
                         if score.user_id in competitor_ids:
@@ -89,12 +91,13 @@ class SeedingService:
         except Exception as e:
             return {'message': f'Error accessing multiplayer room: {e}', 'type': 'error'}
         
-        data = get_tournament_data()
-        data['seeding_room_url'] = seeding_room_url
-        data['seeding_room_id'] = room_id
-        data['seeding_in_progress'] = True
-        
-        save_tournament_data(data)
+        with tournament_mutation('seeding_started', seeding_room_id=room_id):
+            data = get_tournament_data()
+            data['seeding_room_url'] = seeding_room_url
+            data['seeding_room_id'] = room_id
+            data['seeding_in_progress'] = True
+            
+            save_tournament_data(data)
         return {'message': 'Seeding room set! Players can now play seeding maps.', 'type': 'success'}
     
     def update_seeding_scores(self):
@@ -117,48 +120,54 @@ class SeedingService:
         if not player_scores:
             return {'message': 'No seeding scores found in the multiplayer room.', 'type': 'error'}
         
-        # Update competitor scores and provisional seeding
-        competitors = data.get('competitors', [])
-        seeded_players = []
-        
-        for competitor in competitors:
-            if competitor['id'] in player_scores:
-                competitor['seeding_score'] = player_scores[competitor['id']]
-                seeded_players.append(competitor)
-            else:
-                # Remove seeding score if player didn't participate
-                competitor.pop('seeding_score', None)
-                competitor.pop('provisional_placement', None)
-        
-        # Sort by seeding score (descending) and assign provisional placements
-        seeded_players.sort(key=lambda x: x.get('seeding_score', 0), reverse=True)
-        
-        for i, player in enumerate(seeded_players):
-            player['provisional_placement'] = i + 1
-        
-        save_tournament_data(data)
+        # Fetching the room can take seconds, so only hold the writer lock for the
+        # update and re-read the competitors in case they changed in the meantime
+        with tournament_mutation('seeding_scores_updated', seeding_room_id=room_id):
+            data = get_tournament_data()
+            
+            # Update competitor scores and provisional seeding
+            competitors = data.get('competitors', [])
+            seeded_players = []
+            
+            for competitor in competitors:
+                if competitor.get('id') in player_scores:
+                    competitor['seeding_score'] = player_scores[competitor['id']]
+                    seeded_players.append(competitor)
+                else:
+                    # Remove seeding score if player didn't participate
+                    competitor.pop('seeding_score', None)
+                    competitor.pop('provisional_placement', None)
+            
+            # Sort by seeding score (descending) and assign provisional placements
+            seeded_players.sort(key=lambda x: x.get('seeding_score', 0), reverse=True)
+            
+            for i, player in enumerate(seeded_players):
+                player['provisional_placement'] = i + 1
+            
+            save_tournament_data(data)
         return {'message': f'Updated seeding scores for {len(seeded_players)} players.', 'type': 'success'}
     
     def finalize_seeding(self):
         """Finalize seeding and lock in placements"""
-        data = get_tournament_data()
-        
-        competitors = data.get('competitors', [])
-        finalized_count = 0
-        
-        for competitor in competitors:
-            if 'provisional_placement' in competitor:
-                competitor['placement'] = competitor['provisional_placement']
-                competitor.pop('provisional_placement', None)
-                competitor.pop('seeding_score', None)
-                finalized_count += 1
-        
-        # Clean up seeding data
-        data.pop('seeding_room_url', None)
-        data.pop('seeding_room_id', None)
-        data.pop('seeding_in_progress', None)
-        
-        save_tournament_data(data)
-        generate_bracket()
+        with tournament_mutation('seeding_finalized'):
+            data = get_tournament_data()
+            
+            competitors = data.get('competitors', [])
+            finalized_count = 0
+            
+            for competitor in competitors:
+                if 'provisional_placement' in competitor:
+                    competitor['placement'] = competitor['provisional_placement']
+                    competitor.pop('provisional_placement', None)
+                    competitor.pop('seeding_score', None)
+                    finalized_count += 1
+            
+            # Clean up seeding data
+            data.pop('seeding_room_url', None)
+            data.pop('seeding_room_id', None)
+            data.pop('seeding_in_progress', None)
+            
+            save_tournament_data(data)
+            generate_bracket()
         
         return {'message': f'Seeding finalized for {finalized_count} players and bracket regenerated.', 'type': 'success'}
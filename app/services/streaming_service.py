@@ -1,5 +1,5 @@
 import re
-from ..data_manager import get_tournament_data, save_tournament_data
+from ..data_manager import get_tournament_data, save_tournament_data, tournament_mutation
 
 
 class StreamingService:
@@ -21,23 +21,25 @@ class StreamingService:
         if not twitch_channel:
             return {'message': 'Invalid Twitch channel name.', 'type': 'error'}
         
-        data = get_tournament_data()
-        data['twitch_channel'] = twitch_channel
-        
-        save_tournament_data(data)
+        with tournament_mutation('stream_channel_set', twitch_channel=twitch_channel):
+            data = get_tournament_data()
+            data['twitch_channel'] = twitch_channel
+            
+            save_tournament_data(data)
         return {'message': f'Twitch channel set to: {twitch_channel}', 'type': 'success'}
     
     def toggle_stream(self):
         """Toggle stream live status"""
-        data = get_tournament_data()
-        
-        if not data.get('twitch_channel'):
-            return {'message': 'No Twitch channel configured.', 'type': 'error'}
-        
-        current_status = data.get('stream_live', False)
-        data['stream_live'] = not current_status
-        
-        save_tournament_data(data)
+        with tournament_mutation('stream_toggled'):
+            data = get_tournament_data()
+            
+            if not data.get('twitch_channel'):
+                return {'message': 'No Twitch channel configured.', 'type': 'error'}
+            
+            current_status = data.get('stream_live', False)
+            data['stream_live'] = not current_status
+            
+            save_tournament_data(data)
         
         if data['stream_live']:
             return {'message': '🔴 Stream is now LIVE on the tournament page!', 'type': 'success'}
@@ -46,10 +48,11 @@ class StreamingService:
     
     def clear_stream(self):
         """Clear stream settings"""
-        data = get_tournament_data()
-        
-        data.pop('twitch_channel', None)
-        data.pop('stream_live', None)
-        
-        save_tournament_data(data)
+        with tournament_mutation('stream_cleared'):
+            data = get_tournament_data()
+            
+            data.pop('twitch_channel', None)
+            data.pop('stream_live', None)
+            
+            save_tournament_data(data)
         return {'message': 'Stream settings cleared.', 'type': 'success'}
@@ -0,0 +1,30 @@
+"""
+Storage backends for tournament state
+"""
+
+from config import (STORAGE_BACKEND, TOURNAMENT_FILE, SQLITE_FILE, JOURNAL_FILE, AUDIT_FILE,
+                    JOURNAL_COMPACT_BYTES, JOURNAL_COMPACT_SECONDS)
+from .json_backend import JsonFileBackend
+from .sqlite_backend import SqliteBackend
+from .journal_backend import JournalBackend
+
+_backend = None
+
+
+def get_backend():
+    """Returns the process-wide storage backend selected by STORAGE_BACKEND in config.py."""
+    global _backend
+    if _backend is None:
+        if STORAGE_BACKEND == 'json':
+            _backend = JsonFileBackend(TOURNAMENT_FILE)
+        elif STORAGE_BACKEND == 'sqlite':
+            _backend = SqliteBackend(SQLITE_FILE)
+        elif STORAGE_BACKEND == 'journal':
+            _backend = JournalBackend(TOURNAMENT_FILE, JOURNAL_FILE, AUDIT_FILE,
+                                      JOURNAL_COMPACT_BYTES, JOURNAL_COMPACT_SECONDS)
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND '{STORAGE_BACKEND}' (expected 'json', 'sqlite' or 'journal')")
+    return _backend
+
+
+__all__ = ['get_backend', 'JsonFileBackend', 'SqliteBackend', 'JournalBackend']
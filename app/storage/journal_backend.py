@@ -0,0 +1,183 @@
+import json
+import marshal
+import os
+import threading
+import time
+from datetime import datetime
+from .json_backend import JsonFileBackend
+
+# Key stored in the snapshot so replay knows which journal entries it already contains
+SNAPSHOT_SEQ_KEY = '_journal_seq'
+
+
+def diff_document(old, new, path=()):
+    """Returns the ops that turn `old` into `new`: set/del on dict keys, set/trunc on lists."""
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'del', 'path': list(path) + [key]})
+        for key, value in new.items():
+            if key in old:
+                ops.extend(diff_document(old[key], value, path + (key,)))
+            else:
+                ops.append({'op': 'set', 'path': list(path) + [key], 'value': value})
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        for i in range(min(len(old), len(new))):
+            ops.extend(diff_document(old[i], new[i], path + (i,)))
+        for i in range(len(old), len(new)):
+            ops.append({'op': 'set', 'path': list(path) + [i], 'value': new[i]})
+        if len(new) < len(old):
+            ops.append({'op': 'trunc', 'path': list(path), 'length': len(new)})
+        return ops
+    return [{'op': 'set', 'path': list(path), 'value': new}]
+
+
+def apply_ops(data, ops):
+    """Applies ops produced by diff_document() to `data` in place and returns it."""
+    for op in ops:
+        path = op['path']
+        if op['op'] == 'set' and not path:
+            data = op['value']
+            continue
+        target = data
+        for key in path[:-1] if op['op'] != 'trunc' else path:
+            target = target[key]
+        if op['op'] == 'set':
+            key = path[-1]
+            if isinstance(target, list) and key == len(target):
+                target.append(op['value'])
+            else:
+                target[key] = op['value']
+        elif op['op'] == 'del':
+            target.pop(path[-1], None)
+        elif op['op'] == 'trunc':
+            del target[op['length']:]
+    return data
+
+
+class JournalBackend:
+    """Keeps a JSON snapshot plus an append-only NDJSON journal of changes.
+
+    Each save appends one line with the diff against the previous state, so a
+    write costs the size of the change. Once the journal passes `compact_bytes`,
+    or the snapshot is older than `compact_interval` seconds, the journal is folded
+    into the snapshot and its entries are moved to the audit file, which keeps the
+    full history of mutations.
+    """
+
+    def __init__(self, snapshot_path, journal_path, audit_path, compact_bytes, compact_interval):
+        self.snapshot = JsonFileBackend(snapshot_path)
+        self.journal_path = journal_path
+        self.audit_path = audit_path
+        self.compact_bytes = compact_bytes
+        self.compact_interval = compact_interval
+        self._known_lock = threading.Lock()
+        self._known = (None, None, 0)  # (cache key, marshal blob of document, last seq)
+
+    def _journal_size(self):
+        try:
+            return os.stat(self.journal_path).st_size
+        except FileNotFoundError:
+            return 0
+
+    def cache_key(self):
+        return (self.snapshot.cache_key(), self._journal_size())
+
+    def _read_entries(self, path):
+        """Complete journal lines; a torn last line is skipped."""
+        entries = []
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break  # a write still in flight (or interrupted by a crash)
+                    entries.append(json.loads(line))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _replay(self):
+        key = self.cache_key()
+        # Journal before snapshot: compaction replaces the snapshot before removing the
+        # journal, so whichever snapshot we then read already covers what we missed
+        entries = self._read_entries(self.journal_path)
+        data = self.snapshot.load()
+        seq = data.pop(SNAPSHOT_SEQ_KEY, 0)
+        for entry in entries:
+            if entry['seq'] > seq:
+                data = apply_ops(data, entry['ops'])
+                seq = entry['seq']
+        with self._known_lock:
+            self._known = (key, marshal.dumps(data), seq)
+        return data, seq
+
+    def load(self):
+        return self._replay()[0]
+
+    def save(self, data, mutation=None):
+        with self._known_lock:
+            known_key, known_blob, seq = self._known
+        try:
+            if known_blob is not None and known_key == self.cache_key():
+                base = marshal.loads(known_blob)
+            else:
+                base, seq = self._replay()
+        except FileNotFoundError:
+            # No snapshot yet: start one with this document
+            self._write_snapshot(data, 0)
+            return
+
+        ops = diff_document(base, data)
+        if not ops:
+            return
+        seq += 1
+        entry = {
+            'seq': seq,
+            'timestamp': datetime.utcnow().isoformat(),
+            'action': (mutation or {}).get('action', 'save'),
+            'context': {k: v for k, v in (mutation or {}).items() if k != 'action'},
+            'ops': ops
+        }
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode('utf-8'))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        snapshot_age = time.time() - os.stat(self.snapshot.path).st_mtime
+        if self._journal_size() >= self.compact_bytes or snapshot_age >= self.compact_interval:
+            self._write_snapshot(data, seq)
+        else:
+            with self._known_lock:
+                self._known = (self.cache_key(), marshal.dumps(data), seq)
+
+    def compact(self):
+        """Folds the journal into the snapshot now."""
+        data, seq = self._replay()
+        self._write_snapshot(data, seq)
+
+    def _write_snapshot(self, data, seq):
+        snapshot = dict(data)
+        snapshot[SNAPSHOT_SEQ_KEY] = seq
+        self.snapshot.save(snapshot)
+        # The snapshot now covers every entry up to seq; move them to the audit trail
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb') as src, open(self.audit_path, 'ab') as dst:
+                dst.write(src.read())
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.remove(self.journal_path)
+        with self._known_lock:
+            self._known = (self.cache_key(), marshal.dumps(data), seq)
+
+    def history(self, limit=100):
+        """The most recent journal entries (audit trail first, then the live journal)."""
+        entries = self._read_entries(self.audit_path) + self._read_entries(self.journal_path)
+        return entries[-limit:]
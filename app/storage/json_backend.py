@@ -0,0 +1,38 @@
+import json
+import os
+import tempfile
+
+
+class JsonFileBackend:
+    """Stores the whole tournament document in a single JSON file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def cache_key(self):
+        """Identity of the file on disk (changes whenever it is rewritten)."""
+        st = os.stat(self.path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def load(self):
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def save(self, data, mutation=None):
+        """Writes to a temp file and renames it over the original, so concurrent
+        readers see either the old or the new file, never a partial one."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tournament.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                # mkstemp creates 0600 files; keep the existing file's permissions
+                if os.path.exists(self.path):
+                    os.chmod(tmp_path, os.stat(self.path).st_mode & 0o777)
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
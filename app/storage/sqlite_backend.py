@@ -0,0 +1,241 @@
+import json
+import os
+import sqlite3
+import threading
+
+# Table layout: primary key columns, then value columns
+TABLES = {
+    'store_info': (('name',), ('value',)),
+    'doc_keys': (('key',), ('body',)),
+    'competitors': (('position',), ('competitor_id', 'body')),
+    'matches': (('bracket', 'round_no', 'slot'), ('match_id', 'body')),
+    'match_state': (('bracket', 'round_no', 'slot'), ('body',)),
+    'detailed_results': (('bracket', 'round_no', 'slot'), ('body',)),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS store_info (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS doc_keys (key TEXT PRIMARY KEY, body TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS competitors (
+    position INTEGER PRIMARY KEY,
+    competitor_id TEXT,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS matches (
+    bracket TEXT NOT NULL,
+    round_no INTEGER NOT NULL,
+    slot INTEGER NOT NULL,
+    match_id TEXT,
+    body TEXT NOT NULL,
+    PRIMARY KEY (bracket, round_no, slot)
+);
+CREATE INDEX IF NOT EXISTS matches_by_id ON matches (match_id);
+CREATE TABLE IF NOT EXISTS match_state (
+    bracket TEXT NOT NULL,
+    round_no INTEGER NOT NULL,
+    slot INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (bracket, round_no, slot)
+);
+CREATE TABLE IF NOT EXISTS detailed_results (
+    bracket TEXT NOT NULL,
+    round_no INTEGER NOT NULL,
+    slot INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (bracket, round_no, slot)
+);
+"""
+
+
+def _dump(obj):
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def _put_match(rows, bracket, round_no, slot, match):
+    """Splits a match into its own row plus separate match_state/detailed_results rows."""
+    pk = (bracket, round_no, slot)
+    body = match
+    if isinstance(match, dict):
+        body = dict(match)
+        if 'match_state' in body:
+            rows['match_state'][pk] = (_dump(body.pop('match_state')),)
+        if 'detailed_results' in body:
+            rows['detailed_results'][pk] = (_dump(body.pop('detailed_results')),)
+        match_id = body.get('id')
+    else:
+        match_id = None
+    rows['matches'][pk] = (None if match_id is None else str(match_id), _dump(body))
+
+
+def _get_match(rows, pk):
+    match = json.loads(rows['matches'][pk][1])
+    if pk in rows['match_state']:
+        match['match_state'] = json.loads(rows['match_state'][pk][0])
+    if pk in rows['detailed_results']:
+        match['detailed_results'] = json.loads(rows['detailed_results'][pk][0])
+    return match
+
+
+def decompose(data):
+    """Breaks a tournament document into table rows: {table: {pk: values}}."""
+    rows = {table: {} for table in TABLES}
+    rows['store_info'][('key_order',)] = (_dump(list(data.keys())),)
+
+    for key, value in data.items():
+        if key == 'competitors' and isinstance(value, list):
+            for position, competitor in enumerate(value):
+                competitor_id = competitor.get('id') if isinstance(competitor, dict) else None
+                rows['competitors'][(position,)] = (
+                    None if competitor_id is None else str(competitor_id), _dump(competitor))
+        elif key == 'brackets' and isinstance(value, dict):
+            shape = {}
+            for bracket, content in value.items():
+                if isinstance(content, list) and all(isinstance(r, list) for r in content):
+                    shape[bracket] = {'rounds': [len(r) for r in content]}
+                    for round_no, round_matches in enumerate(content):
+                        for slot, match in enumerate(round_matches):
+                            _put_match(rows, bracket, round_no, slot, match)
+                elif isinstance(content, dict):
+                    # Grand finals: a single match, with any earlier GF chained via previous_gf
+                    slot = 0
+                    match = content
+                    while isinstance(match, dict):
+                        current = dict(match)
+                        previous = current.pop('previous_gf', None)
+                        _put_match(rows, bracket, 0, slot, current)
+                        slot += 1
+                        match = previous
+                    shape[bracket] = {'chain': slot}
+                else:
+                    shape[bracket] = {'raw': content}
+            rows['store_info'][('brackets_shape',)] = (_dump(shape),)
+        else:
+            rows['doc_keys'][(key,)] = (_dump(value),)
+    return rows
+
+
+def reconstruct(rows):
+    """Inverse of decompose()."""
+    data = {}
+    for key in json.loads(rows['store_info'][('key_order',)][0]):
+        if (key,) in rows['doc_keys']:
+            data[key] = json.loads(rows['doc_keys'][(key,)][0])
+        elif key == 'competitors':
+            data[key] = [json.loads(rows['competitors'][pk][1]) for pk in sorted(rows['competitors'])]
+        elif key == 'brackets':
+            brackets = {}
+            for bracket, shape in json.loads(rows['store_info'][('brackets_shape',)][0]).items():
+                if 'rounds' in shape:
+                    brackets[bracket] = [
+                        [_get_match(rows, (bracket, round_no, slot)) for slot in range(count)]
+                        for round_no, count in enumerate(shape['rounds'])
+                    ]
+                elif 'chain' in shape:
+                    match = None
+                    for slot in reversed(range(shape['chain'])):
+                        current = _get_match(rows, (bracket, 0, slot))
+                        if match is not None:
+                            current['previous_gf'] = match
+                        match = current
+                    brackets[bracket] = match
+                else:
+                    brackets[bracket] = shape['raw']
+            data[key] = brackets
+    return data
+
+
+class SqliteBackend:
+    """Stores the tournament as rows (competitors, matches, match_state, detailed
+    results) in SQLite. save() diffs the document against the last known rows and
+    only writes the rows that changed, so a score update touches one match row
+    instead of the whole document."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._known_lock = threading.Lock()
+        self._known = (None, None)  # (version, rows) last read from or written to the DB
+        self.last_write = {'rows_written': 0, 'rows_deleted': 0}
+
+    def _connect(self, create=False):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        if not create and not os.path.exists(self.path):
+            raise FileNotFoundError(self.path)
+        conn = sqlite3.connect(self.path, isolation_level=None, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(SCHEMA)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _read_version(self, conn):
+        row = conn.execute("SELECT value FROM store_info WHERE name = 'version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _read_rows(self, conn):
+        rows = {}
+        for table, (pk_cols, value_cols) in TABLES.items():
+            n = len(pk_cols)
+            cursor = conn.execute(f"SELECT {', '.join(pk_cols + value_cols)} FROM {table}")
+            rows[table] = {tuple(r[:n]): tuple(r[n:]) for r in cursor}
+        return rows
+
+    def cache_key(self):
+        version = self._read_version(self._connect())
+        if not version:
+            raise FileNotFoundError(self.path)
+        return (os.stat(self.path).st_ino, version)
+
+    def load(self):
+        conn = self._connect()
+        conn.execute('BEGIN')
+        try:
+            rows = self._read_rows(conn)
+        finally:
+            conn.execute('COMMIT')
+        if ('version',) not in rows['store_info']:
+            raise FileNotFoundError(self.path)
+        with self._known_lock:
+            self._known = (int(rows['store_info'][('version',)][0]), rows)
+        return reconstruct(rows)
+
+    def save(self, data, mutation=None):
+        new_rows = decompose(data)
+        conn = self._connect(create=True)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = self._read_version(conn)
+            with self._known_lock:
+                known_version, known_rows = self._known
+            if known_rows is None or known_version != version:
+                # Another worker wrote since we last looked; diff against what is really there
+                known_rows = self._read_rows(conn)
+            version += 1
+            new_rows['store_info'][('version',)] = (str(version),)
+
+            written = deleted = 0
+            for table, (pk_cols, value_cols) in TABLES.items():
+                old, new = known_rows[table], new_rows[table]
+                removed = [pk for pk in old if pk not in new]
+                changed = [pk + values for pk, values in new.items() if old.get(pk) != values]
+                if removed:
+                    where = ' AND '.join(f'{c} = ?' for c in pk_cols)
+                    conn.executemany(f"DELETE FROM {table} WHERE {where}", removed)
+                if changed:
+                    columns = pk_cols + value_cols
+                    placeholders = ', '.join('?' for _ in columns)
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                        changed)
+                written += len(changed)
+                deleted += len(removed)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        with self._known_lock:
+            self._known = (version, new_rows)
+        self.last_write = {'rows_written': written, 'rows_deleted': deleted}
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test the caching facade around the osu! API client.
+"""
+
+import sys
+import os
+import time
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.api_cache import CachedApi
+
+class CountingClient:
+    """Fake osu! API client that counts calls and returns a new version each time"""
+    def __init__(self):
+        self.calls = []
+
+    def user(self, user_id):
+        self.calls.append(('user', user_id))
+        return {'id': user_id, 'version': len(self.calls)}
+
+    def beatmap(self, beatmap_id):
+        self.calls.append(('beatmap', beatmap_id))
+        if beatmap_id == 0:
+            raise ValueError('beatmap not found')
+        return {'id': beatmap_id, 'version': len(self.calls)}
+
+    def multiplayer_scores(self, room_id, playlist_item_id):
+        self.calls.append(('multiplayer_scores', room_id))
+        return []
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_api_cache():
+    """Fresh hits skip the API, stale hits refresh in the background, LRU bounds each endpoint."""
+    print("=== Testing osu! API Cache ===")
+
+    client = CountingClient()
+    api = CachedApi(client, {'user': (0.2, 0.5, 10), 'beatmap': (60, 0, 2)})
+
+    # Fresh: served from the cache
+    first = api.user(1)
+    assert api.user(1) is first and len(client.calls) == 1
+
+    # Stale: the old value is served at once and refreshed in the background
+    time.sleep(0.25)
+    assert api.user(1) is first
+    assert wait_for(lambda: api.cache_stats()['user']['refreshes'] == 1)
+    assert api.user(1)['version'] == 2 and len(client.calls) == 2
+
+    # Past the stale window: fetched again before returning
+    time.sleep(0.75)
+    assert api.user(1)['version'] == 3
+
+    # LRU: the least recently used beatmap is evicted
+    api.beatmap(1)
+    api.beatmap(2)
+    api.beatmap(1)
+    api.beatmap(3)
+    calls = len(client.calls)
+    api.beatmap(1)
+    api.beatmap(3)
+    assert len(client.calls) == calls
+    api.beatmap(2)
+    assert len(client.calls) == calls + 1
+
+    # Errors reach the caller and are not cached
+    for _ in range(2):
+        try:
+            api.beatmap(0)
+            assert False, 'expected the API error'
+        except ValueError:
+            pass
+    assert client.calls.count(('beatmap', 0)) == 2
+
+    # fresh=True skips the cached response but stores the new one for other callers
+    current = api.user(1)
+    latest = api.user(1, fresh=True)
+    assert latest is not current and latest['version'] == len(client.calls)
+    assert api.user(1) is latest
+
+    # Without a stale window an expired response is fetched again before returning
+    room_client = CountingClient()
+    rooms = CachedApi(room_client, {'user': (0.1, 0, 10)})
+    first = rooms.user(7)
+    time.sleep(0.15)
+    assert rooms.user(7) is not first and len(room_client.calls) == 2
+
+    # Endpoints without a policy are passed through
+    api.multiplayer_scores(5, 1)
+    api.multiplayer_scores(5, 1)
+    assert client.calls.count(('multiplayer_scores', 5)) == 2
+
+    # Only requests that reached the client count against the API budget
+    assert api.calls_last_minute() == len(client.calls)
+
+    stats = api.cache_stats()
+    print(f"Cache stats: {stats}")
+    assert stats['user']['hits'] == 4 and stats['user']['stale_hits'] == 1 and stats['user']['misses'] == 2
+    assert stats['user']['bypasses'] == 1
+    assert stats['beatmap']['size'] == 2 and stats['beatmap']['evictions'] == 2
+
+    api.invalidate('beatmap')
+    assert api.cache_stats()['beatmap']['size'] == 0
+
+    print("✅ API responses are cached per endpoint policy")
+    return True
+
+if __name__ == '__main__':
+    success = test_api_cache()
+    print(f"\nAPI Cache Test: {'PASSED' if success else 'FAILED'}")
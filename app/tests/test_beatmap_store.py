@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the persistent beatmap metadata store.
+"""
+
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app import beatmap_store
+from app.beatmap_store import BeatmapStore, get_beatmap, get_beatmaps
+
+class FakeApi:
+    """Fake osu! API that counts beatmap lookups and has no beatmap 404"""
+    def __init__(self):
+        self.calls = 0
+        self.batches = []
+
+    def beatmaps(self, beatmap_ids):
+        self.batches.append(list(beatmap_ids))
+        return [self.beatmap(beatmap_id) for beatmap_id in beatmap_ids if beatmap_id != 404]
+
+    def beatmap(self, beatmap_id):
+        self.calls += 1
+        beatmapset = SimpleNamespace(id=900 + beatmap_id, title=f'Song {beatmap_id}', artist='Artist',
+                                     creator='Mapper', covers=SimpleNamespace(cover='cover.jpg'))
+        return SimpleNamespace(id=beatmap_id, beatmapset_id=beatmapset.id, mode='osu', difficulty_rating=5.5,
+                               version='Insane', total_length=120, hit_length=110, bpm=180, cs=4, ar=9,
+                               accuracy=8, drain=6, beatmapset=beatmapset, _beatmapset=beatmapset)
+
+def test_beatmap_store():
+    """Beatmaps are fetched once (pools in one batch) and then served from disk, also after a restart."""
+    print("=== Testing Beatmap Store ===")
+
+    original_api, original_store = beatmap_store.api, beatmap_store._store
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'beatmaps.db')
+        try:
+            beatmap_store.api = FakeApi()
+            beatmap_store._store = BeatmapStore(path)
+
+            record = get_beatmap(1)
+            assert record['version'] == 'Insane' and record['od'] == 8 and record['hp'] == 6
+            assert record['beatmapset']['title'] == 'Song 1' and record['beatmapset']['covers'] == {'cover': 'cover.jpg'}
+            assert get_beatmap('1') == record
+            assert beatmap_store.api.calls == 1
+
+            # A new process (fresh store object, same file) makes no API calls for known maps
+            beatmap_store._store = BeatmapStore(path)
+            assert get_beatmap(1) == record and beatmap_store.api.calls == 1
+
+            get_beatmap(2)
+            assert set(beatmap_store._store.get_many([1, 2, 3])) == {1, 2}
+            assert beatmap_store.api.calls == 2
+
+            # A mappool: stored maps are reused, the rest come from one batch lookup
+            pool = [1, 2, 404] + list(range(10, 17))
+            records = get_beatmaps(pool)
+            assert beatmap_store.api.batches == [[404] + list(range(10, 17))]
+            assert sorted(records) == [1, 2] + list(range(10, 17))
+            assert records[12]['beatmapset']['title'] == 'Song 12'
+
+            # Uploading the same pool again only looks up the map the API doesn't have
+            assert get_beatmaps(pool) == records
+            assert beatmap_store.api.batches[-1] == [404] and len(beatmap_store.api.batches) == 2
+
+            print("✅ Beatmap metadata is persisted and reused")
+            return True
+
+        finally:
+            beatmap_store.api, beatmap_store._store = original_api, original_store
+
+if __name__ == '__main__':
+    success = test_beatmap_store()
+    print(f"\nBeatmap Store Test: {'PASSED' if success else 'FAILED'}")
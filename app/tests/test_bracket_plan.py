@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test that a generated bracket holds every round up front and that results only fill its slots in.
+"""
+
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.bracket_engine import build_bracket, advance_bracket, plan_bracket, bracket_shape
+from app.match_index import iter_matches
+
+def make_competitors(count):
+    return [{'id': i, 'name': f'Player {i}', 'pp': 5000 - i * 31 % 211} for i in range(1, count + 1)]
+
+def test_bracket_plan():
+    """Playing each round out keeps exactly the rounds and edges the bracket was generated with."""
+    print("=== Testing Bracket Plan ===")
+
+    for players in (1, 2, 3, 6, 7, 12, 16, 29, 64):
+        data = build_bracket({'competitors': make_competitors(players)})
+        plan = bracket_shape(data)
+        assert plan == plan_bracket(players), f"{players} players"
+        edges = {m['id']: (m.get('winner_to'), m.get('loser_to')) for _, m in iter_matches(data)}
+
+        # Every edge points forward at a slot only it feeds
+        targets = [(e['match'], e['slot']) for pair in edges.values() for e in pair if e]
+        assert len(targets) == len(set(targets)), f"{players} players"
+        assert all(match_id in edges for match_id, _ in targets), f"{players} players"
+
+        # Player 2 wins the odd-sum matches: the plan must not depend on who wins
+        while True:
+            rounds = data['brackets'].get('upper', []) + data['brackets'].get('lower', [])
+            matches = [m for r in rounds for m in r]
+            if data['brackets'].get('grand_finals'):
+                matches.append(data['brackets']['grand_finals'])
+            open_matches = [m for m in matches
+                            if not m.get('winner') and m['player1'].get('id') and m['player2'].get('id')]
+            if not open_matches:
+                break
+            for match in open_matches:
+                odd = (match['player1']['id'] + match['player2']['id']) % 2
+                match['winner'] = match['player2'] if odd else match['player1']
+            advance_bracket(data)
+
+        assert [len(r) for r in data['brackets'].get('upper', [])] == plan['upper'], f"{players} players"
+        assert [len(r) for r in data['brackets'].get('lower', [])] == plan['lower'], f"{players} players"
+        assert all((m.get('winner_to'), m.get('loser_to')) == edges[m['id']]
+                   for r in data['brackets'].get('upper', []) + data['brackets'].get('lower', []) for m in r)
+        if players >= 2:
+            # Nothing was left waiting on a slot that never got filled
+            assert data['brackets']['grand_finals'].get('winner'), f"{players} players"
+            assert len(data.get('eliminated', [])) == players - 1, f"{players} players"
+        print(f"✅ {players} players: upper {plan['upper']}, lower {plan['lower']}")
+
+    return True
+
+def test_shape_follows_stored_bracket():
+    """Competitors joining or leaving after generation don't change the rounds shown."""
+    print("\n=== Testing Bracket Shape ===")
+
+    data = build_bracket({'competitors': make_competitors(6)})
+    data['competitors'] = make_competitors(11)
+    assert bracket_shape(data) == plan_bracket(6) != plan_bracket(11)
+
+    # Nothing generated yet: planned from the competitors
+    assert bracket_shape({'competitors': make_competitors(11), 'brackets': {'upper': [], 'lower': []}}) == plan_bracket(11)
+
+    # Brackets from before the match graph keep the plan stored with them
+    stored = {'upper': [2, 1], 'lower': [1, 1]}
+    legacy = {'competitors': make_competitors(11), 'bracket_plan': stored,
+              'brackets': {'upper': [[{'id': 'a', 'player1': {'id': 1}, 'player2': {'id': 2}, 'winner': None}]],
+                           'lower': []}}
+    assert bracket_shape(legacy) == stored
+
+    print("✅ Shape comes from the stored bracket, the plan only before generation")
+    return True
+
+if __name__ == '__main__':
+    success = test_bracket_plan() and test_shape_follows_stored_bracket()
+    print(f"\nBracket Plan Test: {'PASSED' if success else 'FAILED'}")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test advancing a large double-elimination bracket to the end, timing each advance.
+"""
+
+import sys
+import os
+import time
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.bracket_engine import build_bracket, advance_bracket
+
+PLAYERS = 512
+
+def play_open_matches(data):
+    """Completes every match with two real players and no winner (player1 wins); returns how many"""
+    played = 0
+    rounds = data['brackets'].get('upper', []) + data['brackets'].get('lower', [])
+    matches = [m for r in rounds for m in r]
+    if data['brackets'].get('grand_finals'):
+        matches.append(data['brackets']['grand_finals'])
+    for match in matches:
+        if match.get('winner') or not match['player1'].get('id') or not match['player2'].get('id'):
+            continue
+        match['winner'] = match['player1']
+        match['score_p1'], match['score_p2'] = 4, 0
+        match['status'] = 'completed'
+        played += 1
+    return played
+
+def test_bracket_scale():
+    """Every player but the champion is eliminated exactly once and each advance stays fast."""
+    print(f"=== Testing {PLAYERS}-Player Bracket ===")
+
+    # The engine works in memory, so the tournament data is never touched
+    data = build_bracket({
+        'competitors': [{'id': i, 'name': f'Player {i}', 'pp': 10000 - i} for i in range(1, PLAYERS + 1)]
+    })
+
+    timings = []
+    while play_open_matches(data):
+        start = time.perf_counter()
+        advance_bracket(data)
+        timings.append(time.perf_counter() - start)
+    print(f"{len(timings)} advances, slowest {max(timings) * 1000:.1f}ms")
+
+    gf = data['brackets']['grand_finals']
+    assert gf.get('winner'), "Grand finals should be played"
+    eliminated_ids = [e['id'] for e in data.get('eliminated', [])]
+    assert len(eliminated_ids) == len(set(eliminated_ids)) == PLAYERS - 1
+    assert gf['winner']['id'] not in eliminated_ids
+    assert max(timings) < 0.1
+
+    print("✅ Large bracket completes with one champion")
+    return True
+
+if __name__ == '__main__':
+    success = test_bracket_scale()
+    print(f"\nBracket Scale Test: {'PASSED' if success else 'FAILED'}")
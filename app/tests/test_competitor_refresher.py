@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the background competitor stats refresher and its single-flight guard.
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.data_manager import get_tournament_data, save_tournament_data
+from app.services import CompetitorRefresher
+
+class SlowUsersApi:
+    """Fake osu! API: users() takes 0.3s and knows every id except 3"""
+    def __init__(self):
+        self.calls = 0
+
+    def users(self, user_ids):
+        self.calls += 1
+        time.sleep(0.3)
+        return [SimpleNamespace(id=user_id, username=f'fresh{user_id}', avatar_url=f'avatar{user_id}',
+                                statistics_rulesets=SimpleNamespace(osu=SimpleNamespace(pp=100.0, global_rank=user_id)))
+                for user_id in user_ids if user_id != 3]
+
+def test_competitor_refresher():
+    """Concurrent refreshers run the lookup once and record the run for the admin panel."""
+    print("=== Testing Competitor Refresher ===")
+
+    # Backup current data
+    current_data = get_tournament_data()
+
+    try:
+        save_tournament_data({
+            'competitors': [{'id': user_id, 'name': f'old{user_id}'} for user_id in (1, 2, 3)],
+            'brackets': {'upper': [], 'lower': []},
+            'last_updated': '2020-01-01T00:00:00'
+        })
+
+        with tempfile.TemporaryDirectory() as tmp:
+            # Two refreshers sharing a lock file stand in for two workers
+            api = SlowUsersApi()
+            refreshers = [CompetitorRefresher(300, os.path.join(tmp, 'refresh.lock')) for _ in range(2)]
+            for refresher in refreshers:
+                refresher.api = api
+            assert refreshers[0].is_due(get_tournament_data())
+
+            results = []
+            threads = [threading.Thread(target=lambda r=refresher: results.append(r.refresh_if_due()))
+                       for refresher in refreshers for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            print(f"Refresh results: {results}, API calls: {api.calls}")
+            assert results.count(True) == 1 and api.calls == 1
+
+            data = get_tournament_data()
+            assert [c['name'] for c in data['competitors']] == ['fresh1', 'fresh2', 'old3']
+            assert data['competitors'][0]['pp'] == 100.0 and data['competitors'][1]['rank'] == 2
+            refresh = data['competitor_refresh']
+            assert refresh['updated'] == 2 and refresh['failed'] == 1 and refresh['duration_seconds'] >= 0.3
+            assert refresh['last_run'] == data['last_updated']
+
+            # Fresh stats are left alone until the interval passes
+            assert not refreshers[0].is_due(data)
+            assert not refreshers[1].refresh_if_due() and api.calls == 1
+            assert CompetitorRefresher(0).is_due(data)
+
+        print("✅ Competitor stats refresh once, off the request path")
+        return True
+
+    finally:
+        # Restore original data
+        save_tournament_data(current_data)
+        print("\n(Original tournament data restored)")
+
+if __name__ == '__main__':
+    success = test_competitor_refresher()
+    print(f"\nCompetitor Refresher Test: {'PASSED' if success else 'FAILED'}")
@@ -118,10 +118,10 @@ def test_complete_upper_first():
         for p in data.get('eliminated', []):
             print(f"  - {p['name']}")
         
-        # Check if next lower round was created
-        if len(data['brackets']['lower']) > 2:
-            print("\nLower Round 2:")
-            for match in data['brackets']['lower'][2]:
+        # Play the remaining lower rounds through to the lower bracket final
+        for round_idx in range(2, len(data['brackets']['lower'])):
+            print(f"\nLower Round {round_idx}:")
+            for match in data['brackets']['lower'][round_idx]:
                 print(f"  {match['player1']['name']} vs {match['player2']['name']}")
                 match['winner'] = match['player1']  # Assume first player wins
                 match['score_p1'] = 4
@@ -133,7 +133,7 @@ def test_complete_upper_first():
             advance_round_if_ready(data)
             data = get_tournament_data()
             
-            print(f"After lower round 2: {len(data.get('eliminated', []))} eliminated")
+            print(f"After lower round {round_idx}: {len(data.get('eliminated', []))} eliminated")
             for p in data.get('eliminated', []):
                 print(f"  - {p['name']}")
         
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test that concurrent readers never see a torn tournament file and that
+writers holding tournament_lock() don't lose each other's updates.
+"""
+
+import sys
+import os
+import threading
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.data_manager import get_tournament_data, save_tournament_data, tournament_lock
+from app.services.seeding_service import SeedingService
+
+def test_concurrent_save():
+    """Hammer the file with locked read-modify-writes while readers poll it."""
+    print("=== Testing Concurrent Saves ===")
+
+    # Backup current data
+    current_data = get_tournament_data()
+
+    try:
+        save_tournament_data({
+            'competitors': [{'id': i, 'name': f'P{i}', 'pp': i} for i in range(64)],
+            'brackets': {'upper': [], 'lower': []},
+            'counter': 0
+        })
+
+        writers, increments = 4, 25
+        stop = threading.Event()
+        torn_reads = []
+
+        def writer():
+            for _ in range(increments):
+                with tournament_lock():
+                    data = get_tournament_data()
+                    data['counter'] += 1
+                    save_tournament_data(data)
+
+        def reader():
+            while not stop.is_set():
+                data = get_tournament_data()
+                if 'counter' not in data:
+                    torn_reads.append(data)
+
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for t in readers:
+            t.start()
+        threads = [threading.Thread(target=writer) for _ in range(writers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stop.set()
+        for t in readers:
+            t.join()
+
+        final = get_tournament_data()
+        print(f"Final counter: {final['counter']} (expected {writers * increments})")
+        print(f"Torn reads: {len(torn_reads)}")
+        assert final['counter'] == writers * increments, "Lost updates between writers"
+        assert not torn_reads, "Readers saw a partially written file"
+
+        print("✅ No torn reads or lost updates")
+        return True
+
+    finally:
+        # Restore original data
+        save_tournament_data(current_data)
+        print("\n(Original tournament data restored)")
+
+def test_seeding_keeps_concurrent_updates():
+    """Changes saved while seeding scores are being fetched survive the seeding update."""
+    print("\n=== Testing Seeding Update During Other Writes ===")
+
+    # Backup current data
+    current_data = get_tournament_data()
+
+    try:
+        save_tournament_data({
+            'competitors': [{'id': i, 'name': f'P{i}', 'pp': i} for i in range(1, 5)],
+            'brackets': {'upper': [], 'lower': []},
+            'seeding_room_id': 123
+        })
+
+        def fetch_while_others_write(room_id, competitor_ids):
+            # A competitor refresh and a new signup land while the room is fetched
+            with tournament_lock():
+                data = get_tournament_data()
+                next(c for c in data['competitors'] if c['id'] == 1)['pp'] = 9999
+                data.setdefault('pending_signups', []).append({'id': 50, 'name': 'Late'})
+                save_tournament_data(data)
+            return {1: 300, 2: 100, 3: 200}
+
+        seeding_service = SeedingService()
+        seeding_service.get_seeding_scores = fetch_while_others_write
+        result = seeding_service.update_seeding_scores()
+        assert result['type'] == 'success', result
+
+        final = get_tournament_data()
+        by_id = {c['id']: c for c in final['competitors']}
+        assert by_id[1]['pp'] == 9999, "Competitor refresh was overwritten"
+        assert [s['id'] for s in final.get('pending_signups', [])] == [50], "Signup was overwritten"
+        assert [by_id[i].get('provisional_placement') for i in (1, 2, 3, 4)] == [1, 3, 2, None]
+
+        print("✅ Seeding scores applied on top of the concurrent changes")
+        return True
+
+    finally:
+        # Restore original data
+        save_tournament_data(current_data)
+        print("\n(Original tournament data restored)")
+
+if __name__ == '__main__':
+    success = test_concurrent_save() and test_seeding_keeps_concurrent_updates()
+    print(f"\nConcurrent Save Test: {'PASSED' if success else 'FAILED'}")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the current/next match pointer used by the overlay polling endpoints.
+"""
+
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.data_manager import get_tournament_data, save_tournament_data, get_current_match, find_match
+from app.http_events import get_current_match_data
+from app.match_index import MatchLocation
+
+def make_match(match_id, status):
+    return {'id': match_id, 'status': status, 'score_p1': 0, 'score_p2': 0,
+            'player1': {'id': 1, 'name': 'A'}, 'player2': {'id': 2, 'name': 'B'}}
+
+def test_current_match():
+    """The pointer follows status changes and keeps the overlay's round priority."""
+    print("=== Testing Current Match Pointer ===")
+
+    # Backup current data
+    current_data = get_tournament_data()
+
+    try:
+        save_tournament_data({
+            'competitors': [],
+            'brackets': {
+                'upper': [[make_match('u0-0', 'completed')], [make_match('u1-0', 'next_up')]],
+                'lower': [[make_match('l0-0', 'next_up')], [make_match('l1-0', 'in_progress')]],
+                'grand_finals': make_match('gf', 'pending')
+            },
+            'last_updated': '2025-01-01T00:00:00'
+        })
+
+        # In-progress anywhere beats next_up, even in an earlier round
+        current = get_current_match()
+        print(f"Current match: {current['match']['id']} at {current['location']}")
+        assert current['match']['id'] == 'l1-0'
+        assert current['location'] == MatchLocation('lower', 1, 0)
+        assert current['last_updated'] == '2025-01-01T00:00:00'
+        overlay = get_current_match_data()
+        assert overlay['match_found'] and overlay['bracket'] == 'Lower' and overlay['round_index'] == 1
+
+        # Finishing it falls back to the earliest next_up match, upper before lower
+        data = get_tournament_data()
+        find_match(data, 'l1-0')[0]['status'] = 'completed'
+        save_tournament_data(data)
+        assert get_current_match()['match']['id'] == 'l0-0'
+
+        data = get_tournament_data()
+        find_match(data, 'l0-0')[0]['status'] = 'completed'
+        save_tournament_data(data)
+        assert get_current_match()['match']['id'] == 'u1-0'
+
+        # Grand finals only once every round is done
+        data = get_tournament_data()
+        find_match(data, 'u1-0')[0]['status'] = 'completed'
+        data['brackets']['grand_finals']['status'] = 'next_up'
+        save_tournament_data(data)
+        overlay = get_current_match_data()
+        assert overlay['bracket'] == 'Grand Finals' and overlay['round_index'] == 0
+
+        # Mutating the returned match must not leak into the cached pointer
+        get_current_match()['match']['status'] = 'completed'
+        assert get_current_match()['match']['status'] == 'next_up'
+
+        data['brackets']['grand_finals']['status'] = 'completed'
+        save_tournament_data(data)
+        assert get_current_match() == {'match': None, 'location': None, 'last_updated': '2025-01-01T00:00:00'}
+        assert not get_current_match_data()['match_found']
+
+        print("✅ Current match pointer tracks status changes")
+        return True
+
+    finally:
+        # Restore original data
+        save_tournament_data(current_data)
+        print("\n(Original tournament data restored)")
+
+if __name__ == '__main__':
+    success = test_current_match()
+    print(f"\nCurrent Match Test: {'PASSED' if success else 'FAILED'}")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test the in-process tournament document cache in data_manager.
+"""
+
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.data_manager import get_tournament_data, save_tournament_data, get_cache_stats
+
+def test_data_cache():
+    """Repeated reads are served from memory and callers never share state."""
+    print("=== Testing Tournament Data Cache ===")
+
+    # Backup current data
+    current_data = get_tournament_data()
+
+    try:
+        save_tournament_data({
+            'competitors': [{'id': 1, 'name': 'A', 'pp': 100}],
+            'brackets': {'upper': [], 'lower': []}
+        })
+
+        before = get_cache_stats()
+        first = get_tournament_data()
+        second = get_tournament_data()
+        after = get_cache_stats()
+
+        print(f"Cache stats before: {before}, after: {after}")
+        assert after['misses'] == before['misses'] + 1, "First read after a save should miss"
+        assert after['hits'] == before['hits'] + 1, "Second read should be served from the cache"
+
+        # Mutating one copy must not leak into the next read
+        first['competitors'][0]['name'] = 'changed'
+        assert second['competitors'][0]['name'] == 'A'
+        assert get_tournament_data()['competitors'][0]['name'] == 'A'
+
+        # A save makes the next read see the new document
+        first['competitors'].append({'id': 2, 'name': 'B', 'pp': 200})
+        save_tournament_data(first)
+        names = [c['name'] for c in get_tournament_data()['competitors']]
+        print(f"Competitors after save: {names}")
+        assert names == ['B', 'changed']
+
+        print("✅ Cache serves repeated reads and tracks writes")
+        return True
+
+    finally:
+        # Restore original data
+        save_tournament_data(current_data)
+        print("\n(Original tournament data restored)")
+
+if __name__ == '__main__':
+    success = test_data_cache()
+    print(f"\nData Cache Test: {'PASSED' if success else 'FAILED'}")
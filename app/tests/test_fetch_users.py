@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test the batched user lookup used by the competitor refresh.
+"""
+
+import sys
+import os
+import threading
+import time
+from types import SimpleNamespace
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.utils.user_utils import fetch_users, user_statistics, USERS_BATCH_SIZE
+
+class BatchApi:
+    """Fake osu! API: each users() call takes 0.2s; the batch containing `failing_id` fails"""
+    def __init__(self, failing_id=None):
+        self.failing_id = failing_id
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def users(self, user_ids):
+        with self.lock:
+            self.batches.append(list(user_ids))
+        time.sleep(0.2)
+        if self.failing_id in user_ids:
+            raise RuntimeError('rate limited')
+        return [SimpleNamespace(id=user_id, username=f'user{user_id}',
+                                statistics_rulesets=SimpleNamespace(osu=SimpleNamespace(pp=user_id * 10, global_rank=user_id)))
+                for user_id in user_ids]
+
+def test_fetch_users():
+    """Ids are batched by 50, batches run in parallel and a failed batch only loses its own users."""
+    print("=== Testing Batched User Lookup ===")
+
+    api = BatchApi()
+    ids = list(range(1, 121)) + [5, '7']  # duplicates and string ids are folded
+    started = time.monotonic()
+    users = fetch_users(api, ids)
+    elapsed = time.monotonic() - started
+    print(f"{len(users)} users in {len(api.batches)} requests, {elapsed:.2f}s")
+
+    assert sorted(users) == list(range(1, 121))
+    assert len(api.batches) == 3 and max(len(batch) for batch in api.batches) == USERS_BATCH_SIZE
+    assert elapsed < 0.2 * 3
+
+    stats = user_statistics(users[7])
+    assert stats.pp == 70 and stats.global_rank == 7
+    assert user_statistics(SimpleNamespace(statistics=SimpleNamespace(pp=1))).pp == 1
+    assert user_statistics(SimpleNamespace(statistics=None)) is None
+
+    # A failing batch leaves out its users only
+    users = fetch_users(BatchApi(failing_id=60), range(1, 121))
+    assert sorted(users) == list(range(1, 51)) + list(range(101, 121))
+
+    print("✅ Users are looked up in parallel batches")
+    return True
+
+if __name__ == '__main__':
+    success = test_fetch_users()
+    print(f"\nFetch Users Test: {'PASSED' if success else 'FAILED'}")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test the journal storage backend: small appends, replay, compaction and the audit trail.
+"""
+
+import sys
+import os
+import json
+import tempfile
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.storage import JournalBackend
+
+def make_backend(tmp, compact_bytes=1024 * 1024, compact_interval=3600):
+    return JournalBackend(os.path.join(tmp, 'tournament.json'),
+                          os.path.join(tmp, 'tournament.journal.ndjson'),
+                          os.path.join(tmp, 'tournament.audit.ndjson'),
+                          compact_bytes, compact_interval)
+
+def test_journal_backend():
+    """Saves append only the change, replay rebuilds the document and compaction keeps history."""
+    print("=== Testing Journal Storage Backend ===")
+
+    players = [{'id': i, 'name': f'P{i}', 'pp': 1000 - i, 'mappool_details': [{'id': n} for n in range(10)]}
+               for i in range(1, 33)]
+    data = {
+        'competitors': players,
+        'brackets': {
+            'upper': [[{'id': f'u0-{i}', 'player1': players[2 * i], 'player2': players[2 * i + 1],
+                        'score_p1': 0, 'score_p2': 0, 'winner': None, 'status': 'next_up'}
+                       for i in range(16)]],
+            'lower': []
+        }
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = make_backend(tmp)
+        backend.save(data)
+        assert backend.load() == data, "Round trip changed the document"
+        snapshot_size = os.path.getsize(backend.snapshot.path)
+
+        # A score update appends a line the size of the change, not the document
+        match = data['brackets']['upper'][0][3]
+        match['score_p1'] = 2
+        match['status'] = 'in_progress'
+        backend.save(data, mutation={'action': 'score_set', 'match_id': match['id']})
+        journal_size = os.path.getsize(backend.journal_path)
+        print(f"Snapshot: {snapshot_size} bytes, score update: {journal_size} bytes")
+        assert journal_size < snapshot_size / 20
+        assert os.path.getsize(backend.snapshot.path) == snapshot_size
+
+        # Another handle (another worker) replays the journal on top of the snapshot
+        assert make_backend(tmp).load() == data
+
+        # Removing a competitor and a match both replay correctly
+        del data['competitors'][-1]
+        data['brackets']['upper'][0].pop()
+        backend.save(data, mutation={'action': 'competitor_removed'})
+        assert make_backend(tmp).load() == data
+
+        # A torn line from an interrupted write is ignored on replay
+        with open(backend.journal_path, 'a') as f:
+            f.write('{"seq": 99, "ops": [')
+        assert make_backend(tmp).load() == data
+        with open(backend.journal_path, 'rb+') as f:
+            f.truncate(os.path.getsize(backend.journal_path) - len('{"seq": 99, "ops": ['))
+
+        # Compaction folds the journal into the snapshot and keeps the entries as history
+        backend.compact()
+        assert not os.path.exists(backend.journal_path)
+        assert make_backend(tmp).load() == data
+        actions = [entry['action'] for entry in backend.history()]
+        print(f"History after compaction: {actions}")
+        assert actions == ['score_set', 'competitor_removed']
+        assert backend.history()[0]['context'] == {'match_id': 'u0-3'}
+
+        # Saves after compaction continue the sequence
+        data['brackets']['upper'][0][0]['winner'] = players[0]
+        backend.save(data, mutation={'action': 'winner_set'})
+        assert [entry['seq'] for entry in backend.history()] == [1, 2, 3]
+        assert make_backend(tmp).load() == data
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Passing the size threshold compacts automatically
+        backend = make_backend(tmp, compact_bytes=1)
+        backend.save(data)
+        for score in range(1, 4):
+            data['brackets']['upper'][0][1]['score_p2'] = score
+            backend.save(data, mutation={'action': 'score_set'})
+        assert not os.path.exists(backend.journal_path)
+        with open(backend.snapshot.path) as f:
+            assert json.load(f)['brackets']['upper'][0][1]['score_p2'] == 3
+        assert len(backend.history()) == 3
+
+    print("✅ Journal backend appends changes, replays and compacts")
+    return True
+
+if __name__ == '__main__':
+    success = test_journal_backend()
+    print(f"\nJournal Backend Test: {'PASSED' if success else 'FAILED'}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test change detection for the overlay push channels (SSE / long-poll).
+"""
+
+import sys
+import os
+import threading
+import time
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.data_manager import get_tournament_data, save_tournament_data
+from app.live_updates import current_versions, wait_for_change, wait_for_cursor, version_cursor, changed_sections
+from app.overlay_state import add_overlay_event, get_overlay_state, update_overlay_state
+from app.storage import get_backend
+
+def save_after(delay, data, backend_only=False):
+    def run():
+        time.sleep(delay)
+        if backend_only:
+            get_backend().save(data)  # like a save from another worker: no in-process notification
+        else:
+            save_tournament_data(data)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+def test_live_updates():
+    """Waiters wake on saves in this worker at once and on other workers' saves within the check interval."""
+    print("=== Testing Live Update Notifications ===")
+
+    # Backup current data
+    current_data = get_tournament_data()
+    current_overlay = get_overlay_state()
+
+    try:
+        data = {'competitors': [], 'brackets': {'upper': [], 'lower': []}}
+        save_tournament_data(data)
+        versions = current_versions()
+
+        # Nothing changes: the wait times out and returns the same versions
+        started = time.monotonic()
+        assert wait_for_change(versions, 0.3, 0.05) == versions
+        assert time.monotonic() - started >= 0.3
+
+        # A save in this worker wakes the waiter without waiting for the next check
+        data['last_updated'] = 'first'
+        thread = save_after(0.1, data)
+        started = time.monotonic()
+        changed = wait_for_change(versions, 5, 10)
+        elapsed = time.monotonic() - started
+        thread.join()
+        print(f"Woken after {elapsed:.2f}s by a local save")
+        assert changed['tournament'] != versions['tournament'] and elapsed < 2
+
+        # A save that bypasses this worker is seen by the periodic check
+        data['last_updated'] = 'second'
+        thread = save_after(0.1, data, backend_only=True)
+        started = time.monotonic()
+        newer = wait_for_change(changed, 5, 0.05)
+        elapsed = time.monotonic() - started
+        thread.join()
+        print(f"Woken after {elapsed:.2f}s by another worker's save")
+        assert newer['tournament'] != changed['tournament'] and elapsed < 2
+
+        # Long-poll cursors report which sections moved
+        cursor = version_cursor(newer)
+        assert changed_sections(cursor, newer) == set()
+        assert changed_sections('', newer) == {'tournament', 'overlay'}
+        assert wait_for_cursor(cursor, 0.2, 0.05) == newer
+        thread = threading.Thread(target=lambda: (time.sleep(0.1), add_overlay_event('flip_players')))
+        thread.start()
+        latest = wait_for_cursor(cursor, 5, 10)
+        thread.join()
+        assert changed_sections(cursor, latest) == {'overlay'}
+
+        print("✅ Waiters see local and cross-worker changes")
+        return True
+
+    finally:
+        # Restore original data
+        save_tournament_data(current_data)
+        update_overlay_state(current_overlay)
+        print("\n(Original tournament data restored)")
+
+if __name__ == '__main__':
+    success = test_live_updates()
+    print(f"\nLive Updates Test: {'PASSED' if success else 'FAILED'}")
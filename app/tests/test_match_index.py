@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test match lookup through the per-version match index in data_manager.
+"""
+
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.data_manager import get_tournament_data, save_tournament_data, find_match
+from app.match_index import MatchLocation, iter_matches
+import app.data_manager as data_manager
+
+def make_bracket(player_count):
+    """Upper rounds halving from player_count, a lower bracket and a reset grand final."""
+    players = [{'id': i, 'name': f'P{i}', 'pp': 10000 - i} for i in range(player_count)]
+    upper, lower = [], []
+    size, round_index = player_count // 2, 0
+    while size >= 1:
+        upper.append([{'id': f'u{round_index}-{i}', 'player1': players[2 * i], 'player2': players[2 * i + 1],
+                       'score_p1': 0, 'score_p2': 0, 'status': 'next_up'} for i in range(size)])
+        lower.append([{'id': f'l{round_index}-{i}', 'player1': players[i], 'player2': players[-1 - i],
+                       'score_p1': 0, 'score_p2': 0, 'status': 'next_up'} for i in range(size)])
+        size //= 2
+        round_index += 1
+    first_gf = {'id': 'gf-1', 'player1': players[0], 'player2': players[1], 'status': 'completed'}
+    reset_gf = {'id': 'gf-2', 'player1': players[0], 'player2': players[1], 'status': 'next_up',
+                'is_bracket_reset': True, 'previous_gf': first_gf}
+    return {'competitors': players, 'brackets': {'upper': upper, 'lower': lower, 'grand_finals': reset_gf}}
+
+def test_match_index():
+    """Every match is found at its indexed location without rescanning the brackets."""
+    print("=== Testing Match Index ===")
+
+    # Backup current data
+    current_data = get_tournament_data()
+
+    try:
+        save_tournament_data(make_bracket(512))
+        data = get_tournament_data()
+        match_count = sum(1 for _ in iter_matches(data))
+        print(f"Indexed {match_count} matches")
+
+        # Count full re-indexes: lookups on a freshly loaded document must not need one
+        builds = []
+        original_build = data_manager.build_match_index
+        data_manager.build_match_index = lambda d: builds.append(1) or original_build(d)
+        try:
+            for location, match in iter_matches(data):
+                found, found_location = find_match(data, match['id'])
+                assert found is match, f"Lookup of {match['id']} returned a different object"
+                assert found_location == location
+            assert not builds, "Lookups on a loaded document should be served by the cached index"
+        finally:
+            data_manager.build_match_index = original_build
+
+        # Grand finals are addressed through the previous_gf chain
+        gf, location = find_match(data, 'gf-1')
+        assert location == MatchLocation('grand_finals', None, 1)
+        assert gf is data['brackets']['grand_finals']['previous_gf']
+        assert find_match(data, 'gf-2')[1] == MatchLocation('grand_finals', None, 0)
+        assert find_match(data, 'u8-0')[1] == MatchLocation('upper', 8, 0)
+
+        # Unknown ids and documents edited after loading still resolve correctly
+        assert find_match(data, 'missing') == (None, None)
+        data['brackets']['upper'][0].insert(0, {'id': 'new', 'player1': {}, 'player2': {}})
+        moved, moved_location = find_match(data, 'u0-0')
+        assert moved_location == MatchLocation('upper', 0, 1) and moved['id'] == 'u0-0'
+        assert find_match(data, 'new')[0] is data['brackets']['upper'][0][0]
+
+        # A save re-indexes on the next load
+        save_tournament_data(data)
+        fresh = get_tournament_data()
+        assert find_match(fresh, 'new')[1] == MatchLocation('upper', 0, 0)
+
+        print("✅ Match index finds every match in O(1)")
+        return True
+
+    finally:
+        # Restore original data
+        save_tournament_data(current_data)
+        print("\n(Original tournament data restored)")
+
+if __name__ == '__main__':
+    success = test_match_index()
+    print(f"\nMatch Index Test: {'PASSED' if success else 'FAILED'}")
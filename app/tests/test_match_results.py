@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test that applying match results one at a time builds the same bracket as advancing from scratch.
+"""
+
+import sys
+import os
+import copy
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.bracket_engine import build_bracket, advance_bracket, apply_match_result
+
+def open_matches(data):
+    """Matches with two real players and no winner yet, upper then lower then grand finals"""
+    rounds = data['brackets'].get('upper', []) + data['brackets'].get('lower', [])
+    matches = [m for r in rounds for m in r]
+    if data['brackets'].get('grand_finals'):
+        matches.append(data['brackets']['grand_finals'])
+    return [m for m in matches if not m.get('winner') and m['player1'].get('id') and m['player2'].get('id')]
+
+def play(data, advance, pick):
+    """Plays the bracket to the end one match at a time, calling `advance` after each result"""
+    step = 0
+    while True:
+        matches = open_matches(data)
+        if not matches:
+            return data
+        match = matches[pick(step, len(matches))]
+        p1_id, p2_id = match['player1']['id'], match['player2']['id']
+        if match.get('is_grand_finals'):
+            # Lower bracket finalist forces the reset, then loses it
+            match['winner'] = match['player1'] if match.get('is_bracket_reset') else match['player2']
+        else:
+            match['winner'] = match['player1'] if (p1_id * 7 + p2_id) % 3 else match['player2']
+        match['status'] = 'completed'
+        advance(data, match)
+        step += 1
+
+def bracket_shape(data):
+    """The bracket without the random match ids, for comparing"""
+    def strip(value):
+        if isinstance(value, dict):
+            return {k: strip(v) for k, v in value.items() if k != 'id' or not isinstance(v, str)}
+        if isinstance(value, list):
+            return [strip(v) for v in value]
+        return value
+    return strip({key: data.get(key) for key in ('brackets', 'pending_upper_losers', 'eliminated')})
+
+def test_match_results():
+    """Same bracket from either entry point for several sizes and orders of play."""
+    print("=== Testing Incremental Match Results ===")
+
+    # The engine works in memory, so the tournament data is never touched
+    orders = {'in order': lambda step, count: 0,
+              'newest first': lambda step, count: count - 1,
+              'scattered': lambda step, count: (step * 7919) % count}
+    for players in (2, 3, 5, 6, 8, 11, 16, 33):
+        start = build_bracket({'competitors': [{'id': i, 'name': f'Player {i}', 'pp': 10000 - i * 13 % 997}
+                                               for i in range(1, players + 1)]})
+        for order, pick in orders.items():
+            full = play(copy.deepcopy(start), lambda data, match: advance_bracket(data), pick)
+            incremental = play(copy.deepcopy(start), apply_match_result, pick)
+            assert bracket_shape(incremental) == bracket_shape(full), f"{players} players, {order}"
+        print(f"✅ {players} players: same bracket in every order")
+
+    return True
+
+def test_corrected_result():
+    """A result corrected before the next match is played moves the other player along instead."""
+    print("\n=== Testing Corrected Match Result ===")
+
+    data = build_bracket({'competitors': [{'id': i, 'name': f'Player {i}', 'pp': 1000 - i} for i in range(1, 5)]})
+    for match in data['brackets']['upper'][0]:
+        match['winner'] = match['player1']
+        apply_match_result(data, match)
+    lower_first = data['brackets']['lower'][0][0]
+    lower_first['winner'] = lower_first['player1']
+    apply_match_result(data, lower_first)
+    assert [e['id'] for e in data['eliminated']] == [lower_first['player2']['id']]
+
+    lower_first['winner'] = lower_first['player2']
+    apply_match_result(data, lower_first)
+    assert data['brackets']['lower'][1][0]['player1']['id'] == lower_first['player2']['id']
+    assert [e['id'] for e in data['eliminated']] == [lower_first['player1']['id']]
+
+    print("✅ The corrected winner moves on and the other player is eliminated instead")
+    return True
+
+if __name__ == '__main__':
+    success = test_match_results() and test_corrected_result()
+    print(f"\nIncremental Match Results Test: {'PASSED' if success else 'FAILED'}")
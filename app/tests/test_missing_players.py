@@ -116,6 +116,22 @@ def reproduce_missing_players_bug():
             for match in data['brackets']['lower'][1]:
                 print(f"  {match['player1']['name']} vs {match['player2']['name']}")
         
+        print("\n=== STEP 6: incomplet Loses Their Lower Bracket Match ===")
+        # incomplet's round 0 match is a walkover when the BYEs fall there
+        for round_matches in data['brackets'].get('lower', []):
+            for match in round_matches:
+                names = [match['player1'].get('name'), match['player2'].get('name')]
+                if 'incomplet' in names and not match.get('winner') and match['player1'].get('id') and match['player2'].get('id'):
+                    match['winner'] = match['player2'] if names[0] == 'incomplet' else match['player1']
+                    match['score_p1'] = 4 if match['winner']['id'] == match['player1']['id'] else 0
+                    match['score_p2'] = 4 if match['winner']['id'] == match['player2']['id'] else 0
+                    match['status'] = 'completed'
+                    print(f"    {match['winner']['name']} beats incomplet")
+
+        save_tournament_data(data)
+        advance_round_if_ready(data)
+        data = get_tournament_data()
+
         print(f"\nEliminated players: {[p['name'] for p in data.get('eliminated', [])]}")
         print(f"Pending upper losers: {[p['name'] for p in data.get('pending_upper_losers', [])]}")
         
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test sequence-numbered overlay events and the "events after seq N" query.
+"""
+
+import sys
+import os
+import json
+import threading
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.overlay_state import (OVERLAY_STATE_FILE, EVENT_BUFFER_SIZE, get_overlay_state, add_overlay_event,
+                               clear_overlay_events, get_events_after)
+
+def test_overlay_events():
+    """Concurrent adds get unique increasing sequence numbers and clients can catch up after a burst."""
+    print("=== Testing Overlay Event Sequence ===")
+
+    # Backup current overlay state
+    original_state = get_overlay_state()
+
+    try:
+        clear_overlay_events()
+        start = get_overlay_state().get('last_seq', 0)
+
+        # A burst from several threads at once: no event may be lost or share a number
+        burst = EVENT_BUFFER_SIZE + 20
+        threads = [threading.Thread(target=lambda: [add_overlay_event('flip_players') for _ in range(burst // 4)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        state = get_overlay_state()
+        seqs = [event['seq'] for event in state['events']]
+        print(f"last_seq {state['last_seq']}, buffer holds {len(seqs)} events")
+        assert state['last_seq'] == start + burst
+        assert len(seqs) == EVENT_BUFFER_SIZE
+        assert seqs == list(range(start + burst - EVENT_BUFFER_SIZE + 1, start + burst + 1))
+
+        # A client that saw up to N gets exactly the events after N
+        events, missed = get_events_after(state, start + burst - 5)
+        assert [event['seq'] for event in events] == list(range(start + burst - 4, start + burst + 1))
+        assert not missed
+
+        # A client that fell behind the buffer is told it missed events
+        events, missed = get_events_after(state, start)
+        assert missed and len(events) == EVENT_BUFFER_SIZE
+
+        # Clearing the buffer never reuses sequence numbers
+        clear_overlay_events()
+        assert get_events_after(get_overlay_state(), start + burst) == ([], False)
+        assert add_overlay_event('exit_afk') == start + burst + 1
+
+        print("✅ Overlay events are sequenced and replayable")
+        return True
+
+    finally:
+        # Restore original overlay state
+        with open(OVERLAY_STATE_FILE, 'w') as f:
+            json.dump(original_state, f, indent=2)
+        print("\n(Original overlay state restored)")
+
+if __name__ == '__main__':
+    success = test_overlay_events()
+    print(f"\nOverlay Events Test: {'PASSED' if success else 'FAILED'}")
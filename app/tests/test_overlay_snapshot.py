@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test the combined overlay snapshot, its per-section versions and interface deltas.
+"""
+
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app import http_events
+from app.data_manager import get_tournament_data, save_tournament_data, find_match
+from app.http_events import (build_overlay_snapshot, build_match_data, build_match_interface_state, build_overlay_events,
+                             diff_interface_state)
+from app.overlay_state import add_overlay_event, get_overlay_state, update_overlay_state, INTERFACE_HISTORY_FILE
+
+def make_match(match_id, status):
+    return {'id': match_id, 'status': status, 'score_p1': 0, 'score_p2': 0,
+            'player1': {'id': 1, 'name': 'A'}, 'player2': {'id': 2, 'name': 'B'}}
+
+def test_overlay_snapshot():
+    """Sections match the separate endpoints and only changed sections (or keys) are resent."""
+    print("=== Testing Overlay Snapshot ===")
+
+    # Backup current data
+    current_data = get_tournament_data()
+    current_overlay = get_overlay_state()
+
+    try:
+        save_tournament_data({
+            'competitors': [],
+            'brackets': {'upper': [[make_match('u0-0', 'in_progress')]], 'lower': []},
+            'last_updated': '2025-01-01T00:00:00'
+        })
+
+        # Same payloads as the separate polling endpoints
+        snapshot = build_overlay_snapshot()
+        assert snapshot['match'] == build_match_data()
+        assert snapshot['interface'] == build_match_interface_state()
+        assert snapshot['overlay_events'] == build_overlay_events()
+        versions = snapshot['versions']
+        print(f"Section versions: {versions}")
+
+        # Nothing changed: every section the client has comes back as null
+        unchanged = build_overlay_snapshot(versions)
+        assert unchanged['versions'] == versions
+        assert unchanged['match'] is None and unchanged['interface'] is None and unchanged['overlay_events'] is None
+
+        # A new overlay event only resends the events section
+        last_seq = snapshot['overlay_events']['last_seq']
+        add_overlay_event('flip_players')
+        after_event = build_overlay_snapshot(versions, last_seq)
+        assert after_event['match'] is None and after_event['interface'] is None
+        assert [event['type'] for event in after_event['overlay_events']['events']] == ['flip_players']
+
+        # A score change resends the match and interface sections
+        caught_up = build_overlay_snapshot(after_event['versions'], last_seq + 1)
+        data = get_tournament_data()
+        find_match(data, 'u0-0')[0]['score_p1'] = 1
+        save_tournament_data(data)
+        after_score = build_overlay_snapshot(caught_up['versions'], last_seq + 1)
+        assert after_score['match']['score_p1'] == 1
+        assert after_score['overlay_events'] is None
+
+        # ...the interface as just the keys that changed, which rebuild the full state
+        delta = after_score['interface_delta']
+        assert after_score['interface'] is None and not delta['full']
+        assert delta['changed'] == {'score_p1': 1} and delta['removed'] == []
+        rebuilt = dict(snapshot['interface'], **delta['changed'])
+        assert rebuilt == build_match_interface_state() and delta['version'] == after_score['versions']['interface']
+
+        # A worker that never served the earlier state finds it in the shared history
+        http_events._interface_history.clear()
+        other_worker = diff_interface_state(versions['interface'], rebuilt)
+        assert not other_worker['full'] and other_worker['changed'] == {'score_p1': 1}
+
+        # A version no worker has kept gets a full resync
+        resync = diff_interface_state('unknown', rebuilt)
+        assert resync['full'] and resync['state'] == rebuilt
+        http_events._interface_history.clear()
+        os.remove(INTERFACE_HISTORY_FILE)
+        resync = diff_interface_state(versions['interface'], rebuilt)
+        assert resync['full'] and resync['state'] == rebuilt
+
+        print("✅ Snapshot sections are versioned independently")
+        return True
+
+    finally:
+        # Restore original data
+        save_tournament_data(current_data)
+        update_overlay_state(current_overlay)
+        print("\n(Original tournament data restored)")
+
+if __name__ == '__main__':
+    success = test_overlay_snapshot()
+    print(f"\nOverlay Snapshot Test: {'PASSED' if success else 'FAILED'}")
@@ -86,11 +86,13 @@ def test_play_autocreated_lower():
         if data['brackets'].get('lower') and len(data['brackets']['lower']) > 0:
             for match in data['brackets']['lower'][0]:
                 print(f"Playing: {match['player1']['name']} vs {match['player2']['name']}")
-                # XBisch_LasagnaX beats incomplet
+                # XBisch_LasagnaX wins their match; the other is a walkover for incomplet
                 if match['player1']['name'] == 'XBisch_LasagnaX':
                     match['winner'] = match['player1']
                 elif match['player2']['name'] == 'XBisch_LasagnaX':
                     match['winner'] = match['player2']
+                elif not match.get('winner'):
+                    continue
                 
                 match['score_p1'] = 4 if match['winner']['id'] == match['player1']['id'] else 0
                 match['score_p2'] = 4 if match['winner']['id'] == match['player2']['id'] else 0
@@ -107,11 +109,13 @@ def test_play_autocreated_lower():
         if len(data['brackets'].get('lower', [])) > 1:
             for match in data['brackets']['lower'][1]:
                 print(f"Playing: {match['player1']['name']} vs {match['player2']['name']}")
-                # fungus664 beats Santa Claus
+                # fungus664 wins their match; the other one isn't played yet
                 if match['player1']['name'] == 'fungus664':
                     match['winner'] = match['player1']
                 elif match['player2']['name'] == 'fungus664':
                     match['winner'] = match['player2']
+                else:
+                    continue
                 
                 match['score_p1'] = 4 if match['winner']['id'] == match['player1']['id'] else 0
                 match['score_p2'] = 4 if match['winner']['id'] == match['player2']['id'] else 0
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test the parallel multiplayer_scores fetch used for match results and seeding.
+"""
+
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.utils.match_utils import fetch_playlist_scores
+from app.services import MatchService
+
+class SlowApi:
+    """Fake osu! API: every multiplayer_scores call takes `delay` seconds, item 3 fails"""
+    def __init__(self, delay, scores=None):
+        self.delay = delay
+        self.scores = scores or {}
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def room(self, room_id, fresh=False):
+        return SimpleNamespace(playlist=[SimpleNamespace(id=item_id) for item_id in range(1, 8)])
+
+    def multiplayer_scores(self, room_id, playlist_item_id):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if playlist_item_id == 3:
+                raise RuntimeError('room closed')
+            return SimpleNamespace(scores=self.scores.get(playlist_item_id, []))
+        finally:
+            with self.lock:
+                self.active -= 1
+
+class CountingApi:
+    """Fake osu! API that records which playlist items were fetched; item 3 fails"""
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def multiplayer_scores(self, room_id, playlist_item_id):
+        with self.lock:
+            self.calls.append(playlist_item_id)
+        if playlist_item_id == 3:
+            raise RuntimeError('room closed')
+        return SimpleNamespace(scores=[])
+
+def score(user_id, total_score):
+    return SimpleNamespace(user_id=user_id, total_score=total_score)
+
+def test_playlist_scores():
+    """Items are fetched concurrently, keep playlist order, fail independently and are cached once finished."""
+    print("=== Testing Parallel Playlist Scores ===")
+
+    api = SlowApi(0.2)
+    playlist = api.room(1).playlist
+    started = time.monotonic()
+    results = fetch_playlist_scores(api, 1, playlist)
+    elapsed = time.monotonic() - started
+    print(f"Fetched {len(results)} maps in {elapsed:.2f}s, {api.peak} at once")
+
+    assert [item.id for item, _, _ in results] == [1, 2, 3, 4, 5, 6, 7]
+    assert api.peak > 1 and elapsed < 0.2 * len(playlist) / 2
+    assert isinstance(results[2][2], RuntimeError) and results[2][1] is None
+    assert all(error is None and scores_data is not None for item, scores_data, error in results if item.id != 3)
+
+    # Match results count the maps that loaded and skip the failed one
+    service = MatchService()
+    service.api = SlowApi(0.01, {
+        1: [score(10, 500), score(20, 400)],
+        2: [score(10, 300), score(20, 600)],
+        3: [score(10, 900), score(20, 100)],
+        4: [score(10, 700)],
+        5: [score(10, 800), score(20, 200)],
+        6: [score(10, 800), score(20, 200)]
+    })
+    assert service.get_match_results(1, 10, 20) == (10, 4, 1, 'completed')
+
+    # Refreshing a live room only fetches items that weren't finished last time
+    long_ago = datetime.now(timezone.utc) - timedelta(minutes=10)
+    just_now = datetime.now(timezone.utc)
+    room = [SimpleNamespace(id=item_id, expired=True, played_at=long_ago) for item_id in (1, 2, 3)]
+    room += [SimpleNamespace(id=4, expired=True, played_at=just_now), SimpleNamespace(id=5, expired=False, played_at=None)]
+    api = CountingApi()
+    first = fetch_playlist_scores(api, 42, room)
+    assert api.calls == [1, 2, 3, 4, 5]
+    room.append(SimpleNamespace(id=6, expired=False, played_at=None))
+    second = fetch_playlist_scores(api, 42, room)
+    # Item 3 failed, so it is fetched again; 4 was played too recently to trust yet
+    assert sorted(api.calls[5:]) == [3, 4, 5, 6]
+    assert [item.id for item, _, _ in second] == [1, 2, 3, 4, 5, 6]
+    assert second[0][1] is first[0][1] and isinstance(second[2][2], RuntimeError)
+
+    print("✅ Playlist scores are fetched in parallel")
+    return True
+
+if __name__ == '__main__':
+    success = test_playlist_scores()
+    print(f"\nPlaylist Scores Test: {'PASSED' if success else 'FAILED'}")
@@ -1,8 +1,17 @@
 """
 Test script to verify HTTP polling works without SocketIO
 """
+import sys
+import os
 import requests
 import json
+from flask import Flask
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.data_manager import get_tournament_data, save_tournament_data
+from app.overlay_state import add_overlay_event, get_overlay_state, update_overlay_state
+from app.routes import public_bp
 
 def test_api_endpoints():
     base_url = "http://localhost:5000"  # Change to your actual URL
@@ -34,6 +43,69 @@ def test_api_endpoints():
             print(f"  Error: {response.text}")
     except Exception as e:
         print(f"  Error testing overlay events: {e}")
+    
+def test_conditional_requests():
+    """Polls with a current ETag get an empty 304; a save or a new overlay event changes the ETag."""
+    print("=== Testing Conditional Polling Requests ===")
+
+    # Only the public routes, so no background jobs start
+    app = Flask(__name__)
+    app.register_blueprint(public_bp)
+    client = app.test_client()
+
+    # Backup current data
+    current_data = get_tournament_data()
+    current_overlay = get_overlay_state()
+
+    try:
+        save_tournament_data({
+            'competitors': [],
+            'brackets': {'upper': [[{'id': 'u0-0', 'status': 'in_progress', 'score_p1': 0, 'score_p2': 0,
+                                     'player1': {'id': 1, 'name': 'A'}, 'player2': {'id': 2, 'name': 'B'}}]],
+                         'lower': []}
+        })
+        endpoints = ["/api/match-data", "/api/overlay-events", "/api/match-interface-state"]
+
+        def poll_all():
+            etags = {}
+            for endpoint in endpoints:
+                response = client.get(endpoint)
+                assert response.status_code == 200, endpoint
+                etags[endpoint] = response.headers["ETag"]
+                repeat = client.get(endpoint, headers={"If-None-Match": etags[endpoint]})
+                assert repeat.status_code == 304 and repeat.data == b"", endpoint
+                assert repeat.headers["ETag"] == etags[endpoint], endpoint
+            return etags
+
+        def changed_since(etags, endpoint):
+            response = client.get(endpoint, headers={"If-None-Match": etags[endpoint]})
+            return response.status_code == 200 and response.headers["ETag"] != etags[endpoint]
+
+        etags = poll_all()
+
+        # A tournament save changes the match data and interface state
+        data = get_tournament_data()
+        data['brackets']['upper'][0][0]['score_p1'] = 1
+        save_tournament_data(data)
+        assert changed_since(etags, "/api/match-data")
+        assert changed_since(etags, "/api/match-interface-state")
+        etags = poll_all()
+
+        # An overlay event changes the overlay events
+        add_overlay_event('flip_players')
+        assert changed_since(etags, "/api/overlay-events")
+        poll_all()
+
+        print("✅ 304 while unchanged, a new ETag after each change")
+        return True
+
+    finally:
+        # Restore original data
+        save_tournament_data(current_data)
+        update_overlay_state(current_overlay)
+        print("\n(Original tournament data restored)")
 
 if __name__ == "__main__":
     test_api_endpoints()
+    success = test_conditional_requests()
+    print(f"\nConditional Requests Test: {'PASSED' if success else 'FAILED'}")
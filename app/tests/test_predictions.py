@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test the Monte Carlo bracket predictions against brackets played out by the engine.
+"""
+
+import sys
+import os
+import copy
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app import bracket_predictor
+from app.bracket_engine import build_bracket, advance_bracket, _seed_bracket
+
+def make_competitors(count):
+    """Competitors with distinct pp, so every match has a clear favourite"""
+    return [{'id': i, 'name': f'Player {i}', 'pp': 3000 + (i * 37) % 1000} for i in range(1, count + 1)]
+
+def open_matches(data):
+    rounds = data['brackets'].get('upper', []) + data['brackets'].get('lower', [])
+    matches = [m for r in rounds for m in r]
+    if data['brackets'].get('grand_finals'):
+        matches.append(data['brackets']['grand_finals'])
+    return [m for m in matches
+            if not m.get('winner') and m['player1'].get('id') and m['player2'].get('id')]
+
+def play_upsets(data, rounds):
+    """Plays half the open matches `rounds` times with player2 winning, for a mid-bracket state"""
+    for _ in range(rounds):
+        matches = open_matches(data)
+        for match in matches[:max(1, len(matches) // 2)]:
+            match['winner'] = match['player2']
+            advance_bracket(data)
+
+def play_favourites(data, ratings):
+    """Plays the bracket to the end with the higher-rated player winning every match"""
+    while True:
+        matches = open_matches(data)
+        if not matches:
+            return data
+        for match in matches:
+            p1, p2 = match['player1'], match['player2']
+            match['winner'] = p1 if ratings[p1['id']] > ratings[p2['id']] else p2
+        advance_bracket(data)
+
+def reached(rounds):
+    return [{m[slot]['id'] for m in r for slot in ('player1', 'player2') if m[slot].get('id')} for r in rounds]
+
+def test_favourites_match_engine():
+    """With a very steep rating scale every simulation plays out like the engine with favourites winning."""
+    print("=== Testing Predictions Against The Engine ===")
+    if not bracket_predictor.predictions_available():
+        print("numpy is not installed, skipping")
+        return True
+
+    original_scale = bracket_predictor.PREDICTION_RATING_SCALE
+    bracket_predictor.PREDICTION_RATING_SCALE = 1e4
+    try:
+        # Brackets built as a match graph, and edge-less ones from before it
+        for build in (build_bracket, _seed_bracket):
+            for players in (2, 3, 5, 8, 13, 16, 24, 33, 40):
+                for upset_rounds in (0, 1, 3):
+                    competitors = make_competitors(players)
+                    data = build({'competitors': competitors})
+                    play_upsets(data, upset_rounds)
+                    ratings = dict(zip([c['id'] for c in competitors], bracket_predictor.player_ratings(competitors)))
+
+                    predictions = bracket_predictor.simulate_bracket(data, 20, seed=1)
+                    final = play_favourites(copy.deepcopy(data), ratings)
+                    upper = reached(final['brackets']['upper'])
+                    lower = reached(final['brackets'].get('lower', []))
+                    champion = final['brackets']['grand_finals']['winner']['id']
+
+                    for player in predictions['players']:
+                        context = f"{build.__name__}, {players} players, {upset_rounds} upset rounds, player {player['id']}"
+                        assert player['upper'] == [float(player['id'] in r) for r in upper], context
+                        assert player['lower'] == [float(player['id'] in r) for r in lower], context
+                        assert player['win'] == float(player['id'] == champion), context
+    finally:
+        bracket_predictor.PREDICTION_RATING_SCALE = original_scale
+
+    print("✅ Every round and the champion match the engine")
+    return True
+
+def test_probabilities_and_cache():
+    """Win chances add up to one and predictions are cached per bracket version."""
+    print("\n=== Testing Prediction Totals And Cache ===")
+    if not bracket_predictor.predictions_available():
+        print("numpy is not installed, skipping")
+        return True
+
+    data = build_bracket({'competitors': make_competitors(20)})
+    play_upsets(data, 2)
+    predictions = bracket_predictor.get_predictions(data, 2000)
+    assert abs(sum(p['win'] for p in predictions['players']) - 1) < 1e-3
+    assert abs(sum(p['grand_finals'] for p in predictions['players']) - 2) < 1e-3
+    assert bracket_predictor.get_predictions(data, 2000) is predictions
+
+    # A score update doesn't change the version, a result does
+    match = open_matches(data)[0]
+    match['score_p1'] = 2
+    assert bracket_predictor.get_predictions(data, 2000) is predictions
+    match['winner'] = match['player1']
+    advance_bracket(data)
+    assert bracket_predictor.bracket_version(data) != predictions['version']
+
+    print("✅ Chances add up and the cache follows the bracket version")
+    return True
+
+if __name__ == '__main__':
+    success = test_favourites_match_engine() and test_probabilities_and_cache()
+    print(f"\nPredictions Test: {'PASSED' if success else 'FAILED'}")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Test the live score watcher: polling schedule, API budget and overlay events.
+"""
+
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.data_manager import get_tournament_data, save_tournament_data, find_match
+from app.overlay_state import get_overlay_state, get_events_after, update_overlay_state
+from app.api_cache import CachedApi
+from app.services import LiveScoreWatcher, MatchService
+from app.utils import match_utils
+
+class FakeMatchService(MatchService):
+    """Room results come from `self.room`; applying them writes the scores like the real refresh"""
+    def __init__(self):
+        super().__init__()
+        self.room = (None, 0, 0, 'no_scores')
+        self.checks = 0
+        self.refreshes = 0
+
+    def fetch_room_scores(self, room_id):
+        return None, []
+
+    def get_match_results(self, room_id, player1_id, player2_id, room_scores=None):
+        self.checks += 1
+        return self.room
+
+    def refresh_match_scores(self, match_id, results=None, room_scores=None):
+        self.refreshes += 1
+        assert results == self.room, "The watcher should pass on the results it already fetched"
+        winner_id, score_p1, score_p2, status = results
+        data = get_tournament_data()
+        match, _ = find_match(data, match_id)
+        match['score_p1'], match['score_p2'] = score_p1, score_p2
+        if status == 'completed':
+            match['status'] = 'completed'
+            match['winner'] = match['player1'] if winner_id == match['player1']['id'] else match['player2']
+        save_tournament_data(data)
+        return {'message': 'ok', 'type': 'success'}
+
+class CountingClient:
+    """Fake osu! API client for a room with four maps: Alice won two, Bob one, one unplayed"""
+    def __init__(self):
+        self.calls = []
+
+    def room(self, room_id):
+        self.calls.append('room')
+        return SimpleNamespace(name='Room', playlist=[SimpleNamespace(id=item_id, beatmap_id=None)
+                                                      for item_id in range(1, 5)])
+
+    def multiplayer_scores(self, room_id, playlist_item_id):
+        self.calls.append('multiplayer_scores')
+        winner = {1: 1, 2: 1, 3: 2}.get(playlist_item_id)
+        return SimpleNamespace(scores=[self.score(user_id, 2 if user_id == winner else 1)
+                                       for user_id in (1, 2) if winner])
+
+    def user(self, user_id):
+        self.calls.append('user')
+        return SimpleNamespace(id=int(user_id), username=f'User {user_id}', avatar_url='', statistics=None)
+
+    def score(self, user_id, total_score):
+        return SimpleNamespace(user_id=user_id, total_score=total_score, accuracy=1.0, max_combo=100,
+                               mods=[], statistics=None)
+
+class FakeBudget:
+    def __init__(self):
+        self.calls = 0
+
+    def calls_last_minute(self):
+        return self.calls
+
+def make_match(match_id, status, room_url):
+    return {'id': match_id, 'status': status, 'score_p1': 0, 'score_p2': 0, 'mp_room_url': room_url,
+            'player1': {'id': 1, 'name': 'Alice'}, 'player2': {'id': 2, 'name': 'Bob'}}
+
+def test_score_watcher():
+    """Only in-progress rooms are polled, on schedule and within budget, and changes reach the overlay."""
+    print("=== Testing Live Score Watcher ===")
+
+    # Backup current data
+    current_data = get_tournament_data()
+    current_overlay = get_overlay_state()
+
+    try:
+        save_tournament_data({
+            'competitors': [],
+            'brackets': {'upper': [[make_match('live', 'in_progress', 'https://osu.ppy.sh/multiplayer/rooms/5'),
+                                    make_match('no-room', 'in_progress', ''),
+                                    make_match('later', 'next_up', 'https://osu.ppy.sh/multiplayer/rooms/6')]],
+                         'lower': []}
+        })
+
+        with tempfile.TemporaryDirectory() as tmp:
+            watcher = LiveScoreWatcher(60, 10, os.path.join(tmp, 'watcher.lock'))
+            watcher.match_service = FakeMatchService()
+            watcher.api = FakeBudget()
+            assert list(watcher.watched_matches(get_tournament_data())) == ['live']
+
+            # Only one worker watches
+            other = LiveScoreWatcher(60, 10, os.path.join(tmp, 'watcher.lock'))
+            assert watcher._is_leader() and not other._is_leader()
+
+            # Nothing new in the room: checked, nothing written
+            assert watcher.poll_due_rooms() == 1
+            assert watcher.match_service.refreshes == 0
+
+            # Not due again until the interval passes
+            assert watcher.poll_due_rooms() == 0
+            watcher._rooms['live']['next_poll'] = 0
+
+            # A map ends: results applied and announced
+            last_seq = get_overlay_state().get('last_seq', 0)
+            watcher.match_service.room = (None, 1, 0, 'in_progress')
+            assert watcher.poll_due_rooms() == 1 and watcher.match_service.refreshes == 1
+            events, _ = get_events_after(get_overlay_state(), last_seq)
+            assert [event['type'] for event in events] == ['match_update', 'map_victory']
+            assert events[1]['data']['winner'] == 'Alice'
+
+            # Over budget: no poll starts
+            watcher._rooms['live']['next_poll'] = 0
+            watcher.api.calls = 10
+            assert watcher.poll_due_rooms() == 0 and watcher.stats['skipped_for_budget'] == 1
+            watcher.api.calls = 0
+
+            # The match ends: victory screen, and the room is no longer watched
+            last_seq = get_overlay_state()['last_seq']
+            watcher.match_service.room = (2, 1, 4, 'completed')
+            assert watcher.poll_due_rooms() == 1
+            events, _ = get_events_after(get_overlay_state(), last_seq)
+            assert [event['type'] for event in events] == ['match_update', 'match_victory']
+            assert events[1]['data'] == {'winner': 'Bob', 'final_score': '1-4', 'advancement': 'Advances to next round'}
+            assert watcher.poll_due_rooms() == 0 and watcher._rooms == {}
+
+            # A failing room backs off
+            data = get_tournament_data()
+            find_match(data, 'later')[0]['status'] = 'in_progress'
+            save_tournament_data(data)
+            watcher.match_service.room = (None, 0, 0, 'error')
+            watcher.poll_due_rooms()
+            watcher.poll_due_rooms()
+            assert watcher._rooms['later']['failures'] == 1 and watcher.stats['failed_polls'] == 1
+
+            print(f"Watcher stats: {watcher.stats}")
+            watcher._lock_file_handle.close()
+
+        print("✅ Live score watcher applies room results on its own")
+        return True
+
+    finally:
+        # Restore original data
+        save_tournament_data(current_data)
+        update_overlay_state(current_overlay)
+        print("\n(Original tournament data restored)")
+
+def test_score_watcher_api_calls():
+    """A poll fetches the room once, and applying a change it found costs no more room fetches."""
+    print("\n=== Testing Live Score Watcher API Calls ===")
+
+    # Backup current data
+    current_data = get_tournament_data()
+    current_overlay = get_overlay_state()
+    detailed_api, detailed_beatmap = match_utils.api, match_utils.get_beatmap
+
+    try:
+        save_tournament_data({
+            'competitors': [],
+            'brackets': {'upper': [[make_match('live', 'in_progress', 'https://osu.ppy.sh/multiplayer/rooms/5')]],
+                         'lower': []}
+        })
+
+        client = CountingClient()
+        api = CachedApi(client, {'user': (300, 0, 10), 'room': (10, 0, 10)})
+        match_utils.api, match_utils.get_beatmap = api, lambda beatmap_id: None
+
+        with tempfile.TemporaryDirectory() as tmp:
+            watcher = LiveScoreWatcher(60, 100, os.path.join(tmp, 'watcher.lock'))
+            watcher.api = watcher.match_service.api = api
+
+            # New results in the room: one room fetch and one score fetch per map, plus the players once
+            assert watcher.poll_due_rooms() == 1 and watcher.stats['updates'] == 1
+            print(f"API calls for a poll with new results: {client.calls}")
+            assert sorted(client.calls) == ['multiplayer_scores'] * 4 + ['room'] + ['user'] * 2
+            assert api.calls_last_minute() == len(client.calls)
+            match, _ = find_match(get_tournament_data(), 'live')
+            assert (match['score_p1'], match['score_p2']) == (2, 1)
+            assert len(match['detailed_results']['map_results']) == 4
+
+            # Nothing new: the room and its scores only
+            client.calls.clear()
+            watcher._rooms['live']['next_poll'] = 0
+            assert watcher.poll_due_rooms() == 1 and watcher.stats['updates'] == 1
+            assert sorted(client.calls) == ['multiplayer_scores'] * 4 + ['room']
+
+        print("✅ Each poll fetches the room once")
+        return True
+
+    finally:
+        # Restore original data
+        match_utils.api, match_utils.get_beatmap = detailed_api, detailed_beatmap
+        save_tournament_data(current_data)
+        update_overlay_state(current_overlay)
+        print("\n(Original tournament data restored)")
+
+if __name__ == '__main__':
+    success = test_score_watcher() and test_score_watcher_api_calls()
+    print(f"\nScore Watcher Test: {'PASSED' if success else 'FAILED'}")
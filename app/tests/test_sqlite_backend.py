@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test the SQLite storage backend: lossless round trip and per-row updates.
+"""
+
+import sys
+import os
+import tempfile
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
+sys.path.insert(0, project_root)
+
+from app.storage import SqliteBackend
+
+def make_match(match_id, p1, p2, **extra):
+    match = {'id': match_id, 'bracket': 'upper', 'round_index': 0,
+             'player1': p1, 'player2': p2, 'winner': None,
+             'score_p1': 0, 'score_p2': 0, 'mp_room_url': None, 'status': 'next_up'}
+    match.update(extra)
+    return match
+
+def test_sqlite_backend():
+    """Round-trip a full tournament document and check that a score update only rewrites its row."""
+    print("=== Testing SQLite Storage Backend ===")
+
+    players = [{'id': i, 'name': f'P{i}', 'pp': 1000 - i} for i in range(1, 5)]
+    first_gf = make_match('gf-1', players[0], players[1], winner=players[1], status='completed',
+                          bracket='grand_finals', is_grand_finals=True, is_bracket_reset=False)
+    data = {
+        'competitors': players,
+        'brackets': {
+            'upper': [[make_match('u0-0', players[0], players[3],
+                                  match_state={'phase': 'ban', 'banned_maps': ['1']}),
+                       make_match('u0-1', players[1], players[2],
+                                  detailed_results={'map_results': [{'map_number': 1}]})],
+                      []],
+            'lower': [],
+            'grand_finals': make_match('gf-2', players[0], players[1], bracket='grand_finals',
+                                       is_grand_finals=True, is_bracket_reset=True,
+                                       previous_gf=first_gf)
+        },
+        'pending_upper_losers': [],
+        'stream_live': True,
+        'last_updated': None
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = SqliteBackend(os.path.join(tmp, 'tournament.db'))
+
+        backend.save(data)
+        loaded = backend.load()
+        assert loaded == data, "Round trip changed the document"
+        print(f"Initial save wrote {backend.last_write['rows_written']} rows")
+
+        # A score change should only touch that match's row (plus the version counter)
+        loaded['brackets']['upper'][0][1]['score_p1'] = 1
+        loaded['brackets']['upper'][0][1]['status'] = 'in_progress'
+        backend.save(loaded)
+        print(f"Score update wrote {backend.last_write['rows_written']} rows")
+        assert backend.last_write == {'rows_written': 2, 'rows_deleted': 0}
+        assert backend.load() == loaded
+
+        # A second handle (another worker) sees the change and can diff against it
+        other = SqliteBackend(backend.path)
+        assert other.cache_key() == backend.cache_key()
+        current = other.load()
+        current['brackets']['upper'][0][0]['match_state']['banned_maps'].append('2')
+        other.save(current)
+        assert other.last_write['rows_written'] == 2  # match_state row + version
+        assert backend.load() == current
+
+    print("✅ SQLite backend round-trips and writes only changed rows")
+    return True
+
+if __name__ == '__main__':
+    success = test_sqlite_backend()
+    print(f"\nSQLite Backend Test: {'PASSED' if success else 'FAILED'}")
@@ -2,6 +2,8 @@
 Utility modules for the tournament application
 """
 
-from .match_utils import get_detailed_match_results
+from .match_utils import get_detailed_match_results, fetch_playlist_scores, fetch_room_scores, get_room_cache_stats
+from .user_utils import fetch_users, user_statistics
 
-__all__ = ['get_detailed_match_results']
+__all__ = ['get_detailed_match_results', 'fetch_playlist_scores', 'fetch_room_scores', 'get_room_cache_stats', 'fetch_users',
+           'user_statistics']
@@ -1,18 +1,100 @@
-from datetime import datetime
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from config import OSU_API_MAX_WORKERS
 from .. import api
+from ..beatmap_store import get_beatmap
 
+# Scores of finished playlist items per room, so refreshes only fetch new or still
+# running items. An item counts as finished once it has been played (expired) for
+# ITEM_SETTLE_SECONDS, which leaves time for late score submissions. Per worker,
+# least recently refreshed rooms are dropped first.
+ROOM_CACHE_SIZE = 32
+ITEM_SETTLE_SECONDS = 60
+_room_scores = OrderedDict()  # room_id -> {playlist_item_id: scores_data}
+_room_scores_lock = threading.Lock()
+_room_stats = {'cached_items': 0, 'fetched_items': 0}
 
-def get_detailed_match_results(room_id, player1_id, player2_id):
+
+def _item_finished(playlist_item):
+    played_at = getattr(playlist_item, 'played_at', None)
+    if not getattr(playlist_item, 'expired', False) or not isinstance(played_at, datetime):
+        return False
+    if played_at.tzinfo is None:
+        played_at = played_at.replace(tzinfo=timezone.utc)
+    return played_at <= datetime.now(timezone.utc) - timedelta(seconds=ITEM_SETTLE_SECONDS)
+
+
+def fetch_playlist_scores(api_client, room_id, playlist):
+    """
+    Fetch multiplayer_scores for every playlist item of a room in parallel, reusing the
+    scores of items that finished before the last refresh
+    Returns: list of (playlist_item, scores_data, error) in playlist order; a failed
+    item has scores_data None and the exception as error, the others are unaffected
+    """
+    def fetch(playlist_item):
+        try:
+            return playlist_item, api_client.multiplayer_scores(room_id, playlist_item.id), None
+        except Exception as e:
+            return playlist_item, None, e
+
+    playlist = list(playlist)
+    with _room_scores_lock:
+        known = dict(_room_scores.get(room_id, {}))
+    pending = [playlist_item for playlist_item in playlist if playlist_item.id not in known]
+
+    if len(pending) <= 1:
+        fetched = [fetch(playlist_item) for playlist_item in pending]
+    else:
+        with ThreadPoolExecutor(max_workers=min(OSU_API_MAX_WORKERS, len(pending))) as executor:
+            fetched = list(executor.map(fetch, pending))
+
+    with _room_scores_lock:
+        room = _room_scores.setdefault(room_id, {})
+        _room_scores.move_to_end(room_id)
+        for playlist_item, scores_data, error in fetched:
+            if error is None and _item_finished(playlist_item):
+                room[playlist_item.id] = scores_data
+        while len(_room_scores) > ROOM_CACHE_SIZE:
+            _room_scores.popitem(last=False)
+        _room_stats['cached_items'] += len(playlist) - len(pending)
+        _room_stats['fetched_items'] += len(pending)
+
+    fetched_by_id = {result[0].id: result for result in fetched}
+    return [(playlist_item, known[playlist_item.id], None) if playlist_item.id in known
+            else fetched_by_id[playlist_item.id] for playlist_item in playlist]
+
+
+def get_room_cache_stats():
+    """Playlist items served from the room cache vs fetched, and what the cache holds"""
+    with _room_scores_lock:
+        return dict(_room_stats, rooms=len(_room_scores),
+                    finished_items=sum(len(items) for items in _room_scores.values()))
+
+
+def fetch_room_scores(api_client, room_id):
+    """
+    Fetch a room (never from the cache) and the scores of its playlist items, so basic
+    and detailed match results can both be worked out from one fetch
+    Returns: (room, [(playlist_item, scores_data, error)]) as from fetch_playlist_scores
     """
-    Fetch detailed match results including map-by-map breakdown with player stats
+    room = api_client.room(room_id, fresh=True)
+    return room, fetch_playlist_scores(api_client, room_id, room.playlist or [])
+
+
+def get_detailed_match_results(room_id, player1_id, player2_id, room_scores=None):
+    """
+    Fetch detailed match results including map-by-map breakdown with player stats,
+    from `room_scores` (see fetch_room_scores) if the caller already fetched the room
     Returns: dict with map results and player details
     """
     assert(player1_id != player2_id), "Players must be different"
     
     try:
         
-        # Get room details
-        room = api.room(room_id)
+        # Get room details and the scores of every map
+        room, playlist_scores = room_scores or fetch_room_scores(api, room_id)
         
         if not room.playlist:
             print("No playlist found in room")
@@ -31,12 +113,11 @@ def get_detailed_match_results(room_id, player1_id, player2_id):
         player1_wins = 0
         player2_wins = 0
         
-        # Process each map
-        for i, playlist_item in enumerate(room.playlist):
+        # Process each map, with the scores of all maps fetched at once
+        for i, (playlist_item, scores_data, error) in enumerate(playlist_scores):
             try:
-                
-                # Get scores for this map
-                scores_data = api.multiplayer_scores(room_id, playlist_item.id)
+                if error:
+                    raise error
                 
                 # Find scores for both players
                 p1_score = None
@@ -78,72 +159,8 @@ def get_detailed_match_results(room_id, player1_id, player2_id):
 
                     if beatmap_id:
                         try:
-                            beatmap = api.beatmap(beatmap_id)
-                            if not hasattr(beatmap, 'id') or not hasattr(beatmap, 'beatmapset'):
-                                beatmap_dict = None
-                            else:
-                                # Convert beatmap to dict for JSON serialization
-                                beatmap_dict = {
-                                    'id': beatmap.id,
-                                    'beatmapset_id': getattr(beatmap, 'beatmapset_id', None),
-                                    'mode': str(getattr(beatmap, 'mode', None)),  # Convert GameMode to string
-                                    'difficulty_rating': getattr(beatmap, 'difficulty_rating', None),
-                                    'version': getattr(beatmap, 'version', 'Unknown'),
-                                    'total_length': getattr(beatmap, 'total_length', None),
-                                    'hit_length': getattr(beatmap, 'hit_length', None),
-                                    'bpm': getattr(beatmap, 'bpm', None),
-                                    'cs': getattr(beatmap, 'cs', None),
-                                    'ar': getattr(beatmap, 'ar', None),
-                                    'od': getattr(beatmap, 'accuracy', None),
-                                    'hp': getattr(beatmap, 'drain', None),
-                                    'count_circles': getattr(beatmap, 'count_circles', None),
-                                    'count_sliders': getattr(beatmap, 'count_sliders', None),
-                                    'count_spinners': getattr(beatmap, 'count_spinners', None),
-                                }
-                                
-                                # Handle beatmapset safely
-                                if hasattr(beatmap, 'beatmapset') and beatmap.beatmapset:
-                                    try:
-                                        beatmapset_covers = {}
-                                        if hasattr(beatmap.beatmapset, 'covers'):
-                                            # Convert covers to dict safely
-                                            covers_obj = beatmap.beatmapset.covers
-                                            if hasattr(covers_obj, '_asdict'):
-                                                beatmapset_covers = covers_obj._asdict()
-                                            elif hasattr(covers_obj, '__dict__'):
-                                                beatmapset_covers = {k: v for k, v in covers_obj.__dict__.items() if not k.startswith('_')}
-                                            else:
-                                                # Try to convert common cover attributes
-                                                for attr in ['cover', 'cover@2x', 'card', 'card@2x', 'list', 'list@2x', 'slimcover', 'slimcover@2x']:
-                                                    if hasattr(covers_obj, attr.replace('@', '_')):  # Handle @2x -> _2x
-                                                        safe_attr = attr.replace('@', '_')
-                                                        beatmapset_covers[attr] = getattr(covers_obj, safe_attr, None)
-                                        
-                                        beatmap_dict['beatmapset'] = {
-                                            'id': getattr(beatmap._beatmapset, 'id', None),
-                                            'title': getattr(beatmap._beatmapset, 'title', 'Unknown'),
-                                            'artist': getattr(beatmap._beatmapset, 'artist', 'Unknown'),
-                                            'creator': getattr(beatmap._beatmapset, 'creator', 'Unknown'),
-                                            'covers': beatmapset_covers
-                                        }
-                                    except Exception as beatmapset_e:
-                                        print(f"Error processing beatmapset: {beatmapset_e}")
-                                        beatmap_dict['beatmapset'] = {
-                                            'id': None,
-                                            'title': 'Unknown',
-                                            'artist': 'Unknown', 
-                                            'creator': 'Unknown',
-                                            'covers': {}
-                                        }
-                                else:
-                                    beatmap_dict['beatmapset'] = {
-                                        'id': None,
-                                        'title': 'Unknown',
-                                        'artist': 'Unknown',
-                                        'creator': 'Unknown', 
-                                        'covers': {}
-                                    }
-                                
+                            # Known maps come from the local beatmap store, others from the API
+                            beatmap_dict = get_beatmap(beatmap_id)
                         except Exception as beatmap_e:
                             print(f"Error calling api.beatmap({beatmap_id}): {beatmap_e}")
                             beatmap_dict = None
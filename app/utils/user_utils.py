@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+from config import OSU_API_MAX_WORKERS
+
+# Most ids the osu! API accepts in one /users lookup
+USERS_BATCH_SIZE = 50
+
+
+def fetch_users(api_client, user_ids):
+    """
+    Look up many users with the batch users endpoint, batches fetched in parallel
+    Returns: dict of {user_id: user}; users from a failed batch are left out
+    """
+    ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+    batches = [ids[start:start + USERS_BATCH_SIZE] for start in range(0, len(ids), USERS_BATCH_SIZE)]
+
+    def fetch(batch):
+        try:
+            return api_client.users(batch)
+        except Exception as e:
+            print(f"Error fetching users {batch[0]}..{batch[-1]}: {e}")
+            return []
+
+    if len(batches) <= 1:
+        results = [fetch(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=min(OSU_API_MAX_WORKERS, len(batches))) as executor:
+            results = list(executor.map(fetch, batches))
+    return {user.id: user for users in results for user in users}
+
+
+def user_statistics(user):
+    """osu! standard statistics of a user from either api.user() or api.users(), or None"""
+    statistics = getattr(user, 'statistics', None)
+    if statistics is None:
+        rulesets = getattr(user, 'statistics_rulesets', None)
+        statistics = getattr(rulesets, 'osu', None) if rulesets else None
+    return statistics
@@ -78,7 +78,8 @@ class TestGenerateBracket(unittest.TestCase):
         
         saved_data = mock_save.call_args[0][0]
         
-        self.assertEqual(len(saved_data['brackets']['upper']), 1)
+        # Every upper round is laid out up front
+        self.assertEqual(len(saved_data['brackets']['upper']), 2)
         self.assertEqual(len(saved_data['brackets']['upper'][0]), 2)
         
         matches = saved_data['brackets']['upper'][0]
@@ -104,7 +105,8 @@ class TestGenerateBracket(unittest.TestCase):
         
         saved_data = mock_save.call_args[0][0]
         
-        self.assertEqual(len(saved_data['brackets']['upper']), 1)
+        # Every upper round is laid out up front
+        self.assertEqual(len(saved_data['brackets']['upper']), 2)
         self.assertEqual(len(saved_data['brackets']['upper'][0]), 2)
         
         matches = saved_data['brackets']['upper'][0]
@@ -169,13 +171,14 @@ class TestGenerateBracket(unittest.TestCase):
         saved_data = mock_save.call_args[0][0]
         
         # Should not crash and should create matches
-        self.assertEqual(len(saved_data['brackets']['upper']), 1)
+        # Every upper round is laid out up front
+        self.assertEqual(len(saved_data['brackets']['upper']), 2)
         self.assertEqual(len(saved_data['brackets']['upper'][0]), 2)
     
     @patch('app.bracket_logic.save_tournament_data')
     @patch('app.bracket_logic.get_tournament_data')
     def test_generate_bracket_removes_existing_grand_finals(self, mock_get, mock_save):
-        """Test that existing grand finals are removed when generating new bracket."""
+        """Test that existing grand finals are replaced by the new bracket's when generating."""
         self.mock_data['competitors'] = [
             {'id': '1', 'name': 'Player1', 'pp': 100},
             {'id': '2', 'name': 'Player2', 'pp': 200}
@@ -186,7 +189,10 @@ class TestGenerateBracket(unittest.TestCase):
         generate_bracket()
         
         saved_data = mock_save.call_args[0][0]
-        self.assertNotIn('grand_finals', saved_data['brackets'])
+        grand_finals = saved_data['brackets']['grand_finals']
+        self.assertNotIn('some', grand_finals)
+        self.assertEqual(grand_finals['player1']['name'], 'TBD')
+        self.assertEqual(grand_finals['player2']['name'], 'TBD')
     
     @patch('app.bracket_logic.save_tournament_data')
     @patch('app.bracket_logic.get_tournament_data')
@@ -230,7 +236,8 @@ class TestGenerateBracket(unittest.TestCase):
         
         saved_data = mock_save.call_args[0][0]
         
-        self.assertEqual(len(saved_data['brackets']['upper']), 1)
+        # Every upper round is laid out up front
+        self.assertEqual(len(saved_data['brackets']['upper']), 3)
         self.assertEqual(len(saved_data['brackets']['upper'][0]), 4)
         
         # Verify no BYEs needed
@@ -312,9 +319,8 @@ class TestGenerateBracket(unittest.TestCase):
         
         saved_data = mock_save.call_args[0][0]
         
-        # Should create first round with 8 matches
-        self.assertEqual(len(saved_data['brackets']['upper']), 1)
-        self.assertEqual(len(saved_data['brackets']['upper'][0]), 8)
+        # Should lay out all four upper rounds, the first with 8 matches
+        self.assertEqual([len(r) for r in saved_data['brackets']['upper']], [8, 4, 2, 1])
         
         # Verify no BYEs needed with 16 competitors
         matches = saved_data['brackets']['upper'][0]
@@ -365,7 +371,8 @@ class TestGenerateBracket(unittest.TestCase):
         saved_data = mock_save.call_args[0][0]
         
         # Should not crash and create proper structure
-        self.assertEqual(len(saved_data['brackets']['upper']), 1)
+        # Every upper round is laid out up front
+        self.assertEqual(len(saved_data['brackets']['upper']), 2)
         self.assertEqual(len(saved_data['brackets']['upper'][0]), 2)
         
         # All matches should have valid structure
@@ -378,7 +385,7 @@ class TestGenerateBracket(unittest.TestCase):
     @patch('app.bracket_logic.save_tournament_data')
     @patch('app.bracket_logic.get_tournament_data')
     def test_generate_bracket_removes_all_existing_finals(self, mock_get, mock_save):
-        """Test that all types of finals are removed when generating new bracket."""
+        """Test that all types of finals are replaced when generating new bracket."""
         self.mock_data['competitors'] = [
             {'id': '1', 'name': 'Player1', 'pp': 100},
             {'id': '2', 'name': 'Player2', 'pp': 200}
@@ -394,7 +401,7 @@ class TestGenerateBracket(unittest.TestCase):
         generate_bracket()
         
         saved_data = mock_save.call_args[0][0]
-        self.assertNotIn('grand_finals', saved_data['brackets'])
+        self.assertNotIn('match', saved_data['brackets']['grand_finals'])
         self.assertNotIn('grand_finals_reset', saved_data['brackets'])
 
     @patch('app.bracket_logic.save_tournament_data')
@@ -12,6 +12,16 @@ OSU_CLIENT_SECRET = os.getenv('OSU_CLIENT_SECRET')
 OSU_CALLBACK_URL = os.getenv('OSU_CALLBACK_URL')
 ADMIN_REDIRECT_URI = OSU_CALLBACK_URL.replace('/callback/osu', '/admin/callback')
 ADMIN_OSU_ID = ['11365195'] # Your osu! user ID
+OSU_API_MAX_WORKERS = 8  # parallel requests when fetching the scores of every map in a room
+
+# --- osu! API cache ---
+# endpoint: (seconds a response is fresh, further seconds it is still served while it
+# refreshes in the background, most responses kept). Other endpoints are not cached.
+OSU_API_CACHE_POLICIES = {
+    'beatmap': (24 * 60 * 60, 7 * 24 * 60 * 60, 2000),  # beatmap metadata practically never changes
+    'user': (5 * 60, 30 * 60, 500),
+    'room': (10, 0, 50),  # playlists grow during a match: never served stale, and result paths pass fresh=True
+}
 
 # --- API URLs ---
 OSU_API_BASE_URL = 'https://osu.ppy.sh/api/v2'
@@ -21,3 +31,38 @@ AUTHORIZATION_URL = 'https://osu.ppy.sh/oauth/authorize'
 # --- File Paths ---
 TOURNAMENT_FILE = 'tournament.json'
 COMPETITORS_FILE = 'competitors.json'
+SQLITE_FILE = 'tournament.db'
+JOURNAL_FILE = 'tournament.journal.ndjson'
+AUDIT_FILE = 'tournament.audit.ndjson'
+BEATMAP_STORE_FILE = 'beatmaps.db'  # beatmap metadata fetched from the osu! API, kept across restarts
+
+# --- Storage ---
+# 'json' keeps the whole tournament in TOURNAMENT_FILE, 'sqlite' stores it as rows in
+# SQLITE_FILE (run migrate_to_sqlite.py once before switching), 'journal' appends each
+# change to JOURNAL_FILE and periodically folds it into TOURNAMENT_FILE
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'json')
+JOURNAL_COMPACT_BYTES = 1024 * 1024  # fold the journal into the snapshot past this size
+JOURNAL_COMPACT_SECONDS = 15 * 60  # ...or when the snapshot is older than this
+
+# --- Background jobs ---
+COMPETITOR_REFRESH_SECONDS = 5 * 60  # how often competitor pp/rank/avatars are refreshed (0 disables)
+# Opt-in: poll the multiplayer rooms of in-progress matches and apply new results automatically
+LIVE_SCORE_WATCHER = os.getenv('LIVE_SCORE_WATCHER', 'false').lower() in ('1', 'true', 'yes')
+LIVE_SCORE_POLL_SECONDS = 15  # per room; backs off while a room's polls fail
+LIVE_SCORE_API_BUDGET = 60  # the watcher starts no polls while the worker made this many osu! API calls in the last minute
+
+# --- Predictions ---
+PREDICTION_SIMULATIONS = 20000  # Monte Carlo runs per prediction (cached per bracket version)
+# The only values ?simulations= may pick (others get the default): a handful, so they all stay cached
+PREDICTION_SIMULATION_CHOICES = (2000, PREDICTION_SIMULATIONS, 100000)
+PREDICTION_RATING_SCALE = 4.0  # win chance 1 / (1 + e^(-scale * rating difference)), ratings in [0, 1]
+
+# --- Live updates (overlay push channels) ---
+# Opt-in: the SSE stream and long-poll hold a worker per open overlay, so only enable it with a threaded or
+# async server (the Dockerfile runs gthread). Off, the overlay uses ETag polling.
+LIVE_UPDATE_PUSH = os.getenv('LIVE_UPDATE_PUSH', 'false').lower() in ('1', 'true', 'yes')
+LIVE_UPDATE_CHECK_SECONDS = 0.25  # how often waiting requests look for changes made by other workers
+SSE_HEARTBEAT_SECONDS = 15  # keep-alive comment so proxies don't drop an idle stream
+SSE_MAX_SECONDS = 300  # streams end after this and the browser reconnects, freeing the worker
+SSE_RETRY_MS = 2000  # browser reconnect delay
+LONG_POLL_MAX_SECONDS = 25  # longest a long-poll request is held (stay under proxy timeouts)
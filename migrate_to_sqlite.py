@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Import the existing tournament.json into the SQLite storage backend.
+
+Usage: python migrate_to_sqlite.py [--force]
+Afterwards set STORAGE_BACKEND=sqlite (see config.py) and restart the app.
+"""
+
+import sys
+import os
+project_root = os.path.dirname(__file__)
+sys.path.insert(0, project_root)
+
+from config import TOURNAMENT_FILE, SQLITE_FILE
+from app.storage import JsonFileBackend, SqliteBackend
+
+def migrate(force=False):
+    """Copy the JSON document into SQLite and verify the round trip."""
+    print(f"=== Migrating {TOURNAMENT_FILE} -> {SQLITE_FILE} ===")
+
+    source = JsonFileBackend(TOURNAMENT_FILE)
+    target = SqliteBackend(SQLITE_FILE)
+
+    try:
+        data = source.load()
+    except FileNotFoundError:
+        print(f"❌ {TOURNAMENT_FILE} not found")
+        return False
+
+    try:
+        target.load()
+        if not force:
+            print(f"❌ {SQLITE_FILE} already contains tournament data (use --force to overwrite)")
+            return False
+    except FileNotFoundError:
+        pass
+
+    target.save(data)
+    print(f"Wrote {target.last_write['rows_written']} rows")
+
+    if target.load() != data:
+        print("❌ Data read back from SQLite does not match the JSON file")
+        return False
+
+    brackets = data.get('brackets', {})
+    print(f"Competitors: {len(data.get('competitors', []))}")
+    print(f"Upper rounds: {len(brackets.get('upper', []))}, lower rounds: {len(brackets.get('lower', []))}")
+    print(f"Grand finals: {'yes' if brackets.get('grand_finals') else 'no'}")
+    print("✅ Migration complete. Set STORAGE_BACKEND=sqlite to use it.")
+    return True
+
+if __name__ == '__main__':
+    success = migrate(force='--force' in sys.argv)
+    sys.exit(0 if success else 1)